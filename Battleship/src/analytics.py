@@ -0,0 +1,377 @@
+# Filename: analytics.py
+# Description: Aggregate heatmaps over large archives of exported games (see export.py), built with NumPy
+# reductions instead of per-game loops: how often every cell is fired at, how often a shot at it hits, the
+# average turn at which it is hit, when the first hit of a game comes, and how often AI fleets cover every cell.
+# Every map can be split by AI difficulty and by fleet size. Archives are processed one slice of a shard at a
+# time, so memory does not grow with the archive, and partial results from several workers (or machines) are
+# merged by adding them up.
+# Inputs: Dataset directories written by export.py, or saved partial results.
+# Outputs: Heatmaps per group, printed or saved as .npz files.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import argparse  # For the command line interface
+import os        # To query the number of available CPU cores
+
+import numpy as np  # Vectorized reductions
+
+from board import column_label  # Column letters, as on the game boards
+from export import Dataset, HUMAN, MISS  # Exported games
+from player import AIDifficulties  # Names of the strategy groups
+
+# Rows reduced at a time
+SLICE_ROWS = 1 << 16
+
+# Columns the heatmaps can be grouped by
+GROUP_COLUMNS = ("strategy", "num_ships")
+
+# Maps kept for every group, each of shape (board_size, board_size)
+MAPS = ("shots", "hits", "hit_turns", "placements")
+
+
+class Heatmaps:
+    """
+    The heatmaps of one group of games. Every field is a sum, so two Heatmaps of the same board size merge by
+    adding them.
+
+    Attributes:
+        board_size (int): The width and height of the board.
+        shots (numpy.ndarray): Shots fired at every cell.
+        hits (numpy.ndarray): Shots at every cell that hit a ship.
+        hit_turns (numpy.ndarray): Sum of the turns (shots fired before by the shooter) at which every cell was
+            hit.
+        placements (numpy.ndarray): Ships placed over every cell.
+        first_hits (numpy.ndarray): Number of games in which the shooter's first hit came at each turn.
+        fleets (float): The number of fleets placed (every ship counts as one num_ships-th of a fleet).
+    """
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        for name in MAPS:
+            setattr(self, name, np.zeros((board_size, board_size), np.int64))
+        self.first_hits = np.zeros(board_size * board_size, np.int64)
+        self.fleets = 0.0
+
+    def merge(self, other):
+        """
+        Adds the counts of another Heatmaps of the same board size to this one.
+        """
+        for name in MAPS + ("first_hits",):
+            getattr(self, name).__iadd__(getattr(other, name))
+        self.fleets += other.fleets
+
+    def hit_rate(self):
+        """
+        Returns the fraction of the shots at every cell that hit, NaN for cells never fired at.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.shots > 0, self.hits / self.shots, np.nan)
+
+    def mean_hit_turn(self):
+        """
+        Returns the average turn at which every cell was hit, NaN for cells never hit.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.hits > 0, self.hit_turns / self.hits, np.nan)
+
+    def placement_density(self):
+        """
+        Returns the fraction of fleets with a ship over every cell.
+        """
+        return self.placements / self.fleets if self.fleets else np.zeros_like(self.placements, float)
+
+    def mean_first_hit(self):
+        """
+        Returns the average turn of the shooter's first hit, or NaN if there was none.
+        """
+        games = self.first_hits.sum()
+        return float(self.first_hits @ np.arange(len(self.first_hits)) / games) if games else float("nan")
+
+
+class HeatmapGroups:
+    """
+    Heatmaps split by the values of some columns, e.g. one Heatmaps per AI difficulty. Built incrementally by
+    add_turns() and add_placements() and merged with merge().
+
+    Attributes:
+        board_size (int): The width and height of the board.
+        by (tuple): The names of the columns the games are grouped by (from GROUP_COLUMNS).
+        groups (dict): Maps the tuple of column values of every group to its Heatmaps.
+    """
+
+    def __init__(self, board_size, by=()):
+        """
+        Raises:
+            ValueError: If a grouping column is not one of GROUP_COLUMNS.
+        """
+        for column in by:
+            if column not in GROUP_COLUMNS:
+                raise ValueError(f"cannot group by {column}, only by {', '.join(GROUP_COLUMNS)}")
+        self.board_size = board_size
+        self.by = tuple(by)
+        self.groups = {}
+
+    def group(self, key):
+        """
+        Returns the Heatmaps of a group, creating it if needed.
+        """
+        if key not in self.groups:
+            self.groups[key] = Heatmaps(self.board_size)
+        return self.groups[key]
+
+    def split(self, columns, rows):
+        """
+        Numbers the groups of a slice of rows.
+
+        Returns:
+            tuple: The key of every group found and the group number of every row.
+        """
+        if not self.by:
+            return [()], np.zeros(rows, np.int64)
+        # The grouping columns are all 8 bit, so a row's values combine into one integer
+        code = np.zeros(rows, np.int64)
+        for column in self.by:
+            code = code * 256 + columns[column]
+        codes, inverse = np.unique(code, return_inverse=True)
+        keys = []
+        for value in codes.tolist():
+            key = []
+            for _ in self.by:
+                key.append(value % 256)
+                value //= 256
+            keys.append(tuple(reversed(key)))
+        return keys, inverse
+
+    def add_turns(self, columns):
+        """
+        Adds a slice of the turns table to the shot, hit and first hit maps.
+
+        Args:
+            columns (dict): The row, column, turn, result and hit_mask columns, and the grouping columns.
+        """
+        rows = len(columns["row"])
+        if not rows:
+            return
+        cells = self.board_size * self.board_size
+        keys, inverse = self.split(columns, rows)
+        groups = len(keys)
+
+        index = inverse * cells + columns["row"].astype(np.int64) * self.board_size + columns["column"]
+        hit = columns["result"] != MISS
+        turn = columns["turn"]
+        shots = np.bincount(index, minlength=groups * cells)
+        hits = np.bincount(index[hit], minlength=groups * cells)
+        hit_turns = np.bincount(index[hit], weights=turn[hit], minlength=groups * cells).astype(np.int64)
+
+        # A hit seen by a shooter with no hits before it is the first hit of its game
+        first = hit & ~np.asarray(columns["hit_mask"]).any(axis=1)
+        first_hits = np.bincount(inverse[first] * cells + turn[first], minlength=groups * cells)
+
+        shape = (groups, self.board_size, self.board_size)
+        for number, key in enumerate(keys):
+            heatmaps = self.group(key)
+            heatmaps.shots += shots.reshape(shape)[number]
+            heatmaps.hits += hits.reshape(shape)[number]
+            heatmaps.hit_turns += hit_turns.reshape(shape)[number]
+            heatmaps.first_hits += first_hits.reshape(groups, cells)[number]
+
+    def add_placements(self, columns):
+        """
+        Adds a slice of the placements table to the placement density maps.
+
+        Args:
+            columns (dict): The num_ships, size, row, column and orientation columns, and the grouping columns.
+        """
+        rows = len(columns["row"])
+        if not rows:
+            return
+        cells = self.board_size * self.board_size
+        keys, inverse = self.split(columns, rows)
+        groups = len(keys)
+
+        # Every ship covers size cells from its starting cell, one step right (horizontal) or down (vertical)
+        size = columns["size"]
+        vertical = columns["orientation"].astype(np.int64)
+        start = inverse * cells + columns["row"].astype(np.int64) * self.board_size + columns["column"]
+        step = np.where(vertical == 1, self.board_size, 1)
+        covered = [start[size > k] + k * step[size > k] for k in range(int(size.max()))]
+        placements = np.bincount(np.concatenate(covered), minlength=groups * cells)
+
+        # Every ship is one num_ships-th of a fleet, which holds even for fleets split across slices or shards
+        fleets = np.bincount(inverse, weights=1 / columns["num_ships"], minlength=groups)
+
+        for number, key in enumerate(keys):
+            heatmaps = self.group(key)
+            heatmaps.placements += placements.reshape(groups, self.board_size, self.board_size)[number]
+            heatmaps.fleets += float(fleets[number])
+
+    def merge(self, other):
+        """
+        Adds the heatmaps of another HeatmapGroups with the same board size and grouping to this one.
+
+        Raises:
+            ValueError: If the board sizes or groupings differ.
+        """
+        if (other.board_size, other.by) != (self.board_size, self.by):
+            raise ValueError("only heatmaps of the same board size and grouping can be merged")
+        for key, heatmaps in other.groups.items():
+            self.group(key).merge(heatmaps)
+
+    def save(self, path):
+        """
+        Writes the heatmaps to an .npz file, to be merged with the results of other workers.
+        """
+        arrays = {"board_size": np.array(self.board_size), "by": np.array(self.by, dtype=str),
+                  "keys": np.array(list(self.groups), np.int64).reshape(len(self.groups), len(self.by))}
+        for number, heatmaps in enumerate(self.groups.values()):
+            for name in MAPS + ("first_hits",):
+                arrays[f"{number}.{name}"] = getattr(heatmaps, name)
+            arrays[f"{number}.fleets"] = np.array(heatmaps.fleets)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads heatmaps written by save().
+        """
+        with np.load(path) as arrays:
+            result = cls(int(arrays["board_size"]), tuple(arrays["by"].tolist()))
+            for number, key in enumerate(arrays["keys"].tolist()):
+                heatmaps = result.group(tuple(key))
+                for name in MAPS + ("first_hits",):
+                    setattr(heatmaps, name, arrays[f"{number}.{name}"].copy())
+                heatmaps.fleets = float(arrays[f"{number}.fleets"])
+        return result
+
+    def label(self, key):
+        """
+        Returns a readable name of a group, e.g. "strategy=EXPERT num_ships=5".
+        """
+        parts = []
+        for column, value in zip(self.by, key):
+            if column == "strategy":
+                value = "HUMAN" if value == HUMAN else AIDifficulties(value).name
+            parts.append(f"{column}={value}")
+        return " ".join(parts) or "all games"
+
+
+def analyze_shard(directory, shard, by=(), slice_rows=SLICE_ROWS):
+    """
+    Builds the heatmaps of one shard of a dataset, reading it a slice at a time. This is the unit of work handed
+    to pool workers.
+
+    Args:
+        directory (str): The dataset directory.
+        shard (tuple): The table ("turns" or "placements") and the name of the shard.
+        by (tuple): The columns to group by.
+        slice_rows (int): The number of rows reduced at a time.
+
+    Returns:
+        HeatmapGroups: The heatmaps of the shard.
+    """
+    dataset = Dataset(directory)
+    table, name = shard
+    result = HeatmapGroups(dataset.board_size, by)
+    if table == "turns":
+        needed, add = ("row", "column", "turn", "result", "hit_mask") + tuple(by), result.add_turns
+    else:
+        needed, add = ("num_ships", "size", "row", "column", "orientation") + tuple(by), result.add_placements
+
+    columns = dataset.shard(table, name, needed)
+    rows = len(columns["row"])
+    for start in range(0, rows, slice_rows):
+        # Slices of the memory maps are read from disk only here
+        add({column: np.asarray(values[start:start + slice_rows]) for column, values in columns.items()})
+    return result
+
+
+def analyze(directory, by=(), workers=1, slice_rows=SLICE_ROWS):
+    """
+    Builds the heatmaps of a whole dataset, spreading its shards across worker processes.
+
+    Args:
+        directory (str): The dataset directory.
+        by (tuple): The columns to group by (from GROUP_COLUMNS).
+        workers (int | None): The number of worker processes, or None for one per CPU core; with one worker
+            the shards are reduced in the current process.
+        slice_rows (int): The number of rows reduced at a time.
+
+    Returns:
+        HeatmapGroups: The heatmaps of every group.
+    """
+    dataset = Dataset(directory)
+    result = HeatmapGroups(dataset.board_size, by)
+    shards = [(table, name) for table in ("turns", "placements") for name, _ in dataset.tables[table]["shards"]]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for shard in shards:
+            result.merge(analyze_shard(directory, shard, by, slice_rows))
+        return result
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed  # Only imported by parallel runs
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(analyze_shard, directory, shard, by, slice_rows) for shard in shards]
+        for future in as_completed(futures):
+            result.merge(future.result())
+    return result
+
+
+def format_map(values, digits=0):
+    """
+    Formats a heatmap as a grid of numbers with row and column labels, blank for NaN.
+    """
+    size = values.shape[0]
+    width = max(4, len(f"{np.nanmax(values) if np.isfinite(values).any() else 0:.{digits}f}") + 1)
+    lines = ["   " + "".join(f"{column_label(column):>{width}}" for column in range(size))]
+    for row in range(size):
+        cells = "".join(" " * width if np.isnan(value) else f"{value:>{width}.{digits}f}" for value in values[row])
+        lines.append(f"{row + 1:>3}" + cells)
+    return "\n".join(lines)
+
+
+def main():
+    """
+    Command line entry point, e.g. `python Battleship/src/analytics.py turns/ --by strategy --show hit_rate`.
+    """
+    parser = argparse.ArgumentParser(description="Build heatmaps over games exported by simulation.py --export.")
+    parser.add_argument("inputs", nargs="+",
+                        help="dataset directories to analyze and .npz files saved with --save to merge")
+    parser.add_argument("--by", nargs="*", default=[], choices=GROUP_COLUMNS, help="columns to group the games by")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default: 1, 0 for CPU count)")
+    parser.add_argument("--show", choices=("shots", "hit_rate", "hit_turn", "placements"), default="hit_rate",
+                        help="heatmap to print for every group (default: hit_rate)")
+    parser.add_argument("--save", metavar="FILE", default=None, help="save the merged heatmaps to an .npz file")
+    args = parser.parse_args()
+
+    result = None
+    for path in args.inputs:
+        if path.endswith(".npz"):
+            partial = HeatmapGroups.load(path)
+        else:
+            partial = analyze(path, tuple(args.by), args.workers or None)
+        if result is None:
+            result = partial
+        else:
+            result.merge(partial)
+
+    if args.save:
+        result.save(args.save)
+
+    for key, heatmaps in sorted(result.groups.items()):
+        print(f"{result.label(key)}: {heatmaps.shots.sum()} shots, {heatmaps.hits.sum()} hits, "
+              f"first hit at turn {heatmaps.mean_first_hit():.1f} on average, {heatmaps.fleets:.0f} fleets")
+        if args.show == "shots":
+            print(format_map(heatmaps.shots.astype(float)))
+        elif args.show == "hit_rate":
+            print(format_map(100 * heatmaps.hit_rate()))
+        elif args.show == "hit_turn":
+            print(format_map(heatmaps.mean_hit_turn(), 1))
+        else:
+            print(format_map(100 * heatmaps.placement_density()))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# Filename: audio.py
+# Description: Non-blocking audio service for the Battleship sound effects. The clips in sound_files are loaded
+# when the service starts and are played by background worker threads, so the game loop never waits for a sound
+# to finish. With miniaudio (in requirements.txt) every clip, WAV or MP3, is decoded into memory once; the
+# fallback backends only check the paths and decode the files each time they play (simpleaudio preloads WAV).
+# When sounds arrive faster than they can be played, the playback policy decides whether they overlap, are
+# dropped or are queued. A null backend plays nothing, for headless runs and hosts without an audio stack. The
+# audio packages are only imported once the first service starts, so importing the game (e.g. in a headless
+# worker process) never pays for them.
+# Inputs: The name of the sound effect to play ("hit", "miss", "sunk" or "win").
+# Outputs: Sound played on the speakers, without blocking the caller.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import os         # To locate the sound files next to this module
+import queue      # Hands clips to the worker threads
+import threading  # Background playback workers
+import time       # Waits for a clip to finish playing
+from enum import Enum  # Playback policies
+
+# Directory holding the sound effects, independent of the current working directory
+SOUND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sound_files")
+
+# Sound file of each sound effect
+SOUNDS = {
+    "hit": "hit-2.wav",
+    "miss": "miss-2.wav",
+    "sunk": "ship-sunk.mp3",
+    "win": "win.mp3",
+}
+
+
+def playsound(path):
+    """
+    Plays a sound file with the playsound package, which is imported by the first call.
+    """
+    from playsound import playsound as play_file
+    play_file(path)
+
+
+class PlaybackPolicy(Enum):
+
+    OVERLAP = 0  # Play up to `voices` clips at the same time and drop any clip beyond that
+    DROP    = 1  # Play one clip at a time and drop clips requested while one is playing
+    QUEUE   = 2  # Play one clip at a time and queue up to `queue_limit` clips behind it
+
+
+class NullBackend:
+    """
+    Backend that plays nothing. Used for headless runs and hosts without an audio stack.
+    """
+
+    def load(self, path):
+        return path
+
+    def play(self, clip):
+        pass
+
+
+class PlaysoundBackend:
+    """
+    Backend based on playsound. playsound only accepts file paths, so loading resolves and checks the absolute
+    path of each clip once and playing decodes it on the worker thread.
+    """
+
+    def load(self, path):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        return path
+
+    def play(self, clip):
+        playsound(clip)
+
+
+class MiniaudioBackend:
+    """
+    Backend based on miniaudio, the default install. Every clip (WAV or MP3) is decoded into memory once when
+    loaded, in one sample format so that all of them can be played by the same kind of device, and playing only
+    streams the decoded samples to a new playback device.
+    """
+
+    def __init__(self):
+        import miniaudio
+        self.miniaudio = miniaudio
+
+    def load(self, path):
+        return self.miniaudio.decode_file(path)
+
+    def play(self, clip):
+        miniaudio = self.miniaudio
+        stream = miniaudio.stream_raw_pcm_memory(clip.samples, clip.nchannels, clip.sample_width)
+        with miniaudio.PlaybackDevice(clip.sample_format, clip.nchannels, clip.sample_rate) as device:
+            device.start(stream)
+            time.sleep(clip.duration)  # The device plays on its own thread; keep it open until the clip ends
+
+
+class SimpleaudioBackend(PlaysoundBackend):
+    """
+    Backend based on simpleaudio. WAV clips are decoded into memory once when loaded; other formats fall back
+    to playsound.
+    """
+
+    def load(self, path):
+        if path.endswith(".wav"):
+            import simpleaudio
+            return simpleaudio.WaveObject.from_wave_file(path)
+        return super().load(path)
+
+    def play(self, clip):
+        if isinstance(clip, str):
+            super().play(clip)
+        else:
+            clip.play().wait_done()
+
+
+def default_backend():
+    """
+    Returns the best available backend: miniaudio if it is installed, otherwise simpleaudio or playsound, or
+    NullBackend if none of them is.
+    """
+    import importlib.util  # To check for the audio packages without importing them
+
+    if importlib.util.find_spec("miniaudio") is not None:
+        return MiniaudioBackend()
+    if importlib.util.find_spec("simpleaudio") is not None:
+        return SimpleaudioBackend()
+    if importlib.util.find_spec("playsound") is not None:
+        return PlaysoundBackend()
+    return NullBackend()
+
+
+class AudioService:
+    """
+    Plays sound effects on background worker threads.
+
+    Attributes:
+        clips (dict): The loaded clip of each sound effect.
+        played (int): Number of clips played.
+        dropped (int): Number of clips dropped by the playback policy.
+        errors (int): Number of clips the backend failed to play.
+    """
+
+    def __init__(self, backend=None, policy=PlaybackPolicy.DROP, voices=4, queue_limit=8):
+        """
+        Loads every sound effect and starts the worker threads.
+
+        Args:
+            backend: The audio backend (default_backend() if None).
+            policy (PlaybackPolicy): What to do with clips requested while others are playing.
+            voices (int): The number of clips that may play at once with the OVERLAP policy.
+            queue_limit (int): The number of clips that may wait behind the playing one with the QUEUE policy.
+        """
+        self.backend = backend if backend is not None else default_backend()
+        self.policy = policy
+        self.clips = {name: self.backend.load(os.path.join(SOUND_DIR, file)) for name, file in SOUNDS.items()}
+
+        # Number of clips that may be playing or waiting at the same time
+        workers = voices if policy == PlaybackPolicy.OVERLAP else 1
+        self.capacity = workers + (queue_limit if policy == PlaybackPolicy.QUEUE else 0)
+
+        self.pending = 0  # Clips playing or waiting to be played
+        self.played = 0
+        self.dropped = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+        self.requests = queue.Queue()
+        self.workers = [threading.Thread(target=self.run, daemon=True) for _ in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def play(self, name, force=False):
+        """
+        Requests a sound effect without waiting for it to play.
+
+        Args:
+            name (str): The name of the sound effect (a key of SOUNDS).
+            force (bool): If True, the clip is queued even if the playback policy would drop it.
+
+        Returns:
+            bool: True if the clip will be played, False if the playback policy dropped it.
+        """
+        with self.lock:
+            if self.pending >= self.capacity and not force:
+                self.dropped += 1
+                return False
+            self.pending += 1
+        self.requests.put(self.clips[name])
+        return True
+
+    def run(self):
+        """
+        Worker thread loop: plays clips until the service is closed.
+        """
+        while True:
+            clip = self.requests.get()
+            if clip is None:
+                self.requests.task_done()
+                return
+            try:
+                self.backend.play(clip)
+                failed = False
+            except Exception:
+                failed = True  # A broken audio stack must not stop the worker
+            with self.lock:
+                self.pending -= 1
+                if failed:
+                    self.errors += 1
+                else:
+                    self.played += 1
+            self.requests.task_done()
+
+    def wait(self):
+        """
+        Blocks until every requested clip has finished playing (e.g. before the program exits).
+        """
+        self.requests.join()
+
+    def close(self):
+        """
+        Stops the worker threads once the requested clips have been played.
+        """
+        for _ in self.workers:
+            self.requests.put(None)
+        for worker in self.workers:
+            worker.join()
+
+
+# Shared audio service, created by get_audio()
+_audio = None
+
+
+def get_audio():
+    """
+    Returns the shared audio service, starting it (and loading every clip) on the first call.
+    """
+    global _audio
+    if _audio is None:
+        _audio = AudioService()
+    return _audio
+
+
+def set_audio(service):
+    """
+    Replaces the shared audio service, e.g. with AudioService(NullBackend()) for headless runs.
+    """
+    global _audio
+    _audio = service
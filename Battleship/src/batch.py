@@ -0,0 +1,381 @@
+# Filename: batch.py
+# Description: Vectorized lockstep engine that plays thousands of headless AI-vs-AI games at once. Every game is a
+# row of stacked NumPy arrays (ship-id maps, shot and hit masks, remaining hits per ship) and all games advance by
+# one turn with array operations instead of per-game Board, Ship and Player objects. The batched policies mirror
+# AIPlayerEasy, AIPlayerMedium (including the order of its targeting frontier) and AIPlayerHard, and fleets are
+# placed with the same distribution as AIPlayer.place_ships, so the results are statistically equivalent to the
+# object engine.
+# Inputs: The two AI difficulties, the number of ships, the number of games, the batch size and an optional seed.
+# Outputs: A SimulationResult with the same win and turns-to-win statistics as simulation.simulate.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import argparse  # For the command line interface
+
+import numpy as np  # Array backend for the batched games
+
+from board import DEFAULT_BOARD_SIZE  # Standard board size
+from player import AIDifficulties, STEPS  # Difficulty levels mirrored by the batched policies, neighbour steps
+from ship import fleet_sizes  # Ship sizes of a fleet
+from simulation import SimulationResult, parse_difficulty  # Shared result type and command line parsing
+
+
+def place_fleets(rng, games, num_ships, board_size):
+    """
+    Places a random fleet (with the ship sizes of ship.fleet_sizes) for every game. Each ship gets a uniformly
+    random orientation and starting cell and is re-drawn until it fits on the board without overlapping the
+    ships placed before it, which makes every valid placement of the ship equally likely.
+
+    Args:
+        rng (np.random.Generator): The random number generator.
+        games (int): The number of fleets to place.
+        num_ships (int): The number of ships per fleet.
+        board_size (int): The width and height of the board.
+
+    Returns:
+        np.ndarray: A (games, board_size * board_size) int32 array holding the ship id (the index of the ship in
+        the fleet) occupying each cell, or -1 for water.
+    """
+    ship_id = np.full((games, board_size * board_size), -1, dtype=np.int32)
+
+    for ship, size in enumerate(fleet_sizes(num_ships)):
+        offsets = np.arange(size)
+        pending = np.arange(games)
+
+        # Redraw the placement of the games whose draw was rejected until every game has placed the ship
+        while pending.size:
+            count = pending.size
+            vertical = rng.random(count) < 0.5
+            x = rng.integers(0, board_size, count)
+            y = rng.integers(0, board_size, count)
+
+            rows = x[:, None] + np.where(vertical[:, None], offsets, 0)
+            cols = y[:, None] + np.where(vertical[:, None], 0, offsets)
+            in_bounds = (rows[:, -1] < board_size) & (cols[:, -1] < board_size)
+
+            cells = np.minimum(rows, board_size - 1) * board_size + np.minimum(cols, board_size - 1)
+            free = (ship_id[pending[:, None], cells] < 0).all(axis=1)
+            accepted = in_bounds & free
+
+            ship_id[pending[accepted, None], cells[accepted]] = ship
+            pending = pending[~accepted]
+
+    return ship_id
+
+
+class EasyPolicy:
+    """
+    Batched AIPlayerEasy: fires at a uniformly random cell that has not been fired at yet. Every game follows its
+    own random permutation of the cells, skipping cells that have already been fired at, which picks uniformly
+    among the remaining cells at a cost independent of the board size.
+    """
+
+    def __init__(self, rng, games, ship_id, board_size):
+        self.rng = rng
+        self.board_size = board_size
+        self.order = rng.random((games, board_size * board_size)).argsort(axis=1)
+        self.pointer = np.zeros(games, dtype=np.intp)
+
+    def hunt(self, games, shots):
+        """
+        Returns the next unshot cell in the random order of each of the given games.
+        """
+        pointer = self.pointer[games]
+        cell = self.order[games, pointer]
+        shot = shots[games, cell]
+
+        # Skip the cells that have already been fired at
+        while shot.any():
+            pointer[shot] += 1
+            cell[shot] = self.order[games[shot], pointer[shot]]
+            shot = shots[games, cell]
+
+        self.pointer[games] = pointer + 1
+        return cell
+
+    def choose(self, games, shots, hits, hits_left, ship_id):
+        """
+        Returns the cell fired at in each of the given games.
+        """
+        return self.hunt(games, shots)
+
+    def observe(self, games, cell, hit, sunk_size):
+        """
+        Records the cell fired at and the result of the last shot of each of the given games.
+        """
+
+
+class MediumPolicy(EasyPolicy):
+    """
+    Batched AIPlayerMedium: hunts at random (as EasyPolicy) while no ship is partially hit, and otherwise fires
+    at the front of a frontier of cells next to the open hits, with the cells continuing a line of hits first.
+
+    The frontier deque of the object engine is kept as a rank per cell: cells pushed to the front get increasing
+    ranks above every cell pushed to the back, and cells pushed to the back get decreasing ones, so the highest
+    ranked cell is the front of the deque. Firing drops every cell ranked at or above the chosen one, as popping
+    the deque up to the chosen cell does.
+    """
+
+    # Rank of the first cell pushed to either end of the frontier
+    FRONT = 1 << 40
+
+    def __init__(self, rng, games, ship_id, board_size):
+        super().__init__(rng, games, ship_id, board_size)
+        self.ship_id = ship_id
+        cells = board_size * board_size
+        self.open = np.zeros((games, cells), dtype=bool)       # Hits on ships that are still afloat
+        self.rank = np.zeros((games, cells), dtype=np.int64)   # Frontier position of each cell, 0 if absent
+        self.clock = 0                                         # Number of pushes so far
+
+    def choose(self, games, shots, hits, hits_left, ship_id):
+        cell = np.empty(games.size, dtype=np.intp)
+        rank = self.rank[games]
+        targeting = (rank > 0).any(axis=1)
+        hunting = ~targeting
+
+        if targeting.any():
+            rows = games[targeting]
+            rank = rank[targeting]
+            size = self.board_size
+
+            # Frontier cells still worth firing at: not fired at yet and next to an open hit
+            open_hits = self.open[rows].reshape(-1, size, size)
+            near = np.zeros_like(open_hits)
+            near[:, 1:, :] |= open_hits[:, :-1, :]
+            near[:, :-1, :] |= open_hits[:, 1:, :]
+            near[:, :, 1:] |= open_hits[:, :, :-1]
+            near[:, :, :-1] |= open_hits[:, :, 1:]
+            candidates = (rank > 0) & near.reshape(rank.shape) & ~shots[rows]
+
+            # Fire at the front candidate and drop it with the stale cells in front of it; frontiers without
+            # a candidate are emptied and their games hunt instead
+            chosen = np.where(candidates, rank, 0).argmax(axis=1)
+            front = rank[np.arange(rows.size), chosen]
+            stuck = ~candidates.any(axis=1)
+            front[stuck] = 1
+            self.rank[rows] = np.where(rank >= front[:, None], 0, rank)
+            cell[targeting] = chosen
+            hunting[np.flatnonzero(targeting)[stuck]] = True
+
+        if hunting.any():
+            cell[hunting] = self.hunt(games[hunting], shots)
+        return cell
+
+    def push(self, games, x, y, front):
+        """
+        Pushes cell (x, y) of each of the given games to one end of its frontier, skipping cells off the board.
+        """
+        self.clock += 1
+        size = self.board_size
+        inside = (x >= 0) & (x < size) & (y >= 0) & (y < size)
+        games, cells = games[inside], x[inside] * size + y[inside]
+        rank = self.FRONT + self.clock if front else self.FRONT - self.clock
+        self.rank[games, cells] = np.maximum(self.rank[games, cells], rank)
+
+    def is_open(self, games, x, y):
+        """
+        Returns whether cell (x, y) of each of the given games is an open hit (False off the board).
+        """
+        size = self.board_size
+        inside = (x >= 0) & (x < size) & (y >= 0) & (y < size)
+        result = np.zeros(games.size, dtype=bool)
+        result[inside] = self.open[games[inside], x[inside] * size + y[inside]]
+        return result
+
+    def observe(self, games, cell, hit, sunk_size):
+        sunk = hit & (sunk_size > 0)
+        if sunk.any():
+            # Forget the cells of the sunk ships, and the frontier of games with no partially hit ship left
+            rows = games[sunk]
+            ship = self.ship_id[rows, cell[sunk]]
+            self.open[rows] &= self.ship_id[rows] != ship[:, None]
+            self.rank[rows[~self.open[rows].any(axis=1)]] = 0
+
+        damaged = hit & (sunk_size == 0)
+        if not damaged.any():
+            return
+        rows = games[damaged]
+        x, y = np.divmod(cell[damaged], self.board_size)
+        self.open[rows, cell[damaged]] = True
+
+        for dx, dy in STEPS:
+            # Any neighbour may continue the ship
+            line = self.is_open(rows, x - dx, y - dy)
+            self.push(rows[~line], (x + dx)[~line], (y + dy)[~line], front=False)
+            if not line.any():
+                continue
+
+            # The hit extends a line of hits: try both ends of the line before anything else
+            line_rows, line_x, line_y = rows[line], x[line], y[line]
+            end_x, end_y = line_x - dx, line_y - dy
+            extends = self.is_open(line_rows, end_x - dx, end_y - dy)
+            while extends.any():
+                end_x[extends] -= dx
+                end_y[extends] -= dy
+                extends = self.is_open(line_rows, end_x - dx, end_y - dy)
+            self.push(line_rows, end_x - dx, end_y - dy, front=True)
+            self.push(line_rows, line_x + dx, line_y + dy, front=True)
+
+
+class HardPolicy:
+    """
+    Batched AIPlayerHard: fires at the unhit ship cells in row-major order.
+    """
+
+    def __init__(self, rng, games, ship_id, board_size):
+        fleet_cells = int((ship_id[0] >= 0).sum())
+        self.targets = np.argsort(ship_id < 0, axis=1, kind="stable")[:, :fleet_cells]
+        self.pointer = np.zeros(games, dtype=np.intp)
+
+    def choose(self, games, shots, hits, hits_left, ship_id):
+        cell = self.targets[games, self.pointer[games]]
+        self.pointer[games] += 1
+        return cell
+
+    def observe(self, games, cell, hit, sunk_size):
+        pass
+
+
+# Batched policy of each difficulty level
+POLICIES = {
+    AIDifficulties.EASY: EasyPolicy,
+    AIDifficulties.MEDIUM: MediumPolicy,
+    AIDifficulties.HARD: HardPolicy,
+}
+
+
+def play_batch(rng, difficulty1, difficulty2, num_ships, games, board_size):
+    """
+    Plays a batch of games in lockstep. Player one guesses first, as in main() and simulation.play_game.
+
+    Args:
+        rng (np.random.Generator): The random number generator.
+        difficulty1 (AIDifficulties): The AI guessing first.
+        difficulty2 (AIDifficulties): The AI guessing second.
+        num_ships (int): The number of ships each AI places.
+        games (int): The number of games in the batch.
+        board_size (int): The width and height of the board.
+
+    Returns:
+        tuple: Arrays with the index of the winner (0 or 1) and the number of guesses the winner made in each game.
+    """
+    cells = board_size * board_size
+
+    # Index 0 holds player one's fleet (fired at by player two) and index 1 holds player two's fleet
+    ship_id = [place_fleets(rng, games, num_ships, board_size) for _ in range(2)]
+    shots = [np.zeros((games, cells), dtype=bool) for _ in range(2)]
+    hits = [np.zeros((games, cells), dtype=bool) for _ in range(2)]
+    sizes = np.array(fleet_sizes(num_ships), dtype=np.int16)
+    hits_left = [np.tile(sizes, (games, 1)) for _ in range(2)]
+    ships_left = [np.full(games, num_ships, dtype=np.int32) for _ in range(2)]
+
+    # Each player's policy targets the other player's fleet
+    policies = [
+        POLICIES[difficulty](rng, games, ship_id[1 - mover], board_size)
+        for mover, difficulty in enumerate((difficulty1, difficulty2))
+    ]
+
+    winners = np.zeros(games, dtype=np.int8)
+    turns = np.zeros(games, dtype=np.int32)
+    active = np.arange(games)
+    turn = 0
+
+    while active.size:
+        turn += 1
+        for mover in range(2):
+            target = 1 - mover
+            cell = policies[mover].choose(active, shots[target], hits[target], hits_left[target], ship_id[target])
+            shots[target][active, cell] = True
+
+            # Resolve the hits and count down the remaining cells of every ship that was hit
+            hit_ship = ship_id[target][active, cell]
+            hit = hit_ship >= 0
+            hit_games = active[hit]
+            hit_ship = hit_ship[hit]
+            hits[target][hit_games, cell[hit]] = True
+            hits_left[target][hit_games, hit_ship] -= 1
+
+            sunk = hits_left[target][hit_games, hit_ship] == 0
+            sunk_size = np.zeros(active.size, dtype=np.int32)
+            sunk_size[np.flatnonzero(hit)[sunk]] = sizes[hit_ship[sunk]]
+            ships_left[target][hit_games[sunk]] -= 1
+            policies[mover].observe(active, cell, hit, sunk_size)
+
+            # Retire the games that were just won
+            won = ships_left[target][active] == 0
+            winners[active[won]] = mover
+            turns[active[won]] = turn
+            active = active[~won]
+
+    return winners, turns
+
+
+def simulate_batch(difficulty1, difficulty2, num_ships=5, games=1000, batch_size=4096, seed=None,
+                   board_size=DEFAULT_BOARD_SIZE):
+    """
+    Plays many headless games between two AIs as lockstep array batches.
+
+    Args:
+        difficulty1 (AIDifficulties): The AI guessing first.
+        difficulty2 (AIDifficulties): The AI guessing second.
+        num_ships (int): The number of ships each AI places.
+        games (int): The total number of games to play.
+        batch_size (int): The number of games advanced together.
+        seed (int | None): Seed for the random number generator.
+        board_size (int): The width and height of the board.
+
+    Returns:
+        SimulationResult: The aggregate results of every game.
+    """
+    rng = np.random.default_rng(seed)
+    result = SimulationResult()
+
+    for start in range(0, games, batch_size):
+        winners, turns = play_batch(rng, difficulty1, difficulty2, num_ships,
+                                    min(batch_size, games - start), board_size)
+
+        chunk = SimulationResult()
+        chunk.games = winners.size
+        for player in range(2):
+            won = winners == player
+            chunk.wins[player] = int(won.sum())
+            chunk.turns[player] = int(turns[won].sum())
+        values, counts = np.unique(turns, return_counts=True)
+        chunk.turn_counts = dict(zip(values.tolist(), counts.tolist()))
+        result.merge(chunk)
+
+    return result
+
+
+def parse_policy(text):
+    """
+    Converts a difficulty name given on the command line into an AIDifficulties level that has a batched policy.
+    """
+    difficulty = parse_difficulty(text)
+    if difficulty not in POLICIES:
+        names = ", ".join(level.name.lower() for level in POLICIES)
+        raise argparse.ArgumentTypeError(f"no batched policy for the {difficulty.name.lower()} AI (choose {names})")
+    return difficulty
+
+
+def main():
+    """
+    Command line entry point, e.g. `python Battleship/src/batch.py medium easy --games 100000`.
+    """
+    parser = argparse.ArgumentParser(description="Run vectorized headless AI-vs-AI Battleship games.")
+    parser.add_argument("player1", type=parse_policy, help="difficulty of the AI guessing first")
+    parser.add_argument("player2", type=parse_policy, help="difficulty of the AI guessing second")
+    parser.add_argument("--ships", type=int, default=5, help="number of ships per player (default: 5)")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to play (default: 1000)")
+    parser.add_argument("--batch-size", type=int, default=4096, help="games advanced together (default: 4096)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--board-size", type=int, default=DEFAULT_BOARD_SIZE, help="board width and height")
+    args = parser.parse_args()
+
+    result = simulate_batch(args.player1, args.player2, args.ships, args.games, args.batch_size, args.seed,
+                            args.board_size)
+    print(result.summary((args.player1.name, args.player2.name)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+# Filename: benchmark.py
+# Description: Benchmark suite for the hot paths of the Battleship game: Board.place_ship, Board.receive_fire,
+# Board.all_ships_sunk, AIPlayer.place_ships, the make_guess of every AI and full headless AI-vs-AI games at several
+# board sizes and fleet counts, plus the import time of the entry points in a fresh interpreter. Results can be
+# saved as a JSON baseline, and a later run can be compared against a stored baseline, failing when a tracked
+# metric got slower than the allowed threshold or an import took longer than its budget.
+# Inputs: Command line options choosing the benchmarks, the baseline file and the regression threshold.
+# Outputs: The time per operation of every benchmark, a JSON baseline and a non-zero exit status on regressions.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import argparse    # For the command line interface
+import json        # Baseline files
+import os          # To locate the default baseline file
+import platform    # Recorded with the results, since timings depend on the machine
+import random      # Seeded so every run measures the same games
+import statistics  # Median of the repeated measurements
+import subprocess  # Fresh interpreters for the import benchmarks
+import sys         # Exit status and the interpreter to run
+import time        # High resolution timer
+
+from board import make_board
+from player import AIPlayerEasy, AIPlayerMedium, AIPlayerHard, AIPlayerExpert, AIPlayerSampling
+from placements import random_fleet
+from ship import Ship, fleet_sizes
+from simulation import play_game
+
+# Directory of the game modules
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Default location of the stored baseline
+BASELINE_PATH = os.path.join(SOURCE_DIR, "..", "benchmarks", "baseline.json")
+
+# Default allowed slowdown before a metric counts as a regression (0.25 = 25% slower)
+DEFAULT_THRESHOLD = 0.25
+
+# Largest acceptable import time of each entry point, in seconds. Starting a game, a headless run or a worker
+# must not wait on modules it does not use.
+IMPORT_BUDGETS = {
+    "player": 0.050,
+    "main": 0.060,
+    "simulation": 0.060,
+}
+
+# Registered benchmarks: name -> function returning (elapsed seconds, number of operations)
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    Decorator registering a benchmark function under the given name.
+    """
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+
+def random_ships(board_size, num_ships):
+    """
+    Returns the Ship objects of a random fleet.
+    """
+    return [Ship(size, position, orientation)
+            for size, position, orientation in random_fleet(board_size, fleet_sizes(num_ships))]
+
+
+@benchmark("board.place_ship")
+def bench_place_ship():
+    fleets = [random_ships(10, 5) for _ in range(2000)]
+    boards = [make_board(10, verbose=False) for _ in fleets]
+
+    start = time.perf_counter()
+    for board, fleet in zip(boards, fleets):
+        for ship in fleet:
+            board.place_ship(ship)
+    return time.perf_counter() - start, len(fleets) * 5
+
+
+@benchmark("board.receive_fire")
+def bench_receive_fire():
+    boards = []
+    for _ in range(200):
+        board = make_board(10, verbose=False)
+        for ship in random_ships(10, 5):
+            board.place_ship(ship)
+        boards.append(board)
+    cells = [(x, y) for x in range(10) for y in range(10)]
+
+    start = time.perf_counter()
+    for board in boards:
+        for x, y in cells:
+            board.receive_fire(x, y)
+    return time.perf_counter() - start, len(boards) * len(cells)
+
+
+@benchmark("board.all_ships_sunk")
+def bench_all_ships_sunk():
+    board = make_board(10, verbose=False)
+    for ship in random_ships(10, 5):
+        board.place_ship(ship)
+    calls = 100000
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        board.all_ships_sunk()
+    return time.perf_counter() - start, calls
+
+
+@benchmark("ai.place_ships")
+def bench_ai_place_ships():
+    players = [AIPlayerEasy(5, verbose=False) for _ in range(2000)]
+
+    start = time.perf_counter()
+    for player in players:
+        player.place_ships()
+    return time.perf_counter() - start, len(players)
+
+
+def bench_make_guess(ai_class, games):
+    """
+    Times every make_guess call of an AI over whole games against random fleets.
+    """
+    elapsed = 0.0
+    calls = 0
+    for _ in range(games):
+        ai = ai_class(5, verbose=False)
+        opponent = AIPlayerEasy(5, verbose=False)
+        opponent.place_ships()
+        while not opponent.board.all_ships_sunk():
+            start = time.perf_counter()
+            ai.make_guess(opponent)
+            elapsed += time.perf_counter() - start
+            calls += 1
+    return elapsed, calls
+
+
+@benchmark("ai.easy.make_guess")
+def bench_easy_make_guess():
+    return bench_make_guess(AIPlayerEasy, 100)
+
+
+@benchmark("ai.medium.make_guess")
+def bench_medium_make_guess():
+    return bench_make_guess(AIPlayerMedium, 100)
+
+
+@benchmark("ai.hard.make_guess")
+def bench_hard_make_guess():
+    return bench_make_guess(AIPlayerHard, 500)
+
+
+@benchmark("ai.expert.make_guess")
+def bench_expert_make_guess():
+    return bench_make_guess(AIPlayerExpert, 50)
+
+
+@benchmark("ai.sampling.make_guess")
+def bench_sampling_make_guess():
+    return bench_make_guess(AIPlayerSampling, 5)
+
+
+def bench_games(board_size, num_ships, games, player_classes=(AIPlayerMedium, AIPlayerEasy)):
+    """
+    Times full headless games between two AIs.
+    """
+    start = time.perf_counter()
+    for _ in range(games):
+        play_game(*(ai_class(num_ships, verbose=False, board_size=board_size) for ai_class in player_classes))
+    return time.perf_counter() - start, games
+
+
+@benchmark("game.10x10.5_ships")
+def bench_game_small():
+    return bench_games(10, 5, 100)
+
+
+@benchmark("game.30x30.12_ships")
+def bench_game_medium():
+    return bench_games(30, 12, 10)
+
+
+@benchmark("game.100x100.40_ships")
+def bench_game_large():
+    return bench_games(100, 40, 2, (AIPlayerHard, AIPlayerMedium))
+
+
+@benchmark("game.1000x1000.200_ships")
+def bench_game_sparse():
+    return bench_games(1000, 200, 2, (AIPlayerHard, AIPlayerHard))
+
+
+@benchmark("game.10x10.5_ships.pooled")
+def bench_game_pooled():
+    """
+    Times the games of bench_game_small with the same two players reset between games, as run_chunk plays them.
+    """
+    players = [ai_class(5, verbose=False, board_size=10) for ai_class in (AIPlayerMedium, AIPlayerEasy)]
+    start = time.perf_counter()
+    for _ in range(100):
+        play_game(*players)
+        for player in players:
+            player.reset()
+    return time.perf_counter() - start, 100
+
+
+def time_import(module):
+    """
+    Returns the seconds a fresh interpreter spends importing a module and everything it imports, as reported by
+    `python -X importtime`, which leaves out the startup of the interpreter itself.
+    """
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=SOURCE_DIR,
+                            capture_output=True, text=True, check=True).stderr
+    for line in reversed(output.splitlines()):
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1e6
+    raise RuntimeError(f"no import time reported for {module}")
+
+
+def import_benchmark(module):
+    """
+    Registers the import time benchmark of a module.
+    """
+    @benchmark(f"startup.import.{module}")
+    def bench_import():
+        return time_import(module), 1
+
+
+for module in IMPORT_BUDGETS:
+    import_benchmark(module)
+
+
+def over_budget(results):
+    """
+    Returns (module, seconds, budget) for every measured import that took longer than its budget.
+    """
+    rows = []
+    for module, budget in IMPORT_BUDGETS.items():
+        result = results.get(f"startup.import.{module}")
+        if result is not None and result["ns_per_op"] / 1e9 > budget:
+            rows.append((module, result["ns_per_op"] / 1e9, budget))
+    return rows
+
+
+def run(names, repeat, seed=0):
+    """
+    Runs benchmarks and returns the median time per operation of each.
+
+    Args:
+        names (list): The names of the benchmarks to run.
+        repeat (int): The number of times each benchmark is repeated.
+        seed (int): Seed for the random number generator, so every run measures the same work.
+
+    Returns:
+        dict: Maps each benchmark name to {"ns_per_op": median nanoseconds per operation, "ops": operations}.
+    """
+    results = {}
+    for name in names:
+        timings = []
+        for i in range(repeat):
+            random.seed(seed + i)
+            elapsed, ops = BENCHMARKS[name]()
+            timings.append(elapsed / ops)
+        results[name] = {"ns_per_op": round(statistics.median(timings) * 1e9, 1), "ops": ops}
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares results against a baseline.
+
+    Args:
+        results (dict): The results of run().
+        baseline (dict): The benchmarks of a stored baseline.
+        threshold (float): The allowed slowdown, as a fraction of the baseline time.
+
+    Returns:
+        list: (name, baseline ns, current ns, change) for every metric present in both, with change the
+        relative difference (positive when slower).
+    """
+    rows = []
+    for name, result in results.items():
+        if name in baseline:
+            old = baseline[name]["ns_per_op"]
+            new = result["ns_per_op"]
+            rows.append((name, old, new, new / old - 1 if old else 0.0))
+    return rows
+
+
+def main():
+    """
+    Command line entry point, e.g. `python Battleship/src/benchmark.py --compare`.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the Battleship hot paths.")
+    parser.add_argument("benchmarks", nargs="*", help="benchmarks to run (default: all); prefixes match")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions per benchmark (default: 5)")
+    parser.add_argument("--save", nargs="?", const=BASELINE_PATH, help="save the results as a baseline")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, help="compare against a baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"allowed slowdown before failing (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return
+
+    names = [name for name in BENCHMARKS
+             if not args.benchmarks or any(name.startswith(prefix) for prefix in args.benchmarks)]
+    results = run(names, args.repeat)
+
+    for name, result in results.items():
+        print(f"{name:32} {result['ns_per_op']:>14,.1f} ns/op")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "benchmarks": results}, file, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    failed = False
+    for module, seconds, budget in over_budget(results):
+        print(f"Importing {module} took {seconds * 1e3:.1f} ms, over its budget of {budget * 1e3:.0f} ms")
+        failed = True
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["benchmarks"]
+
+        regressions = 0
+        print(f"\nCompared with {args.compare} (threshold {args.threshold:.0%}):")
+        for name, old, new, change in compare(results, baseline, args.threshold):
+            regressed = change > args.threshold
+            regressions += regressed
+            print(f"{name:32} {old:>14,.1f} -> {new:>14,.1f} ns/op {change:>+8.1%}"
+                  + ("  REGRESSION" if regressed else ""))
+
+        if regressions:
+            print(f"{regressions} metric(s) regressed by more than {args.threshold:.0%}")
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
 # Filename: board.py
 # Description: This module defines the Board class for a Battleship game. It manages the game board, placing ships, handling attacks, and checking if all ships are sunk.
+# The board state is stored as integer bitmasks (one bit per cell, bit index = row * size + column) so that hit, miss,
+# duplicate and overlap checks are single bitwise operations. The character grid is derived from the masks for display.
+# An occupancy index from cell to ship, per-ship remaining-hit counters and a count of unsunk ships make firing,
+# placement validation and the win check constant-time regardless of the number of ships.
+# Very large boards use SparseBoard instead, which stores only the ship cells and the cells that were fired at, so
+# its memory grows with the number of ships and shots rather than with the board area.
 # Inputs: A ship object to place on the board, and coordinates for firing at the board.
 # Output: The visual representation of the board, hit/miss feedback, and whether all ships are sunk.
 # Other sources for the code: 
@@ -7,25 +13,175 @@
 # Creation Date: 
 
 from ship import Ship  # Importing the Ship class, which represents each ship placed on the board.
+from renderer import column_label, get_renderer  # Column letters and the buffered board renderer
+
+# Default width and height of a board (standard Battleship board dimensions)
+DEFAULT_BOARD_SIZE = 10
+
+# Boards larger than this use the sparse backend, since every bitmask operation costs O(area) on the dense one
+SPARSE_BOARD_SIZE = 128
+
+
+def parse_position(text):
+    """
+    Parses a position in the 'LetterNumber' format (e.g. B3 or AB12) into 0-based board coordinates.
+    Args:
+        text: The position typed by the player. Letters may be lower case.
+    Returns:
+        The (row, column) tuple, or None if the text is not in the 'LetterNumber' format. The coordinates
+        are not checked against the bounds of any board.
+    """
+    text = text.strip().upper()
+    letters = len(text) - len(text.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    if not letters or not text[letters:].isdigit():
+        return None
+
+    # Convert the letters into a 0-based column index (A=0, B=1, ..., Z=25, AA=26, ...)
+    y = 0
+    for letter in text[:letters]:
+        y = y * 26 + ord(letter) - 64  # ord('A') is 65
+    return int(text[letters:]) - 1, y - 1  # Convert the number part to a 0-based row index
+
+
+def make_board(size=DEFAULT_BOARD_SIZE, verbose=True):
+    """
+    Creates an empty board of the given size, using the sparse backend for very large boards.
+    """
+    if size > SPARSE_BOARD_SIZE:
+        return SparseBoard(size, verbose)
+    return Board(size, verbose)
+
 
 class Board:
-    def __init__(self):
+    # Fixed attribute layout, to keep boards small when many games are in flight. Renderers cache rows in a
+    # WeakKeyDictionary keyed by board, hence __weakref__.
+    __slots__ = ("size", "ships", "occupancy", "ships_remaining", "ship_mask", "hit_mask", "miss_mask", "verbose",
+                 "row_versions", "observer", "__weakref__")
+
+    def __init__(self, size=DEFAULT_BOARD_SIZE, verbose=True):
         """
         Initializes a Board instance with a default size of 10x10, representing the Battleship game grid.
         Ships are stored in a list for placement and hit detection.
+        Args:
+            size: The width and height of the board.
+            verbose: If False, the board does not print placement and hit messages (used for headless games).
         """
-        self.size = 10  # Board size is 10x10 (standard Battleship board dimensions)
-        self.grid = [['~' for _ in range(self.size)] for _ in range(self.size)]  # Grid initialized with water cells ('~')
+        self.size = size  # Board size (10x10 by default)
         self.ships = []  # List to store ships placed on the board
+        self.occupancy = {}  # Maps the bit index of each ship cell to the ship occupying it
+        self.ships_remaining = 0  # Number of placed ships that have not been sunk
+        self.ship_mask = 0  # Bitmask of every cell occupied by a ship
+        self.hit_mask = 0  # Bitmask of every cell that has been hit
+        self.miss_mask = 0  # Bitmask of every cell that has been missed
+        self.verbose = verbose  # Whether to print feedback messages to the console
+        self.row_versions = [0] * size  # Incremented whenever a row changes, so renderers can cache rows
+        self.observer = None  # Optional object told about every placement and shot (e.g. a game recorder)
+
+    def reset(self):
+        """
+        Empties the board for a new game: removes every ship, hit and miss. The board keeps its size, verbosity
+        and observer, and reuses its containers instead of allocating new ones.
+        """
+        self.ships.clear()
+        self.occupancy.clear()
+        self.ships_remaining = 0
+        self.ship_mask = 0
+        self.hit_mask = 0
+        self.miss_mask = 0
+        # Every row changed, so renderers must not reuse the rows they cached for the previous game
+        for x in range(self.size):
+            self.row_versions[x] += 1
+
+    def bit(self, x, y):
+        """
+        Returns the bitmask with only the bit of cell (x, y) set.
+        """
+        return 1 << (x * self.size + y)
+
+    def cell(self, x, y):
+        """
+        Returns the display character of cell (x, y): 'X' for a hit, 'O' for a miss, 'S' for an unhit ship
+        and '~' for water.
+        """
+        bit = self.bit(x, y)
+        if self.hit_mask & bit:
+            return 'X'
+        if self.miss_mask & bit:
+            return 'O'
+        if self.ship_mask & bit:
+            return 'S'
+        return '~'
+
+    def row(self, x):
+        """
+        Returns the display characters of row x as a list.
+        """
+        return [self.cell(x, y) for y in range(self.size)]
+
+    @property
+    def grid(self):
+        """
+        Character view of the board built from the bitmasks, as a list of rows. Used for rendering only.
+        """
+        return [self.row(x) for x in range(self.size)]
+
+    def is_hit(self, x, y):
+        """
+        Returns True if cell (x, y) has been hit.
+        """
+        return bool(self.hit_mask & self.bit(x, y))
+
+    def is_miss(self, x, y):
+        """
+        Returns True if cell (x, y) has been missed.
+        """
+        return bool(self.miss_mask & self.bit(x, y))
+
+    def is_guessed(self, x, y):
+        """
+        Returns True if cell (x, y) has already been fired at (hit or miss).
+        """
+        return bool((self.hit_mask | self.miss_mask) & self.bit(x, y))
+
+    def has_ship(self, x, y):
+        """
+        Returns True if a ship occupies cell (x, y).
+        """
+        return bool(self.ship_mask & self.bit(x, y))
+
+    def ship_at(self, x, y):
+        """
+        Returns the ship occupying cell (x, y), or None if the cell is water.
+        """
+        return self.occupancy.get(x * self.size + y)
+
+    def mark_ship(self, ship):
+        """
+        Records the cells of a newly placed ship in the ship mask.
+        """
+        self.ship_mask |= ship.get_mask(self.size)
+
+    def mark_guess(self, x, y, hit):
+        """
+        Records the result of a guess on a guess-tracking board.
+        Args:
+            x: The row of the guess.
+            y: The column of the guess.
+            hit: True if the guess hit a ship, False if it missed.
+        """
+        if hit:
+            self.hit_mask |= self.bit(x, y)
+        else:
+            self.miss_mask |= self.bit(x, y)
+        self.row_versions[x] += 1
 
     def print_board(self):
         """
         Prints the current state of the board for one player.
         Displays row numbers (1-10) and column letters (A-J) along with the current state of each cell.
+        The whole board is written in one call by the shared renderer.
         """
-        print("   " + " ".join(chr(65 + i) for i in range(self.size)))  # Print column headers (A-J)
-        for i in range(self.size):
-            print(f"{str(i + 1).rjust(2, ' ')} " + " ".join(self.grid[i]))  # Print row numbers (1-10) and grid contents
+        get_renderer().print_board(self)
 
     def print_two_boards(self, other, name="Your"):
         """
@@ -35,16 +191,7 @@ class Board:
             other: The other board to compare against (e.g., the enemy board).
             name: The name of the current player.
         """
-        column_labels = " ".join(chr(65 + i) for i in range(self.size))  # Prepare column labels (A-J)
-        print(f"   {name}'s Guesses".ljust(28) + f"{name}'s Placements")  # Print the title of each board
-        print("   " + column_labels + "      " + column_labels)  # Print column labels for both boards
-
-        # Print row numbers and the corresponding grid for both boards side by side
-        for i in range(self.size):
-            print(
-                f"{str(i + 1).rjust(2, ' ')} " + " ".join(self.grid[i]),  # Current player's guess grid
-                f"{str(i + 1).rjust(4, ' ')} " + " ".join(other.grid[i])   # Current player's own placement grid
-            )
+        get_renderer().print_two_boards(self, other, name)
 
     def place_ship(self, ship):
         """
@@ -57,21 +204,39 @@ class Board:
         
         # Check if the ship fits within the board's boundaries
         if not ship.is_within_bounds(self.size):
-            print("Ship cannot be placed. It exceeds the board limits.")
+            if self.verbose:
+                print("Ship cannot be placed. It exceeds the board limits.")
             return False
 
         # Check if the ship overlaps with any previously placed ships
-        for existing_ship in self.ships:
-            if ship.overlaps_with(existing_ship):
-                print("Ship overlaps with another ship. Choose a different location.")
+        indices = [x * self.size + y for x, y in ship.coordinates]
+        for index in indices:
+            if index in self.occupancy:
+                if self.verbose:
+                    print("Ship overlaps with another ship. Choose a different location.")
                 return False
 
-        # If valid, place the ship on the board by marking its coordinates with 'S'
+        # If valid, place the ship on the board
+        self.add_ship(ship)
+        return True  # Return True if ship placement is successful
+
+    def add_ship(self, ship):
+        """
+        Places a ship that is known to fit (e.g. one of a fleet drawn from the placement tables) without checking
+        the bounds or overlaps again, by indexing its cells and marking them as ship cells.
+        Args:
+            ship: An instance of the Ship class that lies within the board and overlaps no placed ship.
+        """
+        size = self.size
         for x, y in ship.coordinates:
-            self.grid[x][y] = 'S'  # 'S' represents a ship on the board
-        
+            self.occupancy[x * size + y] = ship
+            self.row_versions[x] += 1
+        self.mark_ship(ship)
+
         self.ships.append(ship)  # Add the placed ship to the list of ships on the board
-        return True  # Return True if ship placement is successful
+        self.ships_remaining += 1
+        if self.observer is not None:
+            self.observer.on_place_ship(self, ship)
 
     def receive_fire(self, x, y):
         """
@@ -82,28 +247,125 @@ class Board:
         Returns:
             True if the attack hits a ship, False if it misses.
         """
-        # Check each ship to see if the coordinates match any ship's location
-        for ship in self.ships:
-            if (x, y) in ship.coordinates and not ship.destroyed:
-                self.grid[x][y] = 'X'  # Mark a hit with 'X'
-                print(f"Ship at {x+1},{chr(y+65)} has been hit!")  # Notify player of the hit
+        # Look up the ship occupying the cell, if any
+        ship = self.occupancy.get(x * self.size + y)
+        if ship is not None and not ship.destroyed:
+            # Only the first hit on a cell counts towards sinking the ship
+            if not self.is_hit(x, y):
+                self.mark_guess(x, y, True)  # Mark a hit
+                ship.hits_remaining -= 1
+                if self.verbose:
+                    print(f"Ship at {x+1},{column_label(y)} has been hit!")  # Notify player of the hit
 
                 # If all parts of the ship have been hit, mark the ship as destroyed
-                if all(self.grid[i][j] == 'X' for i, j in ship.coordinates):
+                if not ship.hits_remaining:
                     ship.destroyed = True
-                    print("Ship was sunk!")  # Notify player that the ship was sunk
+                    self.ships_remaining -= 1
+                    if self.verbose:
+                        print("Ship was sunk!")  # Notify player that the ship was sunk
 
-                return True  # Return True to indicate a successful hit
+            if self.observer is not None:
+                self.observer.on_fire(self, x, y, True, ship.destroyed)
+            return True  # Return True to indicate a successful hit
         
-        # If no ship was hit, mark the cell as a miss with 'O'
-        if self.grid[x][y] == '~':
-            self.grid[x][y] = 'O'  # 'O' represents a missed shot
+        # If no ship was hit, mark the cell as a miss
+        if not self.is_hit(x, y):
+            self.mark_guess(x, y, False)
+        if self.observer is not None:
+            self.observer.on_fire(self, x, y, False, False)
         return False  # Return False if the attack missed
 
+    def restore(self, hit_mask, miss_mask):
+        """
+        Replaces the hits and misses of the board (e.g. from a saved snapshot) and recomputes which of the
+        placed ships are sunk.
+        Args:
+            hit_mask: Bitmask of the cells that have been hit.
+            miss_mask: Bitmask of the cells that have been missed.
+        """
+        self.hit_mask = hit_mask
+        self.miss_mask = miss_mask
+        self.recount_ships()
+
+    def recount_ships(self):
+        """
+        Recomputes the remaining hits of every ship and the number of ships afloat from the hit cells.
+        """
+        self.ships_remaining = 0
+        for ship in self.ships:
+            ship.hits_remaining = sum(not self.is_hit(x, y) for x, y in ship.coordinates)
+            ship.destroyed = not ship.hits_remaining
+            self.ships_remaining += not ship.destroyed
+        self.row_versions = [version + 1 for version in self.row_versions]
+
     def all_ships_sunk(self):
         """
         Checks if all the ships on the board have been sunk.
         Returns:
             True if all ships are destroyed, otherwise False.
         """
-        return all(ship.destroyed for ship in self.ships)  # Check if every ship in the ships list is destroyed
+        return not self.ships_remaining  # No placed ship is left afloat
+
+
+class SparseBoard(Board):
+    """
+    Board backend for very large grids. Instead of bitmasks spanning the whole board it keeps the ship cells in
+    the occupancy index and the cells that were fired at in sets, so memory grows with the number of ships and
+    shots rather than with the board area. Cells are identified by the same index as Board (row * size + column).
+    """
+
+    __slots__ = ("hits", "misses")
+
+    def __init__(self, size=DEFAULT_BOARD_SIZE, verbose=True):
+        """
+        Initializes an empty sparse board.
+        Args:
+            size: The width and height of the board.
+            verbose: If False, the board does not print placement and hit messages (used for headless games).
+        """
+        super().__init__(size, verbose)
+        self.hits = set()  # Indices of the cells that have been hit
+        self.misses = set()  # Indices of the cells that have been missed
+
+    def reset(self):
+        super().reset()
+        self.hits.clear()
+        self.misses.clear()
+
+    def cell(self, x, y):
+        index = x * self.size + y
+        if index in self.hits:
+            return 'X'
+        if index in self.misses:
+            return 'O'
+        if index in self.occupancy:
+            return 'S'
+        return '~'
+
+    def is_hit(self, x, y):
+        return x * self.size + y in self.hits
+
+    def is_miss(self, x, y):
+        return x * self.size + y in self.misses
+
+    def is_guessed(self, x, y):
+        index = x * self.size + y
+        return index in self.hits or index in self.misses
+
+    def has_ship(self, x, y):
+        return x * self.size + y in self.occupancy
+
+    def mark_ship(self, ship):
+        pass  # The occupancy index already holds every ship cell
+
+    def restore(self, hit_mask, miss_mask):
+        self.hits = {index for index in range(hit_mask.bit_length()) if hit_mask >> index & 1}
+        self.misses = {index for index in range(miss_mask.bit_length()) if miss_mask >> index & 1}
+        self.recount_ships()
+
+    def mark_guess(self, x, y, hit):
+        if hit:
+            self.hits.add(x * self.size + y)
+        else:
+            self.misses.add(x * self.size + y)
+        self.row_versions[x] += 1
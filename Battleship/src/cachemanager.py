@@ -0,0 +1,23 @@
+# Filename: cachemanager.py
+# Description: Manager process serving one DecisionCache to every worker process of a pool. The manager class is
+# defined at module level so that it can be pickled when the manager process is started with spawn (the default
+# on macOS and Windows). multiprocessing.managers takes tens of milliseconds to import, so this module is kept
+# apart from decisioncache and only imported by programs that share a cache (see decisioncache.cache_manager).
+# Inputs: The capacity of the shared cache.
+# Outputs: Proxies of a DecisionCache living in the manager process.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+from multiprocessing.managers import BaseManager  # Serves objects to other processes
+
+from decisioncache import DecisionCache  # The cache served to the workers
+
+
+class CacheManager(BaseManager):
+    """
+    Manager whose DecisionCache(capacity) returns a proxy of a cache living in the manager process.
+    """
+
+
+CacheManager.register("DecisionCache", DecisionCache,
+                      exposed=("get", "put", "store", "clear", "hit_rate", "stats", "summary"))
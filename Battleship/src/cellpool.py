@@ -0,0 +1,99 @@
+# Filename: cellpool.py
+# Description: Pool of the board cells a player has not fired at yet, for AIs that pick random targets. Drawing a
+# random cell and removing a cell fired at by other means are both O(1) swap-removes, so every draw costs the same
+# from the first move to the last instead of retrying over already guessed cells. The pool is a virtual
+# Fisher-Yates array: only the slots that were swapped are stored, so its memory grows with the number of shots
+# rather than with the board area, even on 10,000x10,000 boards.
+# Inputs: The board size, cells to draw and cells to remove.
+# Outputs: Uniformly random untargeted cells, as bit indices (row * size + column).
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import random  # To draw random cells
+
+
+class CellPool:
+    """
+    The set of untargeted cells of a board, supporting O(1) uniform random draws and removals.
+
+    The cells are kept in a virtual array whose first `remaining` slots hold the untargeted cells. A slot that
+    was never swapped holds the cell with its own index, so only the swapped slots are stored.
+
+    Attributes:
+        size (int): The width and height of the board.
+        remaining (int): The number of untargeted cells.
+    """
+
+    def __init__(self, size):
+        """
+        Args:
+            size (int): The width and height of the board.
+        """
+        self.size = size
+        self.remaining = size * size
+        self.slots = {}      # slot -> cell, for the live slots holding another cell than their own index
+        self.positions = {}  # cell -> slot, for the cells not held by the slot with their own index
+
+    def __len__(self):
+        return self.remaining
+
+    def reset(self):
+        """
+        Puts every cell of the board back into the pool, for a new game.
+        """
+        self.remaining = self.size * self.size
+        self.slots.clear()
+        self.positions.clear()
+
+    def __contains__(self, cell):
+        slot = self.positions.get(cell, cell)
+        return slot < self.remaining and self.slots.get(slot, slot) == cell
+
+    def move(self, cell, slot):
+        """
+        Records that a cell is held by a slot.
+        """
+        if cell == slot:
+            self.positions.pop(cell, None)
+            self.slots.pop(slot, None)
+        else:
+            self.positions[cell] = slot
+            if slot < self.remaining:
+                self.slots[slot] = cell
+            else:
+                self.slots.pop(slot, None)  # Slots past the live region are never read
+
+    def remove_slot(self, slot):
+        """
+        Removes the cell held by a live slot by swapping the last live cell into it, and returns the cell.
+        """
+        last = self.remaining - 1
+        cell = self.slots.get(slot, slot)
+        last_cell = self.slots.get(last, last)
+
+        self.remaining = last
+        if slot != last:
+            self.move(last_cell, slot)  # The last live cell fills the gap
+        self.move(cell, last)
+        return cell
+
+    def draw(self, rng=random):
+        """
+        Removes and returns a uniformly random untargeted cell.
+
+        Args:
+            rng (random.Random): The random number generator.
+
+        Returns:
+            int: The bit index of the cell, or None if every cell has been targeted.
+        """
+        if not self.remaining:
+            return None
+        return self.remove_slot(int(rng.random() * self.remaining))
+
+    def discard(self, cell):
+        """
+        Removes a cell if it is still untargeted (e.g. after a targeted shot at it).
+        """
+        if cell in self:
+            self.remove_slot(self.positions.get(cell, cell))
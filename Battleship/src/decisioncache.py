@@ -0,0 +1,198 @@
+# Filename: decisioncache.py
+# Description: Transposition cache of AI decisions. An AI whose move depends only on what it has observed (the hit
+# and miss pattern of its guess board and the ships it has sunk) can look the move up by a compact hash of that
+# observation instead of recomputing it; across many simulated games the same observations come up again and
+# again, especially in the opening and after misses. The cache evicts the least recently used entries once it is
+# full and counts its hits and misses. A cache manager serves one cache to every worker process of a pool, with a
+# small local cache in front of it so the common observations never leave the process. Caches are locked, so the
+# AIs of several threads (e.g. the sessions of the game server) can share one.
+# Inputs: Observation keys and the decisions computed for them.
+# Outputs: Cached decisions, and hit-rate statistics.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import threading                     # Lock of every cache, for AIs running on several threads
+from collections import OrderedDict  # Entries in least recently used order
+
+# Default number of decisions kept by a cache
+DEFAULT_CAPACITY = 1 << 16
+
+# Default number of decisions kept in front of a shared cache by every worker process
+LOCAL_CAPACITY = 1 << 12
+
+
+def observation_key(strategy, player):
+    """
+    Returns a 16 byte hash of everything an AI has observed: its guess board's hit and miss masks, the cells and
+    sizes of the ships it has sunk, and the game settings.
+
+    Args:
+        strategy (str): The name of the strategy, so strategies sharing a cache never see each other's moves.
+        player (AIPlayer): The AI, whose guess board must be a dense Board.
+
+    Returns:
+        bytes: The key of the observation.
+    """
+    import hashlib  # Imported on first use, since it is slow to import and only the cached AIs need it
+
+    guesses = player.guesses
+    length = (guesses.size * guesses.size + 7) // 8
+    key = hashlib.blake2b(digest_size=16)
+    key.update(f"{strategy}:{guesses.size}:{player.num_ships}:".encode())
+    key.update(bytes(sorted(player.sunk_sizes)))
+    for mask in (guesses.hit_mask, guesses.miss_mask, player.sunk_mask):
+        key.update(mask.to_bytes(length, "little"))
+    return key.digest()
+
+
+class DecisionCache:
+    """
+    Bounded least recently used map from observation keys to decisions. A cache with a parent counts the lookups
+    the parent answered as hits, while the parent only sees the lookups that missed locally.
+
+    Attributes:
+        capacity (int): The largest number of decisions kept.
+        parent (DecisionCache): A (usually shared) cache consulted on misses and given every new decision, or None.
+        hits (int): The number of lookups answered by this cache or its parent.
+        misses (int): The number of lookups that found nothing.
+        evictions (int): The number of decisions dropped to make room.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, parent=None):
+        """
+        Args:
+            capacity (int): The largest number of decisions kept.
+            parent (DecisionCache): A cache to consult on misses, e.g. a proxy of a shared cache.
+        """
+        self.capacity = capacity
+        self.parent = parent
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.RLock()  # Guards the entries and statistics; the parent has its own lock
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getstate__(self):
+        # Locks cannot be pickled, e.g. when a cache is handed to pool workers started with spawn
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    def get(self, key):
+        """
+        Returns the decision cached for a key, or None.
+        """
+        with self.lock:
+            decision = self.entries.get(key)
+            if decision is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return decision
+
+        # The parent is not asked while holding the lock, since it may be a proxy in another process
+        decision = self.parent.get(key) if self.parent is not None else None
+        with self.lock:
+            if decision is not None:
+                self.store(key, decision)
+                self.hits += 1
+            else:
+                self.misses += 1
+        return decision
+
+    def put(self, key, decision):
+        """
+        Caches the decision computed for a key (and passes it on to the parent).
+        """
+        self.store(key, decision)
+        if self.parent is not None:
+            self.parent.put(key, decision)
+
+    def store(self, key, decision):
+        """
+        Adds a decision to this cache, evicting the least recently used one when full.
+        """
+        with self.lock:
+            self.entries[key] = decision
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drops every decision and resets the statistics.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def hit_rate(self):
+        """
+        Returns the fraction of lookups answered from the cache.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """
+        Returns the statistics of the cache as a dict.
+        """
+        with self.lock:
+            return {"size": len(self.entries), "capacity": self.capacity, "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "hit_rate": self.hit_rate()}
+
+    def summary(self, name="decision cache"):
+        """
+        Formats the statistics of the cache in one line.
+        """
+        stats = self.stats()
+        return (f"{name}: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%}), "
+                f"{stats['size']}/{stats['capacity']} entries, {stats['evictions']} evictions")
+
+
+def cache_manager():
+    """
+    Returns a new manager serving DecisionCache objects to other processes; use it as a context manager to start
+    and stop its process. manager.DecisionCache(capacity) returns a proxy with the get, put, clear, stats and
+    summary methods of a cache living in the manager. multiprocessing.managers takes tens of milliseconds to
+    import, so it is only imported by programs that share a cache.
+    """
+    from cachemanager import CacheManager
+    return CacheManager()
+
+
+# Cache used by the AI players of this process, created by get_cache()
+_cache = None
+
+
+def get_cache():
+    """
+    Returns the decision cache of this process, creating an empty one on the first call.
+    """
+    global _cache
+    if _cache is None:
+        _cache = DecisionCache()
+    return _cache
+
+
+def set_cache(cache):
+    """
+    Replaces the decision cache of this process, e.g. with a smaller one or one backed by a shared cache.
+    """
+    global _cache
+    _cache = cache
+
+
+def use_shared_cache(shared, capacity=LOCAL_CAPACITY):
+    """
+    Puts a local cache of the given capacity in front of a shared cache proxy for the AIs of this process. Used
+    as the initializer of pool workers.
+    """
+    set_cache(DecisionCache(capacity, parent=shared))
@@ -0,0 +1,210 @@
+# Filename: density.py
+# Description: Incrementally updated probability-density map for Battleship targeting. Every cell is scored by the
+# number of legal placements of the opponent's remaining ships that cover it. Placements that cross a missed cell or
+# a sunk ship are illegal, and placements through hits on ships that are still afloat are weighted up so the map
+# focuses on finishing damaged ships. After every shot only the placements that cover the shot cell are re-scored,
+# and the best cell is kept in a lazy max-heap, so the cost of a move does not depend on the size of the board.
+# Inputs: The board size, the sizes of the opponent's ships and the results of each shot.
+# Outputs: The unshot cell covered by the most (weighted) legal placements.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import heapq  # Lazy max-heap of cell scores
+
+# Weight multiplier of a placement for every hit (on a ship that is still afloat) it covers
+HIT_WEIGHT = 50
+
+
+class DensityMap:
+    """
+    Placement density of the opponent's remaining ships over a square board.
+
+    Attributes:
+        size (int): The width and height of the board.
+        remaining (dict): Maps each ship size to the number of unsunk ships of that size.
+        score (list): The weighted number of legal placements covering each cell (bit index row * size + column).
+    """
+
+    def __init__(self, size, ship_sizes, hit_weight=HIT_WEIGHT, misses=(), hits=(), sunk_ships=()):
+        """
+        Builds the density map of a board in one pass, untouched unless shots are given. Building the map of a
+        position directly is cheaper than replaying its shots one by one.
+
+        Args:
+            size (int): The width and height of the board.
+            ship_sizes (iterable): The size of every ship of the opponent's fleet.
+            hit_weight (int): Weight multiplier of a placement for every open hit it covers.
+            misses (iterable): The (x, y) cells missed so far.
+            hits (iterable): The (x, y) cells hit so far, including those of sunk ships.
+            sunk_ships (iterable): The (x, y) coordinates of every ship sunk so far.
+        """
+        self.size = size
+        self.hit_weight = hit_weight
+        self.remaining = {}
+        for length in ship_sizes:
+            self.remaining[length] = self.remaining.get(length, 0) + 1
+
+        cells = size * size
+        self.shot = bytearray(cells)      # Cells that have been fired at
+        self.blocked = bytearray(cells)   # Missed cells and cells of sunk ships
+        self.open_hit = bytearray(cells)  # Hit cells of ships that are still afloat
+
+        for x, y in misses:
+            self.shot[x * size + y] = self.blocked[x * size + y] = 1
+        for x, y in hits:
+            self.shot[x * size + y] = self.open_hit[x * size + y] = 1
+        for coordinates in sunk_ships:
+            if self.remaining.get(len(coordinates)):
+                self.remaining[len(coordinates)] -= 1
+            for x, y in coordinates:
+                self.blocked[x * size + y] = 1
+                self.open_hit[x * size + y] = 0
+        shots = any(self.shot)
+
+        # Density of each ship size on its own, and the total weighted by the number of ships of each size
+        self.density = {length: [0] * cells for length in self.remaining}
+        self.score = [0] * cells
+        for length, count in self.remaining.items():
+            density = self.density[length]
+            for cells_covered in self.all_placements(length):
+                weight = self.weight(cells_covered) if shots else 1
+                if not weight:
+                    continue
+                for index in cells_covered:
+                    density[index] += weight
+            if count:
+                for index in range(cells):
+                    self.score[index] += count * density[index]
+
+        self.rebuild_heap()
+
+    def all_placements(self, length):
+        """
+        Yields the cell indices of every in-bounds placement of a ship of the given length.
+        """
+        size = self.size
+        for x in range(size):
+            for y in range(size - length + 1):
+                start = x * size + y
+                yield range(start, start + length)  # Horizontal
+        if length > 1:  # A single cell ship covers the same cells in both orientations
+            for x in range(size - length + 1):
+                for y in range(size):
+                    start = x * size + y
+                    yield range(start, start + length * size, size)  # Vertical
+
+    def placements_covering(self, x, y, length):
+        """
+        Yields the cell indices of every in-bounds placement of a ship of the given length that covers (x, y).
+        """
+        size = self.size
+        for first in range(max(0, y - length + 1), min(y, size - length) + 1):
+            start = x * size + first
+            yield range(start, start + length)  # Horizontal
+        if length > 1:
+            for first in range(max(0, x - length + 1), min(x, size - length) + 1):
+                start = first * size + y
+                yield range(start, start + length * size, size)  # Vertical
+
+    def weight(self, cells):
+        """
+        Returns the weight of a placement: zero if it is illegal, otherwise hit_weight to the power of the
+        number of open hits it covers.
+        """
+        hits = 0
+        for index in cells:
+            if self.blocked[index]:
+                return 0
+            hits += self.open_hit[index]
+        return self.hit_weight ** hits
+
+    def update_placements(self, x, y, change):
+        """
+        Re-scores every legal placement of a remaining ship that covers (x, y).
+
+        Args:
+            x (int): The row of the cell whose state is about to change.
+            y (int): The column of the cell whose state is about to change.
+            change (callable): Maps the current weight of a placement to the change of its weight.
+        """
+        changed = set()
+        for length, count in self.remaining.items():
+            if not count:
+                continue
+            density = self.density[length]
+            for cells in self.placements_covering(x, y, length):
+                weight = self.weight(cells)
+                if not weight:
+                    continue
+                delta = change(weight)
+                for index in cells:
+                    density[index] += delta
+                    self.score[index] += count * delta
+                changed.update(cells)
+
+        # Push the new scores of the affected cells; outdated heap entries are skipped when popped
+        for index in changed:
+            if not self.shot[index]:
+                heapq.heappush(self.heap, (-self.score[index], index))
+
+    def record_miss(self, x, y):
+        """
+        Updates the map after a miss at (x, y): every placement through the cell becomes illegal.
+        """
+        index = x * self.size + y
+        self.shot[index] = 1
+        self.update_placements(x, y, lambda weight: -weight)
+        self.blocked[index] = 1
+
+    def record_hit(self, x, y):
+        """
+        Updates the map after a hit at (x, y): every placement through the cell gains another hit weight.
+        """
+        index = x * self.size + y
+        self.shot[index] = 1
+        self.update_placements(x, y, lambda weight: weight * (self.hit_weight - 1))
+        self.open_hit[index] = 1
+
+    def record_sunk(self, coordinates):
+        """
+        Updates the map after a ship has been sunk. Its size is removed from the remaining fleet and its cells
+        become illegal for the other ships. Must be called after record_hit for the final hit.
+
+        Args:
+            coordinates (list): The (x, y) cells of the sunk ship.
+        """
+        length = len(coordinates)
+        if self.remaining.get(length):
+            self.remaining[length] -= 1
+            density = self.density[length]
+            for index, value in enumerate(density):
+                if value:
+                    self.score[index] -= value
+
+        for x, y in coordinates:
+            index = x * self.size + y
+            self.update_placements(x, y, lambda weight: -weight)
+            self.blocked[index] = 1
+            self.open_hit[index] = 0
+
+        # Every score may have changed, so start over with a compact heap
+        self.rebuild_heap()
+
+    def rebuild_heap(self):
+        """
+        Rebuilds the max-heap from the current scores of the unshot cells.
+        """
+        self.heap = [(-score, index) for index, score in enumerate(self.score) if not self.shot[index]]
+        heapq.heapify(self.heap)
+
+    def best(self):
+        """
+        Returns the (x, y) unshot cell with the highest score, or None if every cell has been fired at.
+        """
+        heap = self.heap
+        while heap:
+            score, index = heap[0]
+            if not self.shot[index] and -score == self.score[index]:
+                return divmod(index, self.size)
+            heapq.heappop(heap)  # Outdated entry or cell already fired at
+        return None
@@ -0,0 +1,398 @@
+# Filename: export.py
+# Description: Streams the turns of simulated games to a columnar dataset on disk, for training targeting policies.
+# An exporter observes both boards of a game like the game recorder does and appends one row per shot: what the
+# shooter had observed before the shot (the hit, miss and sunk-ship bitmasks of its guesses and the ships still
+# afloat), the cell it chose and the result. Rows go into preallocated NumPy column buffers; when a buffer holds
+# a chunk of rows it is handed to a background thread that writes it as a shard of .npy files, one per column,
+# while the games go on. At most a few chunks are ever held in memory, however many games are exported. The ship
+# placements are exported the same way in a second table.
+#
+# Dataset layout:
+#   dataset.json                     board size, columns and shards of every table
+#   turns/<shard>/<column>.npy       one row per shot
+#   placements/<shard>/<column>.npy  one row per placed ship
+#
+# Inputs: The players of the games to export, or a dataset directory to read.
+# Outputs: Dataset directories, and memory-mapped shards of their columns.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import json       # Dataset description
+import os         # Shard directories
+import queue      # Chunks waiting for the writer thread
+import struct     # Packs every row into the chunk buffer in one call
+import threading  # Background writer
+
+import numpy as np  # Column buffers and .npy shards
+
+from board import SPARSE_BOARD_SIZE  # Largest board with bitmasks to export
+from gamelog import HIT, MISS, SUNK, mask_bytes  # Shot results, shared with the game logs
+
+# Rows per shard
+DEFAULT_CHUNK_ROWS = 1 << 16
+
+# Full chunks waiting to be written before the games wait for the writer
+DEFAULT_QUEUE_CHUNKS = 2
+
+# Ship sizes counted by the remaining column (fleets of more than 5 ships repeat the sizes 1 to 5)
+MAX_SHIP_SIZE = 5
+
+# Strategy of players without an AI difficulty
+HUMAN = 255
+
+# struct format character of every scalar column type
+STRUCT_CODES = {"int64": "q", "uint16": "H", "uint8": "B"}
+
+
+def turn_columns(board_size):
+    """
+    Returns the (dtype, shape of one row) of every column of the turns table.
+    """
+    length = mask_bytes(board_size)
+    return {
+        "game": ("int64", ()),                    # Index of the game in the dataset
+        "turn": ("uint16", ()),                   # Shots the shooter had fired before this one
+        "player": ("uint8", ()),                  # 0 if the player guessing first fired, 1 otherwise
+        "strategy": ("uint8", ()),                # AIDifficulties value of the shooter, HUMAN if none
+        "num_ships": ("uint8", ()),               # Ships per player
+        "hit_mask": ("uint8", (length,)),         # Hits observed before the shot, as a little-endian bitmask
+        "miss_mask": ("uint8", (length,)),        # Misses observed before the shot
+        "sunk_mask": ("uint8", (length,)),        # Cells of the ships sunk before the shot
+        "remaining": ("uint8", (MAX_SHIP_SIZE,)),  # Ships of each size (1 to 5) afloat before the shot
+        "row": ("uint16", ()),                    # Cell fired at
+        "column": ("uint16", ()),
+        "result": ("uint8", ()),                  # MISS, HIT or SUNK
+    }
+
+
+def placement_columns():
+    """
+    Returns the (dtype, shape of one row) of every column of the placements table.
+    """
+    return {
+        "game": ("int64", ()),
+        "player": ("uint8", ()),       # Owner of the ship, 0 for the player guessing first
+        "strategy": ("uint8", ()),     # AIDifficulties value of the owner, HUMAN if none
+        "num_ships": ("uint8", ()),
+        "size": ("uint8", ()),
+        "row": ("uint16", ()),         # Starting cell of the ship
+        "column": ("uint16", ()),
+        "orientation": ("uint8", ()),  # 0 for horizontal, 1 for vertical
+    }
+
+
+class ShardWriter:
+    """
+    Writes full chunks of a table as shards on a background thread. put() only blocks while the queue of
+    chunks waiting to be written is full, which bounds the memory used by the export.
+
+    Attributes:
+        directory (str): The directory of the table.
+        prefix (str): Prefix of the shard names, to keep the shards of different writers apart.
+        shards (list): The names of the shards written, with their number of rows.
+    """
+
+    def __init__(self, directory, prefix="", queue_chunks=DEFAULT_QUEUE_CHUNKS):
+        self.directory = directory
+        self.prefix = prefix
+        self.shards = []
+        self.error = None
+        os.makedirs(directory, exist_ok=True)
+        self.queue = queue.Queue(maxsize=queue_chunks)
+        self.thread = threading.Thread(target=self.run, name=f"shard writer {directory}", daemon=True)
+        self.thread.start()
+
+    def put(self, columns, rows):
+        """
+        Queues the first rows of a chunk of columns for writing. The columns belong to the writer from now on.
+        """
+        if self.error is not None:
+            raise self.error
+        self.queue.put((columns, rows))
+
+    def run(self):
+        """
+        Writes queued chunks until close() queues None.
+        """
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if self.error is not None:
+                continue
+            columns, rows = item
+            name = f"{self.prefix}{len(self.shards):05d}"
+            try:
+                path = os.path.join(self.directory, name)
+                os.makedirs(path, exist_ok=True)
+                for column, values in columns.items():
+                    np.save(os.path.join(path, column + ".npy"), values[:rows])
+                self.shards.append((name, rows))
+            except OSError as error:
+                self.error = error  # Raised by the next put() or by close()
+
+    def close(self):
+        """
+        Waits for every queued chunk to be written and stops the thread.
+
+        Raises:
+            OSError: If a shard could not be written.
+        """
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+class ColumnTable:
+    """
+    Preallocated buffer of one chunk of a table, as a NumPy structured array. Every row is packed into the buffer
+    with a single struct call; a full chunk goes to the shard writer, which splits it into columns, and is
+    replaced by a new buffer.
+
+    Attributes:
+        columns (dict): The (dtype, row shape) of every column, in row order. Columns with a row shape are
+            appended as bytes.
+        buffer (numpy.ndarray): The rows of the current chunk.
+        rows (int): The number of rows in the buffer.
+        total (int): The number of rows appended, including the ones handed to the writer.
+    """
+
+    def __init__(self, columns, writer, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.columns = columns
+        self.writer = writer
+        self.chunk_rows = chunk_rows
+        self.total = 0
+        self.dtype = np.dtype([(name, dtype, shape) for name, (dtype, shape) in columns.items()])
+        self.row = struct.Struct("<" + "".join(f"{shape[0]}s" if shape else STRUCT_CODES[dtype]
+                                               for dtype, shape in columns.values()))
+        self.allocate()
+
+    def allocate(self):
+        """
+        Creates an empty buffer for the next chunk.
+        """
+        self.buffer = np.empty(self.chunk_rows, self.dtype)
+        self.raw = memoryview(self.buffer.view(np.uint8))
+        self.rows = 0
+
+    def append(self, *values):
+        """
+        Appends a row, given the value of every column in order, and hands the chunk to the writer once it is
+        full.
+        """
+        self.row.pack_into(self.raw, self.rows * self.row.size, *values)
+        self.rows += 1
+        self.total += 1
+        if self.rows == self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """
+        Hands the rows in the buffer to the writer.
+        """
+        if self.rows:
+            self.writer.put({name: self.buffer[name] for name in self.columns}, self.rows)
+            self.allocate()
+
+
+class TrajectoryExporter:
+    """
+    Exports games to a dataset directory. Attach the players with begin() before their ships are placed and call
+    end() once the game is over, or use record() to play and export a headless game in one call. Close the
+    exporter (or use it as a context manager) to write the last chunks and the dataset description.
+
+    Attributes:
+        directory (str): The dataset directory.
+        board_size (int): The width and height of the boards of every exported game.
+        games (int): The number of games exported.
+    """
+
+    def __init__(self, directory, board_size, chunk_rows=DEFAULT_CHUNK_ROWS, queue_chunks=DEFAULT_QUEUE_CHUNKS,
+                 first_game=0, prefix="", describe=True):
+        """
+        Args:
+            directory (str): The dataset directory, created if needed.
+            board_size (int): The width and height of the boards.
+            chunk_rows (int): The number of rows of every shard.
+            queue_chunks (int): The number of full chunks kept in memory while the writer is busy.
+            first_game (int): The index of the first exported game, so that several exporters can write to one
+                dataset without their game indices colliding.
+            prefix (str): Prefix of the shard names, unique to every exporter writing to the dataset.
+            describe (bool): Whether close() writes dataset.json. Exporters of pool workers leave it to
+                describe_dataset() in the parent process.
+
+        Raises:
+            ValueError: If the board is too large to export as bitmasks.
+        """
+        if board_size > SPARSE_BOARD_SIZE:
+            raise ValueError(f"games can only be exported on boards up to {SPARSE_BOARD_SIZE}x{SPARSE_BOARD_SIZE}")
+
+        self.directory = directory
+        self.board_size = board_size
+        self.mask_length = mask_bytes(board_size)
+        self.describe = describe
+        self.games = 0
+        self.first_game = first_game
+        self.turns = ColumnTable(turn_columns(board_size),
+                                 ShardWriter(os.path.join(directory, "turns"), prefix, queue_chunks), chunk_rows)
+        self.placements = ColumnTable(placement_columns(),
+                                      ShardWriter(os.path.join(directory, "placements"), prefix, queue_chunks),
+                                      chunk_rows)
+        self.players = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def begin(self, player1, player2):
+        """
+        Starts exporting a game by observing the boards of both players.
+        """
+        self.players = (player1, player2)
+        self.boards = (player1.board, player2.board)
+        for board in self.boards:
+            board.observer = self
+
+        self.game = self.first_game + self.games
+        self.strategies = [HUMAN if player.difficulty is None else player.difficulty.value
+                           for player in self.players]  # Value of the strategy columns of each player
+        self.shots = [0, 0]  # Shots fired by each player
+        self.sunk = [0, 0]  # Bitmask of the sunk ships on each board
+        self.remaining = [[0] * MAX_SHIP_SIZE, [0] * MAX_SHIP_SIZE]  # Ships afloat on each board, by size
+
+    def on_place_ship(self, board, ship):
+        side = board is self.boards[1]
+        self.remaining[side][ship.size - 1] += 1
+
+        x, y = ship.position
+        self.placements.append(self.game, side, self.strategies[side], self.players[side].num_ships, ship.size, x,
+                               y, ship.orientation == 'V')
+
+    def on_fire(self, board, x, y, hit, sunk):
+        # The board fired at belongs to the other player; the shooter has not marked the shot on its guesses yet
+        target = board is self.boards[1]
+        side = 1 - target
+        shooter = self.players[side]
+        guesses = shooter.guesses
+        length = self.mask_length
+
+        self.turns.append(self.game, self.shots[side], side, self.strategies[side], shooter.num_ships,
+                          guesses.hit_mask.to_bytes(length, "little"), guesses.miss_mask.to_bytes(length, "little"),
+                          self.sunk[target].to_bytes(length, "little"), bytes(self.remaining[target]), x, y,
+                          SUNK if sunk else HIT if hit else MISS)
+
+        self.shots[side] += 1
+        if sunk:
+            ship = board.ship_at(x, y)
+            self.sunk[target] |= ship.get_mask(self.board_size)
+            self.remaining[target][ship.size - 1] -= 1
+
+    def end(self):
+        """
+        Stops observing the boards of the game.
+        """
+        for board in self.boards:
+            board.observer = None
+        self.players = self.boards = None
+        self.games += 1
+
+    def record(self, player1, player2):
+        """
+        Plays a headless game between two players and exports it.
+
+        Returns:
+            tuple: The index of the winner (0 or 1) and the number of guesses the winner made.
+        """
+        from simulation import play_game
+
+        self.begin(player1, player2)
+        winner, turns = play_game(player1, player2)
+        self.end()
+        return winner, turns
+
+    def close(self):
+        """
+        Writes the rows still in the buffers, waits for the writers and describes the dataset.
+        """
+        for table in (self.turns, self.placements):
+            table.flush()
+            table.writer.close()
+        if self.describe:
+            describe_dataset(self.directory, self.board_size)
+
+
+def describe_dataset(directory, board_size):
+    """
+    Writes dataset.json, listing the columns of both tables and every shard found in the directory with its
+    number of rows. Called once all the exporters writing to the dataset are closed.
+    """
+    tables = {}
+    for table, columns in (("turns", turn_columns(board_size)), ("placements", placement_columns())):
+        path = os.path.join(directory, table)
+        names = sorted(os.listdir(path)) if os.path.isdir(path) else []
+        shards = [[name, int(np.load(os.path.join(path, name, "game.npy"), mmap_mode="r").shape[0])]
+                  for name in names]
+        tables[table] = {"columns": {name: [dtype, list(shape)] for name, (dtype, shape) in columns.items()},
+                         "shards": shards, "rows": sum(rows for _, rows in shards)}
+    with open(os.path.join(directory, "dataset.json"), "w") as file:
+        json.dump({"board_size": board_size, "tables": tables}, file, indent=1)
+
+
+class Dataset:
+    """
+    Reads a dataset written by TrajectoryExporter. Shards are memory-mapped, so reading one costs no more memory
+    than the pages actually touched.
+
+    Attributes:
+        directory (str): The dataset directory.
+        board_size (int): The width and height of the boards.
+        tables (dict): The description of every table from dataset.json.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "dataset.json")) as file:
+            description = json.load(file)
+        self.board_size = description["board_size"]
+        self.tables = description["tables"]
+
+    def rows(self, table="turns"):
+        """
+        Returns the number of rows of a table.
+        """
+        return self.tables[table]["rows"]
+
+    def shard(self, table, name, columns=None):
+        """
+        Returns one shard of a table as a dict of memory-mapped column arrays.
+
+        Args:
+            table (str): "turns" or "placements".
+            name (str): The name of the shard, from tables[table]["shards"].
+            columns (iterable): The names of the columns to map, or None for all of them.
+        """
+        names = list(columns) if columns is not None else list(self.tables[table]["columns"])
+        path = os.path.join(self.directory, table, name)
+        return {column: np.load(os.path.join(path, column + ".npy"), mmap_mode="r") for column in names}
+
+    def shards(self, table="turns", columns=None):
+        """
+        Yields every shard of a table as a dict of memory-mapped column arrays.
+        """
+        for name, _ in self.tables[table]["shards"]:
+            yield self.shard(table, name, columns)
+
+
+def unpack_masks(masks, board_size):
+    """
+    Expands exported bitmask columns (rows of little-endian bytes) into boolean boards.
+
+    Returns:
+        numpy.ndarray: An array of shape (rows, board_size, board_size).
+    """
+    cells = board_size * board_size
+    bits = np.unpackbits(np.asarray(masks), axis=-1, bitorder="little")[..., :cells]
+    return bits.reshape(bits.shape[:-1] + (board_size, board_size)).astype(bool)
@@ -0,0 +1,330 @@
+# Filename: gamelog.py
+# Description: Compact binary log of Battleship games. A recorder observes both players' boards and writes every
+# ship placement and every shot as a fixed-width 8 byte record, with periodic keyframes holding the hit and miss
+# bitmasks of both boards. An index at the end of the file locates every game, so a reader that memory-maps the
+# file can jump to any turn of any game of a multi-game archive, restoring the nearest keyframe and replaying at
+# most one keyframe interval of shots instead of parsing everything before it.
+#
+# File layout (all integers little-endian):
+#   header     16 bytes   magic "BSGL", version, reserved
+#   games      per game: placement records, shot records, keyframes
+#   index      32 bytes per game (see INDEX_ENTRY)
+#   footer     24 bytes   index offset, number of games, magic
+#
+# Inputs: The players of the games to record, or a log file and a (game, shot) position to replay.
+# Outputs: Game log files, and Board objects rebuilt at any recorded position.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import mmap     # Random access to large logs without reading them
+import struct   # Fixed-width records
+from collections import namedtuple  # Index entries
+
+from board import make_board, SPARSE_BOARD_SIZE
+from ship import Ship
+
+MAGIC = b"BSGL"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHH8x")         # magic, version, reserved
+EVENT = struct.Struct("<BBHHH")           # kind, flags, row, column, value
+INDEX_ENTRY = struct.Struct("<QQIIHHB3x")  # events offset, keyframes offset, placements, shots, board size,
+                                          # keyframe interval, winner
+FOOTER = struct.Struct("<QQ4s4x")         # index offset, number of games, magic
+
+# Event kinds. The lowest flag bit is the board the event happened on (0 for player one's board, 1 for player
+# two's); placements store the orientation in the next bit and their ship size as the value, shots store their
+# result in the next two bits.
+PLACE = 0
+SHOT = 1
+
+# Shot results
+MISS = 0
+HIT = 1
+SUNK = 2
+
+# Winner of a game that was not played to the end
+NO_WINNER = 255
+
+# Shots between keyframes
+DEFAULT_KEYFRAME_INTERVAL = 32
+
+GameInfo = namedtuple("GameInfo", "events_offset keyframes_offset placements shots board_size keyframe_interval "
+                                  "winner")
+
+
+def mask_bytes(board_size):
+    """
+    Returns the number of bytes of a bitmask covering a board.
+    """
+    return (board_size * board_size + 7) // 8
+
+
+class GameRecorder:
+    """
+    Writes games to a log file. Attach the players with begin() before their ships are placed and call end()
+    once the game is over, or use record() to play and log a headless game in one call.
+
+    Attributes:
+        games (int): The number of games written.
+        keyframe_interval (int): The number of shots between keyframes. Boards larger than SPARSE_BOARD_SIZE
+            get no keyframes, since their bitmasks would be larger than replaying the shots.
+    """
+
+    def __init__(self, path, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        """
+        Args:
+            path (str): The log file to create.
+            keyframe_interval (int): The number of shots between keyframes (0 for none).
+        """
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0))
+        self.offset = HEADER.size
+        self.keyframe_interval = keyframe_interval
+        self.index = bytearray()
+        self.games = 0
+        self.boards = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def begin(self, player1, player2):
+        """
+        Starts recording a game by observing the boards of both players.
+        """
+        self.boards = (player1.board, player2.board)
+        for board in self.boards:
+            board.observer = self
+
+        self.size = player1.board.size
+        self.interval = self.keyframe_interval if self.size <= SPARSE_BOARD_SIZE else 0
+        self.placements = bytearray()
+        self.shots = bytearray()
+        self.keyframes = bytearray()
+        self.shot_count = 0
+
+    def on_place_ship(self, board, ship):
+        side = board is self.boards[1]
+        x, y = ship.position
+        self.placements += EVENT.pack(PLACE, side | (ship.orientation == 'V') << 1, x, y, ship.size)
+
+    def on_fire(self, board, x, y, hit, sunk):
+        side = board is self.boards[1]
+        result = SUNK if sunk else HIT if hit else MISS
+        self.shots += EVENT.pack(SHOT, side | result << 1, x, y, 0)
+        self.shot_count += 1
+        if self.interval and not self.shot_count % self.interval:
+            self.keyframes += self.snapshot()
+
+    def snapshot(self):
+        """
+        Returns the hit and miss bitmasks of both boards.
+        """
+        length = mask_bytes(self.size)
+        return b"".join(mask.to_bytes(length, "little")
+                        for board in self.boards for mask in (board.hit_mask, board.miss_mask))
+
+    def end(self, winner=None):
+        """
+        Stops observing the boards and writes the game.
+
+        Args:
+            winner (int): The index of the winning player (0 or 1), or None if the game was not finished.
+        """
+        for board in self.boards:
+            board.observer = None
+        self.boards = None
+
+        events_offset = self.offset
+        keyframes_offset = events_offset + len(self.placements) + len(self.shots)
+        self.file.write(self.placements)
+        self.file.write(self.shots)
+        self.file.write(self.keyframes)
+        self.offset = keyframes_offset + len(self.keyframes)
+
+        self.index += INDEX_ENTRY.pack(events_offset, keyframes_offset, len(self.placements) // EVENT.size,
+                                       self.shot_count, self.size, self.interval,
+                                       NO_WINNER if winner is None else winner)
+        self.games += 1
+
+    def record(self, player1, player2):
+        """
+        Plays a headless game between two players and logs it.
+
+        Returns:
+            tuple: The index of the winner (0 or 1) and the number of guesses the winner made.
+        """
+        from simulation import play_game
+
+        self.begin(player1, player2)
+        winner, turns = play_game(player1, player2)
+        self.end(winner)
+        return winner, turns
+
+    def close(self):
+        """
+        Writes the index and footer and closes the file.
+        """
+        if self.file.closed:
+            return
+        self.file.write(self.index)
+        self.file.write(FOOTER.pack(self.offset, self.games, MAGIC))
+        self.file.close()
+
+
+class GameLog:
+    """
+    Memory-mapped reader of a game log. Only the records of the requested positions are read.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): The log file to open.
+
+        Raises:
+            ValueError: If the file is not a complete game log.
+        """
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version = HEADER.unpack_from(self.data, 0)[:2]
+        if magic != MAGIC or version != VERSION or len(self.data) < HEADER.size + FOOTER.size:
+            raise ValueError(f"{path} is not a version {VERSION} game log")
+        self.index_offset, self.games, magic = FOOTER.unpack_from(self.data, len(self.data) - FOOTER.size)
+        if magic != MAGIC:
+            raise ValueError(f"{path} has no index (was the recorder closed?)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.games
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def info(self, game):
+        """
+        Returns the GameInfo index entry of a game.
+        """
+        if not 0 <= game < self.games:
+            raise IndexError(f"game {game} is not in the log ({self.games} games)")
+        return GameInfo(*INDEX_ENTRY.unpack_from(self.data, self.index_offset + game * INDEX_ENTRY.size))
+
+    def placements(self, game):
+        """
+        Returns the ships placed in a game as (board, size, position, orientation) tuples.
+        """
+        info = self.info(game)
+        ships = []
+        for _, flags, x, y, size in EVENT.iter_unpack(
+                self.data[info.events_offset:info.events_offset + info.placements * EVENT.size]):
+            ships.append((flags & 1, size, (x, y), 'V' if flags & 2 else 'H'))
+        return ships
+
+    def shots(self, game, start=0, stop=None):
+        """
+        Returns shots of a game as (board, position, result) tuples, where board is the board fired at.
+
+        Args:
+            game (int): The index of the game.
+            start (int): The first shot to return.
+            stop (int): The shot to stop before (the end of the game if None).
+        """
+        info = self.info(game)
+        stop = info.shots if stop is None else min(stop, info.shots)
+        first = info.events_offset + (info.placements + start) * EVENT.size
+        last = info.events_offset + (info.placements + stop) * EVENT.size
+        return [(flags & 1, (x, y), flags >> 1) for _, flags, x, y, _ in EVENT.iter_unpack(self.data[first:last])]
+
+    def boards(self, game, shot=None):
+        """
+        Rebuilds both players' boards as they were after a number of shots, starting from the nearest keyframe.
+
+        Args:
+            game (int): The index of the game.
+            shot (int): The number of shots fired so far by both players (the end of the game if None).
+
+        Returns:
+            list: Player one's and player two's Board.
+        """
+        info = self.info(game)
+        shot = info.shots if shot is None else max(0, min(shot, info.shots))
+
+        boards = [make_board(info.board_size, verbose=False) for _ in range(2)]
+        for side, size, position, orientation in self.placements(game):
+            boards[side].place_ship(Ship(size, position, orientation))
+
+        # Restore the last keyframe at or before the requested shot, then replay the shots after it
+        replayed = 0
+        if info.keyframe_interval and shot >= info.keyframe_interval:
+            keyframe = shot // info.keyframe_interval - 1
+            length = mask_bytes(info.board_size)
+            offset = info.keyframes_offset + keyframe * 4 * length
+            masks = [int.from_bytes(self.data[offset + i * length:offset + (i + 1) * length], "little")
+                     for i in range(4)]
+            boards[0].restore(masks[0], masks[1])
+            boards[1].restore(masks[2], masks[3])
+            replayed = (keyframe + 1) * info.keyframe_interval
+
+        for side, (x, y), _ in self.shots(game, replayed, shot):
+            boards[side].receive_fire(x, y)
+        return boards
+
+
+def main():
+    """
+    Command line entry point. `python Battleship/src/gamelog.py record games.bsgl medium easy --games 1000`
+    records headless games; `python Battleship/src/gamelog.py show games.bsgl 3 --shot 40` prints a position.
+    """
+    import argparse
+    from renderer import get_renderer
+    from simulation import make_ai, parse_difficulty
+
+    parser = argparse.ArgumentParser(description="Record and replay binary Battleship game logs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="record headless AI-vs-AI games")
+    record.add_argument("path", help="log file to create")
+    record.add_argument("player1", type=parse_difficulty, help="difficulty of the AI guessing first")
+    record.add_argument("player2", type=parse_difficulty, help="difficulty of the AI guessing second")
+    record.add_argument("--games", type=int, default=100, help="number of games to record (default: 100)")
+    record.add_argument("--ships", type=int, default=5, help="number of ships per player (default: 5)")
+    record.add_argument("--board-size", type=int, default=10, help="board width and height")
+    record.add_argument("--keyframe-interval", type=int, default=DEFAULT_KEYFRAME_INTERVAL,
+                        help=f"shots between keyframes (default: {DEFAULT_KEYFRAME_INTERVAL})")
+
+    show = commands.add_parser("show", help="print both boards of a recorded game")
+    show.add_argument("path", help="log file to read")
+    show.add_argument("game", type=int, help="index of the game")
+    show.add_argument("--shot", type=int, default=None, help="number of shots fired (default: the end)")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        with GameRecorder(args.path, args.keyframe_interval) as recorder:
+            for _ in range(args.games):
+                recorder.record(make_ai(args.player1, args.ships, args.board_size),
+                                make_ai(args.player2, args.ships, args.board_size))
+        print(f"Recorded {recorder.games} games to {args.path}")
+        return
+
+    with GameLog(args.path) as log:
+        info = log.info(args.game)
+        boards = log.boards(args.game, args.shot)
+        shot = info.shots if args.shot is None else args.shot
+        winner = "unfinished" if info.winner == NO_WINNER else f"player {info.winner + 1} won"
+        print(f"Game {args.game} of {len(log)}: shot {shot} of {info.shots} ({winner})")
+        renderer = get_renderer()
+        renderer.draw(renderer.board_lines(boards, ["Player 1's Board", "Player 2's Board"]))
+
+
+if __name__ == "__main__":
+    main()
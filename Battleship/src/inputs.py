@@ -0,0 +1,237 @@
+# Filename: inputs.py
+# Description: Input sources feeding ship placements and guesses to Player. The terminal source prompts with
+# input() and asks again on mistakes, like the console game always did. The file source reads and validates a
+# whole move file up front, and the pipe source parses a stream of moves (e.g. stdin) as it arrives; neither
+# prints prompts, and a move the game rejects raises an error pointing at its line instead of asking again, so
+# recorded human games replay through the real Player code at full speed.
+#
+# Move format: one move per line, "B3 H" or "B3 V" for a placement (the orientation may be left out for 1x1
+# ships) and "C7" for a guess. Blank lines and lines starting with '#' are ignored.
+#
+# Inputs: Typed moves, move files or streams of moves.
+# Outputs: Parsed positions and orientations, in board coordinates.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import sys                     # Default stream of the pipe source
+from collections import deque  # Pre-parsed moves of the file source
+
+from board import parse_position
+
+
+class InvalidMove(ValueError):
+    """
+    Raised when a scripted source provides a move that is malformed or that the game rejects.
+    """
+
+
+def parse_move(text):
+    """
+    Parses a move line into a position and an optional orientation.
+
+    Args:
+        text (str): The move, e.g. "B3 H" or "C7".
+
+    Returns:
+        tuple: ((row, column), orientation) with orientation 'H', 'V' or None, or None if the line is malformed.
+    """
+    words = text.split()
+    if not 1 <= len(words) <= 2:
+        return None
+    position = parse_position(words[0])
+    orientation = words[1].upper() if len(words) == 2 else None
+    if position is None or orientation not in (None, 'H', 'V'):
+        return None
+    return position, orientation
+
+
+class TerminalInput:
+    """
+    Interactive source: prompts the player on the terminal and asks again after every mistake.
+    """
+
+    def next_placement(self, player, size):
+        """
+        Asks for the position and orientation of a ship.
+
+        Args:
+            player (Player): The player placing the ship.
+            size (int): The size of the ship.
+
+        Returns:
+            tuple: The (row, column) position and the orientation ('H' or 'V').
+        """
+        while True:
+            position = parse_position(input(player.name + f" place your {size}x1 ship (e.g., B3): "))
+            if position is None:
+                print("Invalid input format. Please use the format 'LetterNumber' (e.g., B3).")
+                continue
+            x, y = position
+            if x < 0 or x >= player.board.size or y < 0 or y >= player.board.size:
+                print("Position out of bounds. Please choose a valid position on the board.")
+                continue
+
+            if size == 1:
+                return position, 'H'  # Single-tile ships are placed horizontally by default
+            orientation = input("Choose orientation (H for horizontal, V for vertical): ").upper()
+            if orientation not in ['H', 'V']:
+                print("Invalid orientation. Please enter 'H' for horizontal or 'V' for vertical.")
+                continue
+            return position, orientation
+
+    def next_guess(self, player):
+        """
+        Asks for the position of a guess.
+
+        Returns:
+            tuple: The (row, column) position.
+        """
+        while True:
+            position = parse_position(input(f"{player.name}, enter your guess (e.g., B3): "))
+            if position is not None:
+                return position
+            print("Invalid input format. Please use the format 'LetterNumber' (e.g., B3).")
+
+    def reject(self, message):
+        """
+        Reports a move the game rejected (out of bounds, overlapping, duplicate); the player is asked again.
+
+        Args:
+            message (str): The reason, or None if the board already printed it.
+        """
+        if message is not None:
+            print(message)
+
+
+class ScriptedInput:
+    """
+    Base class of the non-interactive sources. Subclasses implement next_move().
+
+    Attributes:
+        name (str): Where the moves come from, used in error messages.
+        line (int): The line number of the last move returned.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.line = 0
+
+    def next_move(self):
+        """
+        Returns the next (position, orientation) move.
+        """
+        raise NotImplementedError()
+
+    def next_placement(self, player, size):
+        position, orientation = self.next_move()
+        if orientation is None:
+            if size != 1:
+                raise InvalidMove(f"{self.name}:{self.line}: the {size}x1 ship needs an orientation")
+            orientation = 'H'
+        return position, orientation
+
+    def next_guess(self, player):
+        position, orientation = self.next_move()
+        if orientation is not None:
+            raise InvalidMove(f"{self.name}:{self.line}: expected a guess, found a placement")
+        return position
+
+    def reject(self, message):
+        raise InvalidMove(f"{self.name}:{self.line}: {message or 'the ship does not fit there'}")
+
+
+class FileInput(ScriptedInput):
+    """
+    Source reading a whole move file when created. Every line is parsed and validated up front, so a malformed
+    file fails before the game starts and every move afterwards is a constant-time pop.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): The move file.
+
+        Raises:
+            InvalidMove: If a line is not a valid move.
+        """
+        super().__init__(path)
+        self.moves = deque()  # (line number, position, orientation)
+        with open(path) as file:
+            for number, text in enumerate(file, 1):
+                text = text.strip()
+                if not text or text.startswith('#'):
+                    continue
+                move = parse_move(text)
+                if move is None:
+                    raise InvalidMove(f"{path}:{number}: invalid move {text!r}")
+                self.moves.append((number, *move))
+
+    def __len__(self):
+        return len(self.moves)
+
+    def next_move(self):
+        if not self.moves:
+            raise EOFError(f"{self.name}: no moves left")
+        self.line, position, orientation = self.moves.popleft()
+        return position, orientation
+
+
+class PipeInput(ScriptedInput):
+    """
+    Source parsing moves from a stream (stdin by default) as they arrive, without prompts.
+    """
+
+    def __init__(self, stream=None, name="<stdin>"):
+        """
+        Args:
+            stream: A text stream of move lines (sys.stdin if None).
+            name (str): The name of the stream in error messages.
+        """
+        super().__init__(name)
+        self.stream = stream if stream is not None else sys.stdin
+
+    def next_move(self):
+        for text in self.stream:
+            self.line += 1
+            text = text.strip()
+            if not text or text.startswith('#'):
+                continue
+            move = parse_move(text)
+            if move is None:
+                raise InvalidMove(f"{self.name}:{self.line}: invalid move {text!r}")
+            return move
+        raise EOFError(f"{self.name}: no moves left")
+
+
+def open_input(path):
+    """
+    Returns the input source for a path: PipeInput for "-" (stdin), FileInput otherwise.
+    """
+    return PipeInput() if path == "-" else FileInput(path)
+
+
+def main():
+    """
+    Command line entry point: replays a game from two move files without any console output, e.g.
+    `python Battleship/src/inputs.py player1.txt player2.txt --ships 5`.
+    """
+    import argparse
+    from player import Player
+    from simulation import play_game
+
+    parser = argparse.ArgumentParser(description="Replay a Battleship game from move files.")
+    parser.add_argument("player1", help="move file of the player guessing first ('-' for stdin)")
+    parser.add_argument("player2", help="move file of the player guessing second")
+    parser.add_argument("--ships", type=int, default=5, help="number of ships per player (default: 5)")
+    parser.add_argument("--board-size", type=int, default=10, help="board width and height")
+    args = parser.parse_args()
+
+    players = [Player(f"Player {i + 1}", args.ships, verbose=False, board_size=args.board_size,
+                      input_source=open_input(path))
+               for i, path in enumerate((args.player1, args.player2))]
+    winner, turns = play_game(*players)
+    print(f"{players[winner].name} wins after {turns} turns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+# Filename: layouts.py
+# Description: Fleet layouts that are hard for a given targeting strategy to find, and pools of them for the AI
+# players. Random fleets are easy prey for the shot heuristics: ships touching each other are found together, and
+# density-based shooters sweep the middle of the board first. The optimizer searches layouts with simulated
+# annealing on a proxy score that is cheap to update: every ship is worth the expected shot at which the strategy
+# first fires at one of its cells, learned once from simulated games, and ships touching each other are
+# penalized. Moving one ship only re-scores that ship and its contacts. The best layouts of many annealing runs
+# are then checked with batches of real games against the strategy, cached by layout, and the ones that hold out
+# longest are exported as a pool. AI players draw their fleet from a loaded pool in O(1).
+# Inputs: The targeting strategy, the board size and number of ships, and the size and time of the search.
+# Outputs: Layout pools saved as JSON, and random fleets drawn from them.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import json    # Layout pool files
+import math    # Annealing acceptance probability
+import random  # Annealing moves and pool draws
+import time    # Search time limit
+
+from board import DEFAULT_BOARD_SIZE, SPARSE_BOARD_SIZE  # Standard board size, largest board with placement tables
+from placements import placement_table, random_fleet    # Placement bitmasks, and random fleets to compare with
+from ship import fleet_sizes                            # Ship sizes of a fleet
+
+# Shots by which the proxy score of a layout drops for every pair of touching ships
+CONTACT_PENALTY = 4.0
+
+# Games played to learn when a strategy first fires at every cell
+PROFILE_GAMES = 200
+
+# Games played against each candidate layout to validate it
+VALIDATION_GAMES = 30
+
+# Layouts played against per pool layout, taken from the best proxy scores
+SHORTLIST_FACTOR = 3
+
+
+### Layout pools ###############################################################
+
+class LayoutPool:
+    """
+    A fixed set of fleet layouts for one board size and fleet, drawn from uniformly.
+
+    Attributes:
+        board_size (int): The width and height of the board.
+        ship_sizes (tuple): The size of every ship, in fleet order.
+        layouts (list): Every layout, as a list of (size, position, orientation) tuples.
+        strategy (str): The name of the targeting strategy the layouts were optimized against, if any.
+    """
+
+    def __init__(self, board_size, ship_sizes, layouts, strategy=None):
+        self.board_size = board_size
+        self.ship_sizes = tuple(ship_sizes)
+        self.layouts = layouts
+        self.strategy = strategy
+
+    def __len__(self):
+        return len(self.layouts)
+
+    def draw(self, rng=random):
+        """
+        Returns a uniformly random layout of the pool, in O(1).
+        """
+        return self.layouts[int(rng.random() * len(self.layouts))]
+
+    def save(self, path):
+        """
+        Writes the pool to a JSON file.
+        """
+        with open(path, "w") as file:
+            json.dump({"board_size": self.board_size, "ship_sizes": list(self.ship_sizes),
+                       "strategy": self.strategy,
+                       "layouts": [[[size, x, y, orientation] for size, (x, y), orientation in layout]
+                                   for layout in self.layouts]}, file)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a pool written by save().
+
+        Raises:
+            ValueError: If the file holds no layouts.
+        """
+        with open(path) as file:
+            data = json.load(file)
+        layouts = [[(size, (x, y), orientation) for size, x, y, orientation in layout] for layout in data["layouts"]]
+        if not layouts:
+            raise ValueError(f"{path} holds no layouts")
+        return cls(data["board_size"], data["ship_sizes"], layouts, data.get("strategy"))
+
+
+# Pools used by the AI players of this process, by (board size, ship sizes)
+_pools = {}
+
+
+def use_pool(pool):
+    """
+    Makes AI players whose board and fleet match the pool draw their fleet from it.
+    """
+    _pools[(pool.board_size, pool.ship_sizes)] = pool
+
+
+def pool_layout(board_size, ship_sizes, rng=random):
+    """
+    Returns a layout drawn from the pool registered for a board size and fleet, or None if there is none.
+    """
+    pool = _pools.get((board_size, tuple(ship_sizes)))
+    return pool.draw(rng) if pool is not None else None
+
+
+### Scoring ####################################################################
+
+def solo_game(spec, num_ships, board_size, layout):
+    """
+    Sets up a headless one-sided game: an AI of the strategy firing at a board holding a fixed layout.
+
+    Returns:
+        tuple: The shooting AI and the target player.
+    """
+    from player import AIPlayerEasy  # Imported here since the players import this module
+    from ship import Ship
+    from simulation import make_ai
+
+    target = AIPlayerEasy(num_ships, verbose=False, board_size=board_size)
+    for size, position, orientation in layout:
+        target.board.place_ship(Ship(size, position, orientation))
+    return make_ai(spec, num_ships, board_size), target
+
+
+def solo_shots(spec, num_ships, board_size, layout):
+    """
+    Plays one headless game of a strategy against a fixed layout and returns the shots it needed to sink it.
+    """
+    shooter, target = solo_game(spec, num_ships, board_size, layout)
+    shots = 0
+    while not target.board.all_ships_sunk():
+        shooter.make_guess(target)
+        shots += 1
+    return shots
+
+
+def fire_profile(spec, num_ships, board_size, games=PROFILE_GAMES):
+    """
+    Learns how soon a strategy fires at every cell, from games against random fleets.
+
+    Returns:
+        list: The average shot number at which each cell (bit index) was first fired at. Cells that were not
+        fired at before the game ended count as fired at one shot after the end.
+    """
+    cells = board_size * board_size
+    totals = [0] * cells
+    for _ in range(games):
+        shooter, target = solo_game(spec, num_ships, board_size, random_fleet(board_size, fleet_sizes(num_ships)))
+        fired = 0
+        shots = 0
+        while not target.board.all_ships_sunk():
+            shooter.make_guess(target)
+            shots += 1
+            new = (shooter.guesses.hit_mask | shooter.guesses.miss_mask) & ~fired
+            fired |= new
+            while new:
+                low = new & -new
+                totals[low.bit_length() - 1] += shots
+                new ^= low
+        for index in range(cells):
+            if not fired >> index & 1:
+                totals[index] += shots + 1
+    return [total / games for total in totals]
+
+
+def neighbour_mask(mask, board_size):
+    """
+    Returns the bitmask of the cells orthogonally next to a placement, excluding the placement itself.
+    """
+    neighbours = 0
+    index = 0
+    bits = mask
+    while bits:
+        if bits & 1:
+            x, y = divmod(index, board_size)
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if 0 <= nx < board_size and 0 <= ny < board_size:
+                    neighbours |= 1 << (nx * board_size + ny)
+        bits >>= 1
+        index += 1
+    return neighbours & ~mask
+
+
+class ProxyScorer:
+    """
+    Cheap, incrementally updated estimate of how long a strategy takes to find a layout. Every candidate
+    placement is scored once: its value is the earliest average shot at which the strategy fires at one of its
+    cells, since finishing a ship after the first hit takes a few shots whatever the layout.
+
+    Attributes:
+        board_size (int): The width and height of the board.
+        placements (dict): Maps each ship size to its candidate (size, position, orientation, mask, neighbours, value)
+            tuples.
+    """
+
+    def __init__(self, board_size, ship_sizes, profile, contact_penalty=CONTACT_PENALTY):
+        """
+        Args:
+            board_size (int): The width and height of the board.
+            ship_sizes (iterable): The sizes of the ships.
+            profile (list): The average first shot at every cell, from fire_profile().
+            contact_penalty (float): Shots lost for every pair of touching ships.
+        """
+        self.board_size = board_size
+        self.contact_penalty = contact_penalty
+        self.placements = {}
+        for size in set(ship_sizes):
+            candidates = []
+            for orientation in (('H',) if size == 1 else ('H', 'V')):
+                for position, mask in placement_table(board_size, size, orientation):
+                    x, y = position
+                    step = 1 if orientation == 'H' else board_size
+                    value = min(profile[x * board_size + y + i * step] for i in range(size))
+                    candidates.append((size, position, orientation, mask, neighbour_mask(mask, board_size), value))
+            self.placements[size] = candidates
+
+    def contacts(self, placement, layout, skip):
+        """
+        Returns the number of ships of a layout, other than the one at index skip, touching a placement.
+        """
+        return sum(1 for i, other in enumerate(layout) if i != skip and placement[4] & other[3])
+
+    def score(self, layout):
+        """
+        Returns the proxy score of a full layout (higher is harder to find).
+        """
+        value = sum(placement[5] for placement in layout)
+        touching = sum(self.contacts(placement, layout, i) for i, placement in enumerate(layout)) // 2
+        return value - self.contact_penalty * touching
+
+    def delta(self, layout, index, placement):
+        """
+        Returns the change of the proxy score if the ship at index moved to a new placement.
+        """
+        old = layout[index]
+        return (placement[5] - old[5]
+                - self.contact_penalty * (self.contacts(placement, layout, index) - self.contacts(old, layout, index)))
+
+
+### Search #####################################################################
+
+def anneal(scorer, ship_sizes, steps=4000, start_temperature=8.0, end_temperature=0.05, rng=random):
+    """
+    Searches a layout with a high proxy score by simulated annealing. Every step moves one ship to a random
+    placement that overlaps no other ship.
+
+    Returns:
+        tuple: The best layout found, as a list of scorer placements, and its proxy score.
+    """
+    # Start from a random non-overlapping layout
+    layout = []
+    occupied = 0
+    for size in ship_sizes:
+        free = [placement for placement in scorer.placements[size] if not placement[3] & occupied]
+        placement = free[int(rng.random() * len(free))]
+        layout.append(placement)
+        occupied |= placement[3]
+
+    score = scorer.score(layout)
+    best, best_score = list(layout), score
+    cooling = (end_temperature / start_temperature) ** (1 / max(1, steps))
+    temperature = start_temperature
+
+    for _ in range(steps):
+        index = int(rng.random() * len(layout))
+        candidates = scorer.placements[ship_sizes[index]]
+        placement = candidates[int(rng.random() * len(candidates))]
+        if placement[3] & occupied & ~layout[index][3]:
+            temperature *= cooling
+            continue
+
+        change = scorer.delta(layout, index, placement)
+        if change >= 0 or rng.random() < math.exp(change / temperature):
+            occupied = occupied & ~layout[index][3] | placement[3]
+            layout[index] = placement
+            score += change
+            if score > best_score:
+                best, best_score = list(layout), score
+        temperature *= cooling
+
+    return best, best_score
+
+
+def layout_key(layout):
+    """
+    Returns a hashable key of a layout, the same for every order of its ships.
+    """
+    return frozenset(layout)
+
+
+class Validator:
+    """
+    Scores layouts by the average number of shots a strategy needs to sink them in real games. Results are
+    cached by layout, since annealing runs often end on the same layout.
+    """
+
+    def __init__(self, spec, num_ships, board_size, games=VALIDATION_GAMES):
+        self.spec = spec
+        self.num_ships = num_ships
+        self.board_size = board_size
+        self.games = games
+        self.cache = {}
+
+    def mean_shots(self, layout):
+        """
+        Returns the average shots needed to sink a layout of (size, position, orientation) tuples.
+        """
+        key = layout_key(layout)
+        if key not in self.cache:
+            self.cache[key] = sum(solo_shots(self.spec, self.num_ships, self.board_size, layout)
+                                  for _ in range(self.games)) / self.games
+        return self.cache[key]
+
+
+def optimize(spec, num_ships=5, board_size=DEFAULT_BOARD_SIZE, count=20, runs=None, seconds=10.0, steps=4000,
+             profile_games=PROFILE_GAMES, games=VALIDATION_GAMES, seed=None, report=None):
+    """
+    Builds a pool of layouts that a strategy takes long to find: anneals many layouts on the proxy score, then
+    keeps the ones that held out longest in real games.
+
+    Args:
+        spec (AIDifficulties | type): The targeting strategy to optimize against.
+        num_ships (int): The number of ships of the fleet.
+        board_size (int): The width and height of the board.
+        count (int): The number of layouts of the pool.
+        runs (int): The largest number of annealing runs, or None to anneal until the time is up.
+        seconds (float): The time after which no more annealing runs are started.
+        steps (int): The number of annealing steps per run.
+        profile_games (int): The number of games played to learn when the strategy fires at every cell.
+        games (int): The number of games played against every shortlisted layout.
+        seed (int): Seed of the random number generator.
+        report (callable): Called with a progress message, or None.
+
+    Returns:
+        tuple: The LayoutPool, the average shots needed to sink its layouts and the average for random fleets.
+
+    Raises:
+        ValueError: If the board is too large for the placement tables.
+    """
+    if board_size > SPARSE_BOARD_SIZE:
+        raise ValueError(f"layouts can only be optimized on boards up to {SPARSE_BOARD_SIZE}x{SPARSE_BOARD_SIZE}")
+
+    random.seed(seed)
+    ship_sizes = fleet_sizes(num_ships)
+    deadline = time.perf_counter() + seconds
+    validator = Validator(spec, num_ships, board_size, games)
+
+    scorer = ProxyScorer(board_size, ship_sizes, fire_profile(spec, num_ships, board_size, profile_games))
+    baseline = sum(validator.mean_shots(random_fleet(board_size, ship_sizes)) for _ in range(count)) / count
+    if report is not None:
+        report(f"random fleets: {baseline:.2f} shots to sink")
+
+    candidates = {}
+    run = 0
+    while (runs is None or run < runs) and (run < count or time.perf_counter() < deadline):
+        run += 1
+        layout, score = anneal(scorer, ship_sizes, steps)
+        fleet = [placement[:3] for placement in layout]
+        candidates[layout_key(fleet)] = (score, fleet)
+
+    # Only the layouts with the best proxy scores are played against, which is where the time goes
+    shortlist = [fleet for _, fleet in sorted(candidates.values(), key=lambda item: item[0], reverse=True)]
+    shortlist = shortlist[:SHORTLIST_FACTOR * count]
+
+    # The ranking games favour layouts that were lucky, so the pool is measured again with new games
+    ranked = sorted(shortlist, key=validator.mean_shots, reverse=True)[:count]
+    retest = Validator(spec, num_ships, board_size, games)
+    mean = sum(retest.mean_shots(fleet) for fleet in ranked) / len(ranked)
+    if report is not None:
+        report(f"{run} annealing runs, {len(candidates)} layouts, best {len(ranked)}: {mean:.2f} shots to sink")
+    return LayoutPool(board_size, ship_sizes, ranked, getattr(spec, "name", None)), mean, baseline
+
+
+def main():
+    """
+    Command line entry point, e.g. `python Battleship/src/layouts.py expert --out expert.json --layouts 20`.
+    """
+    import argparse                          # Only needed on the command line
+    from simulation import parse_difficulty  # Imported here since simulation imports this module
+
+    parser = argparse.ArgumentParser(description="Search fleet layouts that an AI takes long to find.")
+    parser.add_argument("strategy", type=parse_difficulty, help="difficulty of the AI to optimize against")
+    parser.add_argument("--out", metavar="FILE", required=True, help="file to write the layout pool to")
+    parser.add_argument("--layouts", type=int, default=20, help="number of layouts in the pool (default: 20)")
+    parser.add_argument("--ships", type=int, default=5, help="number of ships (default: 5)")
+    parser.add_argument("--board-size", type=int, default=DEFAULT_BOARD_SIZE, help="board width and height")
+    parser.add_argument("--seconds", type=float, default=10.0, help="time spent annealing (default: 10)")
+    parser.add_argument("--steps", type=int, default=4000, help="annealing steps per run (default: 4000)")
+    parser.add_argument("--profile-games", type=int, default=PROFILE_GAMES,
+                        help=f"games played to profile the AI (default: {PROFILE_GAMES})")
+    parser.add_argument("--games", type=int, default=VALIDATION_GAMES,
+                        help=f"games played against every shortlisted layout (default: {VALIDATION_GAMES})")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    args = parser.parse_args()
+
+    pool, mean, baseline = optimize(args.strategy, args.ships, args.board_size, args.layouts, None, args.seconds,
+                                    args.steps, args.profile_games, args.games, args.seed, report=print)
+    pool.save(args.out)
+    print(f"wrote {len(pool)} layouts to {args.out}: {mean - baseline:+.2f} shots against {args.strategy.name} "
+          f"compared to random fleets")
+
+
+if __name__ == "__main__":
+    main()
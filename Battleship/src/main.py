@@ -4,7 +4,7 @@ Filename: main.py
 Description:  This Python program implements a console-based Battleship game for two players
 
 Game Overview:
-Players secretly place a specified number of ships on a 10x10 grid.
+Players secretly place a specified number of ships on a 10x10 grid (or a grid of the chosen size).
 Players take turns guessing the locations of their opponent's ships.
 The game continues until one player successfully sinks all of the opponent's ships.
 with an optional AI opponent and different difficulty levels.
@@ -33,14 +33,49 @@ Sanketh Reddy
 Creation Date: 
 '''
 
+import argparse
+
 from player import Player, AIDifficulties, AI_factory
-from playsound import playsound
+from board import DEFAULT_BOARD_SIZE
+from audio import AudioService, NullBackend, get_audio, set_audio
+from renderer import Renderer, set_renderer
+
+# Largest board that is still practical to play on in a terminal
+MAX_BOARD_SIZE = 52
 
 def main():
     """
     Main function for executing the Battleship game logic. It sets up players, allows for
     ship placement, and alternates turns until all ships of one player are sunk.
     """
+    parser = argparse.ArgumentParser(description="Play Battleship in the terminal.")
+    parser.add_argument("--color", action="store_true", help="color the board cells by type")
+    parser.add_argument("--redraw", action="store_true",
+                        help="keep the boards at the top of the screen and redraw only the cells that changed")
+    parser.add_argument("--metrics", metavar="FILE", default=None,
+                        help="record timings and write them to FILE (.prom for Prometheus text)")
+    parser.add_argument("--record", metavar="FILE", default=None, help="log the game to a binary game log")
+    parser.add_argument("--no-sound", action="store_true",
+                        help="play without sound effects (no audio package is loaded)")
+    parser.add_argument("--layouts", metavar="FILE", default=None,
+                        help="have the AI draw its fleet from a layout pool written by layouts.py")
+    args = parser.parse_args()
+    set_renderer(Renderer(color=args.color, incremental=args.redraw))
+
+    # The optional modules are only imported by the options that use them, to keep them off the startup path
+    if args.layouts:
+        from layouts import LayoutPool, use_pool
+        use_pool(LayoutPool.load(args.layouts))
+
+    if args.no_sound:
+        set_audio(AudioService(NullBackend()))
+
+    if args.metrics:
+        import metrics
+        metrics.enable()
+
+    audio = get_audio()  # Load the sound effects once, before the game starts
+
     while True:
         num_ships = input("How many ships are you playing with? (1-5): ")
         # Check if the input is a digit and within the valid range
@@ -50,6 +85,18 @@ def main():
         else:
             print("Please enter a valid number of ships (1-5).")
 
+    while True:
+        board_size = input(f"Board size? ({num_ships}-{MAX_BOARD_SIZE}, default {DEFAULT_BOARD_SIZE}): ")
+        if not board_size:
+            board_size = DEFAULT_BOARD_SIZE  # Keep the standard 10x10 board
+            break
+        # The largest ship must fit on the board
+        if board_size.isdigit() and num_ships <= int(board_size) <= MAX_BOARD_SIZE:
+            board_size = int(board_size)
+            break
+        else:
+            print(f"Please enter a valid board size ({num_ships}-{MAX_BOARD_SIZE}).")
+
     # Ask the user if they want to play against an AI
     play_against_AI = input(f"Play against an AI? (y/N): ")
     play_against_AI = False if not len(play_against_AI) else \
@@ -57,21 +104,29 @@ def main():
     
     if play_against_AI:
         # Ask the user to choose AI difficulty
-        difficulty_input = input("Choose AI difficulty (E/m/h): ")
+        difficulty_input = input("Choose AI difficulty (E/m/h/x/s): ")
         difficulty = {
             'E': AIDifficulties.EASY,
             'M': AIDifficulties.MEDIUM,
-            'H': AIDifficulties.HARD
+            'H': AIDifficulties.HARD,
+            'X': AIDifficulties.EXPERT,
+            'S': AIDifficulties.SAMPLING
         }[difficulty_input.upper()[0]]
 
         # Initialize Player 1 and the AI player
-        player1 = Player("Player", num_ships)
-        player2 = AI_factory(difficulty, num_ships)
+        player1 = Player("Player", num_ships, board_size=board_size)
+        player2 = AI_factory(difficulty, num_ships, board_size=board_size)
     else: 
         # Initialize Player 1 and Player 2 (human players)
-        player1 = Player(input("Enter name for Player 1: "), num_ships)
-        player2 = Player(input("Enter name for Player 2: "), num_ships)
+        player1 = Player(input("Enter name for Player 1: "), num_ships, board_size=board_size)
+        player2 = Player(input("Enter name for Player 2: "), num_ships, board_size=board_size)
     
+    recorder = None
+    if args.record:
+        from gamelog import GameRecorder
+        recorder = GameRecorder(args.record)
+        recorder.begin(player1, player2)
+
     # Ship placement phase
     player1.place_ships()
     player2.place_ships()
@@ -85,7 +140,8 @@ def main():
         # Check if Player 1 wins by sinking all ships of Player 2
         if player2.board.all_ships_sunk():
             print(f"{player1.name} wins! All ships of {player2.name} are sunk.")
-            playsound("Battleship/src/sound_files/win.mp3")
+            audio.play("win", force=True)
+            winner = 0
             break
 
         # Player 2's turn
@@ -96,9 +152,20 @@ def main():
         # Check if Player 2 wins by sinking all ships of Player 1
         if player1.board.all_ships_sunk():
             print(f"{player2.name} wins! All ships of {player1.name} are sunk.")
-            playsound("Battleship/src/sound_files/win.mp3")
+            audio.play("win", force=True)
+            winner = 1
             break
 
+    if recorder is not None:
+        recorder.end(winner)
+        recorder.close()
+
+    audio.wait()  # Let the victory sound finish before exiting
+
+    if args.metrics:
+        import metrics
+        metrics.dump(args.metrics, "prometheus" if args.metrics.endswith(".prom") else "json")
+
 # Run the main function if this script is executed
 if __name__ == "__main__":
     main()
@@ -0,0 +1,438 @@
+# Filename: metrics.py
+# Description: Opt-in instrumentation of the game's hot paths. When enabled, the make_guess method of every player
+# class, the Board print methods and playsound are wrapped with timers that feed histograms, and the fleet
+# generators report how many placements they rejected. When disabled nothing is wrapped, so the only cost left is one
+# flag check per fleet. Metrics can be dumped as JSON or in the Prometheus text format, and any call
+# (e.g. a batch of games) can be run under cProfile or a sampling profiler, which are only imported when used.
+# Inputs: The AIs, number of games and output format given on the command line, or enable() called by a program.
+# Outputs: Counters and histograms as JSON or Prometheus text, and profiler reports.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import bisect     # Finds the histogram bucket of a value
+import functools  # Keeps the names and docstrings of wrapped methods
+import json       # JSON dumps
+import sys        # Frames of running threads, for the sampling profiler
+import threading  # Sampling thread of the sampling profiler
+import time       # Timers
+from collections import Counter as Tally  # Sample counts of the sampling profiler
+
+# Whether instrumentation is active. Read by the fleet generators; use enable() and disable() to change it.
+enabled = False
+
+# Histogram buckets for durations, in seconds (1 microsecond to 10 seconds)
+TIME_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2,
+                2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def label_key(labels):
+    """
+    Returns a hashable key for a set of labels.
+    """
+    return tuple(sorted(labels.items()))
+
+
+def format_labels(key, extra=()):
+    """
+    Formats a label key in the Prometheus text format, e.g. {player="AIPlayerEasy"}.
+    """
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """
+    A monotonically increasing count, kept separately for every set of labels.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}  # label key -> count
+
+    def inc(self, amount=1, **labels):
+        key = label_key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def reset(self):
+        self.values.clear()
+
+    def to_dict(self):
+        return [{"labels": dict(key), "value": value} for key, value in self.values.items()]
+
+    def to_prometheus(self):
+        return [f"{self.name}{format_labels(key)} {value}" for key, value in self.values.items()]
+
+
+class Histogram:
+    """
+    A distribution of observed values in cumulative buckets, kept separately for every set of labels.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=TIME_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.series = {}  # label key -> [count per bucket (the last one unbounded), sum, count]
+
+    def observe(self, value, **labels):
+        key = label_key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [[0] * (len(self.buckets) + 1), 0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def reset(self):
+        self.series.clear()
+
+    def cumulative(self, counts):
+        """
+        Returns the (upper bound, cumulative count) of every bucket, ending with +Inf.
+        """
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self):
+        return [
+            {
+                "labels": dict(key),
+                "count": count,
+                "sum": total,
+                "buckets": {("+Inf" if bound == float("inf") else repr(bound)): cumulative
+                            for bound, cumulative in self.cumulative(counts)},
+            }
+            for key, (counts, total, count) in self.series.items()
+        ]
+
+    def to_prometheus(self):
+        lines = []
+        for key, (counts, total, count) in self.series.items():
+            for bound, cumulative in self.cumulative(counts):
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{format_labels(key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    """
+    Holds every metric and dumps them together.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def reset(self):
+        for metric in self.metrics.values():
+            metric.reset()
+
+    def to_dict(self):
+        return {name: {"type": metric.kind, "help": metric.help, "series": metric.to_dict()}
+                for name, metric in self.metrics.items()}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.to_prometheus())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+MAKE_GUESS_SECONDS = REGISTRY.add(Histogram(
+    "battleship_make_guess_seconds", "Latency of a make_guess call, per player class."))
+PLACEMENT_RETRIES = REGISTRY.add(Counter(
+    "battleship_placement_retries_total", "Random ship placements rejected for overlapping another ship."))
+SOUND_SECONDS = REGISTRY.add(Histogram(
+    "battleship_playsound_seconds", "Time spent in playsound, on the audio worker threads."))
+PRINT_SECONDS = REGISTRY.add(Histogram(
+    "battleship_print_seconds", "Time spent in the Board print methods."))
+
+
+### Instrumentation ############################################################
+
+# (owner, attribute, original value) of every patched attribute, restored by disable()
+_patches = []
+
+
+def patch(owner, attribute, wrapper):
+    """
+    Replaces an attribute with a wrapper around it, remembering the original for disable().
+    """
+    original = owner.__dict__[attribute]
+    _patches.append((owner, attribute, original))
+    setattr(owner, attribute, wrapper(getattr(owner, attribute)))
+
+
+def timed(histogram, **labels):
+    """
+    Returns a wrapper that records the duration of every call in a histogram.
+    """
+    def wrapper(function):
+        @functools.wraps(function)
+        def timed_function(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, **labels)
+        return timed_function
+    return wrapper
+
+
+def timed_guess(function):
+    """
+    Wraps a make_guess method: records the latency of every call, labelled with the class of the player.
+    """
+    @functools.wraps(function)
+    def make_guess(self, opponent):
+        start = time.perf_counter()
+        try:
+            return function(self, opponent)
+        finally:
+            MAKE_GUESS_SECONDS.observe(time.perf_counter() - start, player=type(self).__name__)
+    return make_guess
+
+
+def player_classes(base):
+    """
+    Returns a class and all of its subclasses.
+    """
+    classes = [base]
+    for subclass in base.__subclasses__():
+        classes.extend(player_classes(subclass))
+    return classes
+
+
+def enable():
+    """
+    Turns instrumentation on: wraps make_guess of every player class, the Board print methods and playsound.
+    Player classes defined after this call are not wrapped.
+    """
+    global enabled
+    if enabled:
+        return
+    enabled = True
+
+    import audio
+    from board import Board
+    from player import Player
+
+    for cls in player_classes(Player):
+        if "make_guess" in cls.__dict__:
+            patch(cls, "make_guess", timed_guess)
+    for method in ("print_board", "print_two_boards"):
+        patch(Board, method, timed(PRINT_SECONDS, method=method))
+    patch(audio, "playsound", timed(SOUND_SECONDS))
+
+
+def disable():
+    """
+    Turns instrumentation off and restores every wrapped function. Recorded metrics are kept.
+    """
+    global enabled
+    enabled = False
+    while _patches:
+        owner, attribute, original = _patches.pop()
+        setattr(owner, attribute, original)
+
+
+def dump(path=None, format="json"):
+    """
+    Returns the recorded metrics as JSON or Prometheus text, also writing them to a file if a path is given.
+
+    Args:
+        path (str): The file to write, or None.
+        format (str): "json" or "prometheus".
+    """
+    text = REGISTRY.to_prometheus() if format == "prometheus" else REGISTRY.to_json() + "\n"
+    if path is not None:
+        with open(path, "w") as file:
+            file.write(text)
+    return text
+
+
+### Profiling ##################################################################
+
+def run_with_cprofile(function, *args, sort="cumulative", limit=25, stream=None, **kwargs):
+    """
+    Calls a function under cProfile and prints the most expensive functions.
+
+    Args:
+        function (callable): The function to profile, called with the remaining arguments.
+        sort (str): The pstats sort key.
+        limit (int): The number of functions to print.
+        stream: Where the report is written (sys.stdout if None).
+
+    Returns:
+        The return value of the function.
+    """
+    import cProfile  # Deterministic profiler; pstats alone takes longer to import than the rest of the game
+    import pstats    # cProfile reports
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *args, **kwargs)
+    finally:
+        pstats.Stats(profiler, stream=stream or sys.stdout).sort_stats(sort).print_stats(limit)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that records the call stack of one thread at a fixed interval from a background thread.
+    Its overhead does not grow with the number of function calls, unlike cProfile.
+
+    Attributes:
+        samples (Counter): Number of samples of each call stack, as tuples of "function (file:line)" frames
+            from the outermost to the innermost.
+    """
+
+    def __init__(self, interval=0.001):
+        """
+        Args:
+            interval (float): Seconds between samples.
+        """
+        self.interval = interval
+        self.samples = Tally()
+        self.running = False
+        self.thread = None
+
+    def start(self, thread_id=None):
+        """
+        Starts sampling a thread (the calling thread by default).
+        """
+        target = thread_id if thread_id is not None else threading.get_ident()
+        self.running = True
+        self.thread = threading.Thread(target=self.sample, args=(target,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+
+    def sample(self, target):
+        while self.running:
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def collapsed(self):
+        """
+        Returns the samples in the collapsed stack format read by flame graph tools.
+        """
+        return "\n".join(";".join(stack) + f" {count}" for stack, count in self.samples.most_common()) + "\n"
+
+    def report(self, limit=25):
+        """
+        Returns the functions that were most often on top of the stack (self time) and anywhere on the
+        stack (total time), as a share of all samples.
+        """
+        total = sum(self.samples.values()) or 1
+        own = Tally()
+        inclusive = Tally()
+        for stack, count in self.samples.items():
+            own[stack[-1]] += count
+            for frame in set(stack):
+                inclusive[frame] += count
+
+        lines = [f"{total} samples every {self.interval * 1000:g} ms", "", "   self  total  function"]
+        for frame, count in own.most_common(limit):
+            lines.append(f"{count / total:6.1%} {inclusive[frame] / total:6.1%}  {frame}")
+        return "\n".join(lines) + "\n"
+
+
+def run_with_sampling(function, *args, interval=0.001, limit=25, stream=None, collapsed=None, **kwargs):
+    """
+    Calls a function under the sampling profiler and prints its report.
+
+    Args:
+        function (callable): The function to profile, called with the remaining arguments.
+        interval (float): Seconds between samples.
+        limit (int): The number of functions to print.
+        stream: Where the report is written (sys.stdout if None).
+        collapsed (str): A file to write the collapsed stacks to (for flame graphs), or None.
+
+    Returns:
+        The return value of the function.
+    """
+    profiler = SamplingProfiler(interval)
+    profiler.start()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        profiler.stop()
+        (stream or sys.stdout).write(profiler.report(limit))
+        if collapsed is not None:
+            with open(collapsed, "w") as file:
+                file.write(profiler.collapsed())
+
+
+def main():
+    """
+    Command line entry point, e.g. `python Battleship/src/metrics.py medium easy --games 500 --profile sampling`.
+    """
+    import argparse
+    from simulation import parse_difficulty, run_chunk
+    from board import DEFAULT_BOARD_SIZE
+
+    parser = argparse.ArgumentParser(description="Play instrumented headless games and dump their metrics.")
+    parser.add_argument("player1", type=parse_difficulty, help="difficulty of the AI guessing first")
+    parser.add_argument("player2", type=parse_difficulty, help="difficulty of the AI guessing second")
+    parser.add_argument("--ships", type=int, default=5, help="number of ships per player (default: 5)")
+    parser.add_argument("--games", type=int, default=100, help="number of games to play (default: 100)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--board-size", type=int, default=DEFAULT_BOARD_SIZE, help="board width and height")
+    parser.add_argument("--format", choices=("json", "prometheus"), default="json", help="output format")
+    parser.add_argument("--output", default=None, help="file to write the metrics to (default: print them)")
+    parser.add_argument("--profile", choices=("cprofile", "sampling"), default=None,
+                        help="also profile the games")
+    parser.add_argument("--collapsed", default=None, help="file for the sampling profiler's collapsed stacks")
+    args = parser.parse_args()
+
+    enable()
+    games = (run_chunk, args.player1, args.player2, args.ships, args.games, args.seed, args.board_size)
+    if args.profile == "cprofile":
+        run_with_cprofile(*games, stream=sys.stderr)
+    elif args.profile == "sampling":
+        run_with_sampling(*games, stream=sys.stderr, collapsed=args.collapsed)
+    else:
+        games[0](*games[1:])
+    disable()
+
+    text = dump(args.output, args.format)
+    if args.output is None:
+        print(text, end="")
+
+
+if __name__ == "__main__":
+    # Run the imported module, so the flag and metrics are the ones the game modules see
+    import metrics
+    metrics.main()
@@ -0,0 +1,146 @@
+# Filename: placements.py
+# Description: Cached tables of every in-bounds ship placement per (board size, ship size, orientation), stored as
+# bitmasks using the same bit index as Board (row * size + column). Random fleets draw each ship from its table
+# and only redraw the few placements that overlap a ship placed before; on a crowded board the table is scanned
+# once for the placements that still fit, so fleet generation never loops for long. Boards too large for the
+# tables (the ones using SparseBoard) draw random in-bounds placements and redraw on the rare overlaps instead.
+# Inputs: The board size and the sizes of the ships of a fleet.
+# Outputs: Placement tables and random non-overlapping fleets as (size, position, orientation) tuples.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import random                     # To draw random placements
+from functools import lru_cache   # To build each placement table only once
+
+from board import SPARSE_BOARD_SIZE  # Largest board size that has placement tables
+import metrics                       # Opt-in count of the rejected placements
+
+# Overlapping draws allowed per ship before the free placements are listed instead
+MAX_REDRAWS = 16
+
+
+@lru_cache(maxsize=None)
+def placement_table(board_size, ship_size, orientation):
+    """
+    Builds the table of every in-bounds placement of a ship.
+
+    Args:
+        board_size (int): The width and height of the board.
+        ship_size (int): The length of the ship.
+        orientation (str): 'H' for horizontal or 'V' for vertical.
+
+    Returns:
+        tuple: (position, mask) pairs, where position is the (row, column) starting cell of the ship and mask
+        is the bitmask of the cells it covers.
+    """
+    if orientation == 'H':
+        rows, columns, step = board_size, board_size - ship_size + 1, 1
+    else:
+        rows, columns, step = board_size - ship_size + 1, board_size, board_size
+
+    # Bitmask of a ship starting at cell 0, shifted to every starting cell
+    base = 0
+    for i in range(ship_size):
+        base |= 1 << (i * step)
+
+    return tuple(
+        ((x, y), base << (x * board_size + y))
+        for x in range(rows)
+        for y in range(columns)
+    )
+
+
+@lru_cache(maxsize=None)
+def ship_placements(board_size, ship_size):
+    """
+    Returns every in-bounds placement of a ship in both orientations, as (position, mask, orientation) tuples.
+    """
+    # A single cell ship covers the same cells in both orientations
+    orientations = ('H',) if ship_size == 1 else ('H', 'V')
+    return tuple(
+        (position, mask, orientation)
+        for orientation in orientations
+        for position, mask in placement_table(board_size, ship_size, orientation)
+    )
+
+
+def random_fleet(board_size, ship_sizes, rng=random):
+    """
+    Draws a random fleet of non-overlapping ships. Each ship is drawn uniformly from every placement (both
+    orientations) that does not overlap the ships placed before it: draws that overlap are redrawn, and after
+    MAX_REDRAWS of them the placements that fit are listed and one of them is chosen. Both give the same
+    distribution as re-drawing a random orientation and starting cell until the ship fits.
+
+    Args:
+        board_size (int): The width and height of the board.
+        ship_sizes (iterable): The size of each ship, in placement order.
+        rng (random.Random): The random number generator.
+
+    Returns:
+        list: A (size, position, orientation) tuple for each ship.
+    """
+    if board_size > SPARSE_BOARD_SIZE:
+        return random_sparse_fleet(board_size, ship_sizes, rng)
+
+    fleet = []
+    occupied = 0
+    rejected = 0
+
+    for size in ship_sizes:
+        table = ship_placements(board_size, size)
+        for _ in range(MAX_REDRAWS):
+            position, mask, orientation = table[rng.randrange(len(table))]
+            if not mask & occupied:
+                break
+            rejected += 1
+        else:
+            # Crowded board: most draws overlap, so choose among the placements that still fit
+            position, mask, orientation = rng.choice([placement for placement in table if not placement[1] & occupied])
+
+        occupied |= mask
+        fleet.append((size, position, orientation))
+
+    if metrics.enabled:
+        metrics.PLACEMENT_RETRIES.inc(rejected, board="table")
+    return fleet
+
+
+def random_sparse_fleet(board_size, ship_sizes, rng=random):
+    """
+    Draws a random fleet of non-overlapping ships on a board too large for placement tables. Each ship gets a
+    random orientation and a random in-bounds starting cell, and is only redrawn if it overlaps a ship placed
+    before it. Both orientations have the same number of in-bounds placements on a square board, so this is
+    the same distribution as random_fleet.
+
+    Args:
+        board_size (int): The width and height of the board.
+        ship_sizes (iterable): The size of each ship, in placement order.
+        rng (random.Random): The random number generator.
+
+    Returns:
+        list: A (size, position, orientation) tuple for each ship.
+    """
+    fleet = []
+    occupied = set()
+    rejected = 0
+
+    for size in ship_sizes:
+        while True:
+            orientation = 'H' if size == 1 or rng.getrandbits(1) else 'V'
+            if orientation == 'H':
+                x, y = rng.randrange(board_size), rng.randrange(board_size - size + 1)
+                cells = range(x * board_size + y, x * board_size + y + size)
+            else:
+                x, y = rng.randrange(board_size - size + 1), rng.randrange(board_size)
+                cells = range(x * board_size + y, (x + size) * board_size + y, board_size)
+
+            if occupied.isdisjoint(cells):
+                break
+            rejected += 1
+
+        occupied.update(cells)
+        fleet.append((size, (x, y), orientation))
+
+    if metrics.enabled:
+        metrics.PLACEMENT_RETRIES.inc(rejected, board="sparse")
+    return fleet
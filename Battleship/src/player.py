@@ -1,6 +1,6 @@
 # Name:player.py
 # Description: This module defines the Player and AI classes for a console-based Battleship game. 
-# Players can place ships, make guesses, and play against AI of varying difficulties (easy, medium, hard).
+# Players can place ships, make guesses, and play against AI of varying difficulties (easy, medium, hard, expert, sampling).
 # Inputs: Player names, ship placements, and guesses. AI behavior based on difficulty.
 # Outputs: Results of guesses (hits/misses), board states.
 # Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
@@ -8,12 +8,20 @@
 # Creation Date: 
 
 # Import necessary classes from other modules
-from board import Board  # Handles the grid and ship placements for each player
-from ship import Ship    # Defines the properties and behavior of ships in the game
+from board import make_board, parse_position, DEFAULT_BOARD_SIZE, SPARSE_BOARD_SIZE  # Handles the grid and ship placements for each player
+from cellpool import CellPool  # Untargeted cells drawn by the randomly firing AIs
+from decisioncache import get_cache, observation_key  # Decisions of the expensive AIs, shared across games
+from density import DensityMap  # Incremental placement density used by the density targeting AI
+from layouts import pool_layout  # Fleet layouts optimized against the other AIs, when a pool is loaded
+from placements import random_fleet  # Draws random fleets from the cached placement tables
+from sampling import best_cell, get_sampler  # Monte Carlo fleet layouts of the sampling AI
+from ship import Ship, fleet_sizes  # Defines the properties and behavior of ships in the game
 from enum import Enum    # Used for AI difficulty settings
-from playsound import playsound  # To play sound effects for hits and misses
-import os                # To interact with the file system for sound file paths
+from audio import get_audio  # To play sound effects for hits, misses and sunk ships without blocking
+from inputs import TerminalInput  # Default source of the moves of human players
+import os                # Number of CPU cores for the sampling AI's worker pool
 import random            # For AI to randomly choose ship placements and guesses
+from collections import deque  # Frontier of the medium AI and target queue of the hard AI
 
 # python3 -m venv battleship
 # source battleship/bin/activate
@@ -26,7 +34,9 @@ class Player:
     another board for tracking their guesses on the opponent's ships.
     """
 
-    def __init__(self, name, num_ships):
+    difficulty = None  # Human players have no AI difficulty
+
+    def __init__(self, name, num_ships, verbose=True, board_size=DEFAULT_BOARD_SIZE, input_source=None):
         """
         Initializes a new player with a given name. The player also has two boards: one for their own ships and
         one for recording their guesses on the opponent's board.
@@ -34,11 +44,16 @@ class Player:
         Args:
             name (str): The player's name.
             num_ships (int): Number of ships the player can place.
+            verbose (bool): If False, guesses are resolved without console output or sound effects.
+            board_size (int): The width and height of both boards.
+            input_source: Where placements and guesses come from (the terminal if None), see inputs.py.
         """
         self.name = name  # Name of the player
-        self.board = Board()  # Board object representing the player's ship placements
-        self.guesses = Board()  # Board object representing the player's guesses on the opponent's board
+        self.board = make_board(board_size, verbose)  # Board object representing the player's ship placements
+        self.guesses = make_board(board_size, verbose)  # Board object representing the player's guesses on the opponent's board
         self.num_ships = num_ships  # Number of ships the player is allowed to place
+        self.verbose = verbose  # Whether guesses print results and play sound effects
+        self.input_source = input_source if input_source is not None else TerminalInput()
 
     def place_ships(self):
         """
@@ -47,44 +62,37 @@ class Player:
         (horizontal or vertical). The function checks if the position is valid and places the ship on the board.
         """
         # Loop to place ships based on size
-        for size in range(1, self.num_ships + 1):
-            print()
-            self.board.print_board()
-            print()
+        for size in fleet_sizes(self.num_ships):
+            if self.verbose:
+                print()
+                self.board.print_board()
+                print()
 
-            valid_position = False  # Flag to indicate if a valid position has been chosen
-            
             # Keep asking for a valid position until the ship is successfully placed
-            while not valid_position:
-                position = input(self.name + f" place your {size}x1 ship (e.g., B3): ").upper()
-
-                # Validate the input format (must be letter followed by a number)
-                if len(position) < 2 or not position[0].isalpha() or not position[1:].isdigit():
-                    print("Invalid input format. Please use the format 'LetterNumber' (e.g., B3).")
-                    continue
+            ship = None
+            while True:
+                (x, y), orientation = self.input_source.next_placement(self, size)
 
-                # Convert the input into coordinates for the board
-                x = int(position[1:]) - 1  # Convert number part to a 0-based index
-                y = ord(position[0]) - 65  # Convert letter part to a 0-based index (A=0, B=1, etc.)
-                
                 # Check if the position is within the board's bounds
                 if x < 0 or x >= self.board.size or y < 0 or y >= self.board.size:
-                    print("Position out of bounds. Please choose a valid position on the board.")
+                    self.input_source.reject("Position out of bounds. Please choose a valid position on the board.")
                     continue
 
-                # Ask for the ship's orientation (H for horizontal, V for vertical)
-                if size != 1:
-                    orientation = input("Choose orientation (H for horizontal, V for vertical): ").upper()
-                    if orientation not in ['H', 'V']:
-                        print("Invalid orientation. Please enter 'H' for horizontal or 'V' for vertical.")
-                        continue
-                else: 
-                    orientation = 'H'  # Single-tile ships are placed horizontally by default
-
-                # Create a new Ship object and attempt to place it on the board
-                ship = Ship(size, (x, y), orientation)
+                # Attempt to place the ship on the board, reusing the ship of a rejected attempt
+                if ship is None:
+                    ship = Ship(size, (x, y), orientation)
+                else:
+                    ship.reset(size, (x, y), orientation)
                 if self.board.place_ship(ship):  # Place the ship and check if the position is valid
-                    valid_position = True  # Ship placed successfully, exit the loop
+                    break  # Ship placed successfully, exit the loop
+                self.input_source.reject(None)  # The board explains why the ship does not fit
+
+    def reset(self):
+        """
+        Clears both boards for a new game against a new opponent, keeping the player's settings.
+        """
+        self.board.reset()
+        self.guesses.reset()
 
     def print_boards(self):
         """
@@ -114,72 +122,86 @@ class Player:
             return None
         
         # Ensure the guess hasn't already been made at this position
-        if self.guesses.grid[x][y] != '~':
+        if self.guesses.is_guessed(x, y):
             return None
     
         # Check if the guess hits an opponent's ship
         hit = opponent.board.receive_fire(x, y)
         
-        # Update the guesses board with 'X' for hit and 'O' for miss
-        self.guesses.grid[x][y] = 'X' if hit else 'O'
+        # Update the guesses board with the hit or miss
+        self.guesses.mark_guess(x, y, hit)
+
+        # Tell the player whether the guess sank a ship
+        sunk_ship = None
+        if hit:
+            ship = opponent.board.ship_at(x, y)
+            if ship.destroyed:
+                sunk_ship = ship
+        self.on_guess_result(position, hit, sunk_ship)
+
+        # Headless players skip all console and audio feedback
+        if not self.verbose:
+            return hit
 
         # Play sound effects based on the result of the guess
-        cwd = str(os.getcwd())
         if hit:
             print("It's a hit!")
-            playsound(f"{cwd}/Battleship/src/sound_files/hit-2.wav")
+            get_audio().play("sunk" if sunk_ship is not None else "hit")
         else:
             print("It's a miss!")
-            playsound(f"{cwd}/Battleship/src/sound_files/miss-2.wav")
+            get_audio().play("miss")
 
         return hit
 
+    def on_guess_result(self, position, hit, sunk_ship):
+        """
+        Called by submit_guess once a guess has been resolved. Does nothing for human players; AI players
+        override it to update their targeting state incrementally.
+
+        Args:
+            position (tuple): The coordinates of the guessed position.
+            hit (bool): True if the guess hit a ship.
+            sunk_ship (Ship): The ship sunk by the guess, or None if no ship was sunk.
+        """
+        pass
+
     def make_guess(self, opponent):
         """
         Allows the player to guess the position of the opponent's ships. The player enters a position, and it is 
         checked for validity. The result of the guess is recorded on the player's guesses board, with 'X' for a hit 
         and 'O' for a miss.
         """
-        valid_guess = False  # Flag to indicate if a valid guess has been made
-        
         # Keep asking for a valid guess until a valid input is provided
-        while not valid_guess:
-            guess = input(f"{self.name}, enter your guess (e.g., B3): ").upper()
+        while True:
+            x, y = self.input_source.next_guess(self)
 
-            # Validate the input format (must be letter followed by a number)
-            if len(guess) < 2 or not guess[0].isalpha() or not guess[1:].isdigit():
-                print("Invalid input format. Please use the format 'LetterNumber' (e.g., B3).")
-                continue
-
-            # Convert the input into coordinates for the guess
-            x = int(guess[1:]) - 1  # Convert number part to a 0-based index
-            y = ord(guess[0]) - 65  # Convert letter part to a 0-based index (A=0, B=1, etc.)
-            
             # Check if the guess is within the board's bounds
             if x < 0 or x >= self.guesses.size or y < 0 or y >= self.guesses.size:
-                print("Guess out of bounds. Please choose a valid position on the board.")
+                self.input_source.reject("Guess out of bounds. Please choose a valid position on the board.")
                 continue
 
             # Check if guess is a duplicate guess or not
-            if self.guesses.grid[x][y] != '~':
-                print("Guess is a duplicate. Please choose a unique guess")
+            if self.guesses.is_guessed(x, y):
+                self.input_source.reject("Guess is a duplicate. Please choose a unique guess")
                 continue 
 
-            hit = Player.submit_guess(self, opponent, (x, y))
-
-            valid_guess = True  # Valid guess made, exit the loop
+            Player.submit_guess(self, opponent, (x, y))
+            return
 
 
 ### AI Player Logic ############################################################
 
-def get_random_position():
+def get_random_position(size=DEFAULT_BOARD_SIZE):
     """
-    Generates a random (x, y) position within the 10x10 board.
+    Generates a random (x, y) position within the board (10x10 by default).
+
+    Args:
+        size (int): The width and height of the board.
     
     Returns:
         tuple: A tuple representing a random position on the board.
     """
-    return tuple(int(random.random() * 10) for _ in range(2))
+    return tuple(int(random.random() * size) for _ in range(2))
 
 def add_tuples(tuple1, tuple2):
     """
@@ -197,28 +219,40 @@ def add_tuples(tuple1, tuple2):
         tuple1[1] + tuple2[1]
     )
 
+# Directional steps (up, right, down, left)
+STEPS = [
+    (-1, 0), (0, 1),
+    (1, 0), (0, -1)
+]
+
 class AIDifficulties(Enum):
     
     EASY   = 0  # Randomly firing AI with no strategy
     MEDIUM = 1  # AI that mimics human strategy by targeting nearby cells after a hit
     HARD   = 2  # AI that always knows where the ships are, effectively 'cheating'
+    EXPERT = 3  # AI that fires at the cell covered by the most legal placements of the remaining ships
+    SAMPLING = 4  # AI that fires at the cell most often occupied in random fleets matching what it has seen
 
-def AI_factory(difficulty, num_ships):
+def AI_factory(difficulty, num_ships, verbose=True, board_size=DEFAULT_BOARD_SIZE):
     """
     Factory function to create an AI player of the specified difficulty.
     
     Args:
-        difficulty (AIDifficulties): The difficulty level of the AI (EASY, MEDIUM, HARD).
+        difficulty (AIDifficulties): The difficulty level of the AI (EASY, MEDIUM, HARD, EXPERT, SAMPLING).
         num_ships (int): The number of ships each AI player will control.
+        verbose (bool): If False, the AI plays without console output or sound effects.
+        board_size (int): The width and height of the AI's boards.
     
     Returns:
         AIPlayer: An instance of an AI player with the appropriate difficulty.
     """
     return [
-        AIPlayerEasy(num_ships),
-        AIPlayerMedium(num_ships),
-        AIPlayerHard(num_ships)
-    ][difficulty.value]
+        AIPlayerEasy,
+        AIPlayerMedium,
+        AIPlayerHard,
+        AIPlayerExpert,
+        AIPlayerSampling
+    ][difficulty.value](num_ships, verbose, board_size)
 
 class AIPlayer(Player):
     """
@@ -230,30 +264,88 @@ class AIPlayer(Player):
     Attributes:
         board (Board): The board where the AI places its ships.
         guesses (Board): The board where the AI records its guesses on the opponent.
+        sunk_sizes (list): The sizes of the opponent's ships sunk so far.
+        sunk_mask (int): Bitmask of the cells of the sunk ships (only kept on boards with bitmasks).
+        cache (DecisionCache): Where decisions made by decide() are looked up, or None to always compute them.
+        fleet (list): The Ship objects placed by place_ships(), reused by the next game after reset().
     """
     
-    def __init__(self, num_ships):
+    def __init__(self, num_ships, verbose=True, board_size=DEFAULT_BOARD_SIZE):
         """
         Initializes the AI player with a board and guess board.
         """
         self.num_ships = num_ships
-        self.board     = Board()
-        self.guesses   = Board()
+        self.board     = make_board(board_size, verbose)
+        self.guesses   = make_board(board_size, verbose)
+        self.verbose   = verbose
+        self.sunk_sizes = []
+        self.sunk_mask  = 0
+        self.cache      = None
+        self.fleet      = []
 
-    def place_ships(self):
+    def reset(self):
+        """
+        Prepares the AI for a new game: empties its boards and forgets what it observed. Subclasses overriding
+        this method call it first and reset their targeting state in place.
+        """
+        super().reset()
+        self.sunk_sizes.clear()
+        self.sunk_mask = 0
+
+    def use_cache(self):
         """
-        Places ships randomly on the board for the AI player.
+        Makes decide() look decisions up in the decision cache of the process. Boards using the sparse backend
+        keep no masks to build keys from, and their observations hardly ever repeat, so they are not cached.
         """
-        for size in range(1, self.num_ships + 1):
-            valid_place = False
+        if self.guesses.size <= SPARSE_BOARD_SIZE:
+            self.cache = get_cache()
 
-            # Keep attempting to place the ship until a valid position is found
-            while not valid_place:
-                orientation = ['H', 'V'][random.getrandbits(1)]  # Randomly choose orientation
-                position    = get_random_position()  # Get a random starting position
+    def on_guess_result(self, position, hit, sunk_ship):
+        """
+        Records the ships sunk by the AI. Subclasses overriding this method call it first.
+        """
+        if sunk_ship is not None:
+            self.sunk_sizes.append(sunk_ship.size)
+            if self.guesses.size <= SPARSE_BOARD_SIZE:
+                self.sunk_mask |= sunk_ship.get_mask(self.guesses.size)
+
+    def decide(self, choose):
+        """
+        Returns the target for the current observation, calling choose() only if the decision cache does not
+        know it yet. choose() must depend on nothing but the guess board and the sunk ships.
 
-                ship = Ship(size, position, orientation)  # Create a ship object
-                valid_place = self.board.place_ship(ship)  # Place the ship on the board
+        Args:
+            choose (callable): Computes the (x, y) target.
+
+        Returns:
+            tuple: The (x, y) target.
+        """
+        if self.cache is None:
+            return choose()
+        key = observation_key(self.name, self)
+        position = self.cache.get(key)
+        if position is None:
+            position = choose()
+            self.cache.put(key, position)
+        return position
+
+    def place_ships(self):
+        """
+        Places ships randomly on the board for the AI player. If a layout pool was loaded for this board and
+        fleet, the layout is drawn from the pool; otherwise every ship is drawn from the placements that fit next
+        to the ships already placed, so no attempt is ever rejected.
+        """
+        sizes = fleet_sizes(self.num_ships)
+        layout = pool_layout(self.board.size, sizes) or random_fleet(self.board.size, sizes)
+        for index, (size, position, orientation) in enumerate(layout):
+            # Ships of the previous game are no longer on the (reset) board, so they are placed again
+            if index < len(self.fleet):
+                ship = self.fleet[index]
+                ship.reset(size, position, orientation)
+            else:
+                ship = Ship(size, position, orientation)
+                self.fleet.append(ship)
+            self.board.add_ship(ship)  # Layouts never leave the board or overlap, so they need no checks
 
     def print_boards(self):
         """
@@ -267,6 +359,20 @@ class AIPlayer(Player):
         """
         raise NotImplementedError()
 
+    def fire_at_random(self, opponent):
+        """
+        Fires at a random untargeted cell drawn from the player's cell pool, so no draw is ever wasted on a
+        cell that was already guessed.
+
+        Args:
+            opponent (Player): The opponent player whose ships are being targeted.
+
+        Returns:
+            tuple: The position fired at and whether it was a hit.
+        """
+        position = divmod(self.untargeted.draw(), self.guesses.size)
+        return position, Player.submit_guess(self, opponent, position)
+
 
 class AIPlayerEasy(AIPlayer):
     """
@@ -275,13 +381,20 @@ class AIPlayerEasy(AIPlayer):
     Attributes:
         name (str): Name of the AI player.
     """
-    
-    def __init__(self, num_ships):
+
+    difficulty = AIDifficulties.EASY  # Level of the AI, e.g. to tag exported games
+
+    def __init__(self, num_ships, verbose=True, board_size=DEFAULT_BOARD_SIZE):
         """
         Initializes an easy AI player with a name and a number of ships.
         """
-        super().__init__(num_ships)
+        super().__init__(num_ships, verbose, board_size)
         self.name = "AI (EASY)"
+        self.untargeted = CellPool(self.guesses.size)  # Cells not fired at yet
+
+    def reset(self):
+        super().reset()
+        self.untargeted.reset()
 
     def make_guess(self, opponent):
         """
@@ -290,174 +403,327 @@ class AIPlayerEasy(AIPlayer):
         Args:
             opponent (Player): The opponent player whose ships are being targeted.
         """
-        valid_guess = False
-
-        while not valid_guess:
-            position = get_random_position()  # Select a random position on the board
-            valid_guess = Player.submit_guess(self, opponent, position) is not None  # Ensure guess is valid
+        self.fire_at_random(opponent)  # Select a random untargeted position on the board
 
 
 class AIPlayerMedium(AIPlayer):
     """
     AI player for the medium difficulty level. This AI uses a more sophisticated strategy by 
     targeting adjacent cells when it hits a ship, attempting to find and sink the entire ship.
+
+    Targeting is a non-recursive state machine: while no ship is partially hit the AI hunts at random, and
+    every hit queues the cells around it in a frontier, with cells continuing a line of hits queued first.
+    Sink notifications remove the sunk ship's cells from the open hits, so several partially hit ships can be
+    tracked at once and every move does a bounded amount of work.
     
     Attributes:
         name (str): Name of the AI player.
-        initial_hit (tuple): Coordinates of the first hit on a ship.
-        previous_hit (tuple): Coordinates of the last hit, used to find the direction of the ship.
-        hit_direction (int): Index representing the direction (up, down, left, right) of the ship.
+        open_hits (set): Hit cells of ships that have not been sunk yet.
+        frontier (deque): Candidate cells next to open hits, the most promising first.
     """
-    
-    def __init__(self, num_ships):
+
+    difficulty = AIDifficulties.MEDIUM
+
+    def __init__(self, num_ships, verbose=True, board_size=DEFAULT_BOARD_SIZE):
         """
         Initializes a medium AI player with a name and strategies for targeting ships.
         """
-        super().__init__(num_ships)
+        super().__init__(num_ships, verbose, board_size)
         self.name = "AI (MEDIUM)"
-        self.initial_hit = None
-        self.previous_hit = None
-        self.hit_direction = None
+        self.untargeted = CellPool(self.guesses.size)  # Cells not fired at yet, for the random search
+        self.open_hits = set()
+        self.frontier = deque()
+
+    def reset(self):
+        super().reset()
+        self.untargeted.reset()
+        self.open_hits.clear()
+        self.frontier.clear()
+
+    def on_guess_result(self, position, hit, sunk_ship):
+        """
+        Updates the targeting state with the result of the last guess.
+        """
+        super().on_guess_result(position, hit, sunk_ship)
+        x, y = position
+        self.untargeted.discard(x * self.guesses.size + y)
+        if not hit:
+            return
+
+        # A sunk ship no longer needs targeting; forget the frontier once no ship is partially hit
+        if sunk_ship is not None:
+            self.open_hits.difference_update(sunk_ship.coordinates)
+            if not self.open_hits:
+                self.frontier.clear()
+            return
+
+        self.open_hits.add(position)
+        for dx, dy in STEPS:
+            if (x - dx, y - dy) not in self.open_hits:
+                self.frontier.append((x + dx, y + dy))  # Any neighbour may continue the ship
+                continue
 
-    def clear_strategy_if_sunk(self, opponent):
+            # The hit extends a line of hits: try both ends of the line before anything else
+            end = (x - dx, y - dy)
+            while (end[0] - dx, end[1] - dy) in self.open_hits:
+                end = (end[0] - dx, end[1] - dy)
+            self.frontier.appendleft((end[0] - dx, end[1] - dy))
+            self.frontier.appendleft((x + dx, y + dy))
+
+    def is_candidate(self, x, y):
+        """
+        Returns True if a frontier cell is still worth firing at: on the board, not guessed yet and next to
+        a hit of a ship that has not been sunk.
         """
-        Resets the targeting strategy if the ship being tracked is sunk.
+        size = self.guesses.size
+        if x < 0 or x >= size or y < 0 or y >= size or self.guesses.is_guessed(x, y):
+            return False
+        return any((x + dx, y + dy) in self.open_hits for dx, dy in STEPS)
+
+    def make_guess(self, opponent):
+        """
+        Makes a guess for the medium AI: the most promising frontier cell if a ship is partially hit, otherwise
+        a random untargeted cell.
         
         Args:
             opponent (Player): The opponent player whose ships are being targeted.
         """
-        for ship in opponent.board.ships:
-            if self.initial_hit in ship.coordinates and ship.destroyed:
-                self.initial_hit = None
-                self.previous_hit = None
-                self.hit_direction = None
+        # TARGET: fire at the first frontier cell that is still a candidate, dropping stale ones
+        while self.frontier:
+            x, y = self.frontier.popleft()
+            if self.is_candidate(x, y):
+                Player.submit_guess(self, opponent, (x, y))
                 return
 
+        # HUNT: no ship is partially hit (or none of its neighbours is left), fire at random
+        self.fire_at_random(opponent)
+
+
+class AIPlayerHard(AIPlayer):
+    """
+    AI player for the hard difficulty level. This AI 'cheats' by directly targeting the
+    opponent's ships based on their known locations on the board. The ship cells are queued in row-major
+    order on the first move, so every move afterwards is a constant-time pop.
+    
+    Attributes:
+        name (str): Name of the AI player.
+        miss_rate (float): Fraction of moves fired at a random cell without a ship, to tune the difficulty down.
+        targets (deque): The opponent's ship cells not fired at yet, or None before the first move.
+    """
+
+    difficulty = AIDifficulties.HARD
+
+    def __init__(self, num_ships, verbose=True, board_size=DEFAULT_BOARD_SIZE, miss_rate=0.0):
+        """
+        Initializes a hard AI player that knows the opponent's ship positions.
+        """
+        super().__init__(num_ships, verbose, board_size)
+        self.name = "AI (HARD)"
+        self.miss_rate = miss_rate
+        self.targets = None
+        self.untargeted = CellPool(self.guesses.size) if miss_rate else None  # Candidates for deliberate misses
+
+    def reset(self):
+        super().reset()
+        self.targets = None
+        if self.untargeted is not None:
+            self.untargeted.reset()
+
+    def fire_miss(self, opponent):
+        """
+        Fires at a random untargeted cell that holds no ship.
+
+        Returns:
+            bool: False if every untargeted cell holds a ship, so no miss could be fired.
+        """
+        size = self.guesses.size
+        while self.untargeted:
+            cell = self.untargeted.draw()
+            if cell not in opponent.board.occupancy:
+                Player.submit_guess(self, opponent, divmod(cell, size))
+                return True
+        return False  # Ship cells drawn here stay in the target queue
+
     def make_guess(self, opponent):
         """
-        Makes a guess for the medium AI. This AI will continue targeting adjacent cells after a hit
-        to attempt to find the full ship, switching directions as necessary.
+        Makes a guess for the hard AI. This AI always targets unhit cells that contain an opponent's ship.
         
         Args:
             opponent (Player): The opponent player whose ships are being targeted.
         """
-        STEPS = [
-            (-1, 0), (0, 1),
-            (1, 0), (0, -1)  # Directional steps (up, right, down, left)
-        ]
-
-        # CASE ONE: No ship is currently being targeted
-        if self.initial_hit is None:
-            position = None
-            guess_status = None
-
-            while guess_status is None:
-                position = get_random_position()  # Select a random position
-                guess_status = Player.submit_guess(self, opponent, position)  # Fire at the position
+        # Queue the ship cells in row-major order once the opponent's fleet is known
+        if self.targets is None:
+            size = opponent.board.size
+            self.targets = deque(divmod(index, size) for index in sorted(opponent.board.occupancy))
 
-            if guess_status:
-                self.initial_hit = position  # Record the first hit
-                self.clear_strategy_if_sunk(opponent)  # Check if the ship is sunk
+        if self.miss_rate and random.random() < self.miss_rate and self.fire_miss(opponent):
             return
 
-        # CASE TWO: A ship has been hit, but no direction is confirmed yet
-        if self.previous_hit is None:
-            for direction in range(4):  # Try all four directions (up, right, down, left)
-                step = STEPS[direction]
-                position = self.initial_hit
+        # Fire at the next ship cell that has not been hit
+        while self.targets:
+            x, y = self.targets.popleft()
+            if not self.guesses.is_hit(x, y):
+                Player.submit_guess(self, opponent, (x, y))  # Directly hit the ship's position
+                return
+
 
-                for _ in opponent.board.ships:
-                    position = add_tuples(position, step)  # Probe further in the chosen direction
+class AIPlayerExpert(AIPlayer):
+    """
+    AI player for the expert difficulty level. This AI scores every cell by how many legal placements of
+    the opponent's remaining ships cover it, given the known hits, misses and sunk ships, and fires at the
+    highest scoring cell. The scores are updated incrementally after every shot.
 
-                    x, y = position
+    The choice depends only on what the AI has observed, so the opening is played from the decision cache: while
+    the cache knows every position reached, no density map is needed at all. The first unknown position is
+    almost always followed by more unknown ones, so from then on the AI stops looking positions up, builds the
+    map of the current position in one pass and keeps it up to date incrementally.
 
-                    # Check another direction if probe goes off board
-                    if x < 0 or x >= opponent.board.size or \
-                       y < 0 or y >= opponent.board.size:
-                        break
+    Attributes:
+        name (str): Name of the AI player.
+        density (DensityMap): The placement density of the opponent's remaining ships, or None in the opening.
+        pending (list): Results of the guesses made in the opening, for building the density map.
+    """
 
-                    if self.guesses.grid[x][y] == 'X':  # Check if cell has been hit already
-                        continue
+    difficulty = AIDifficulties.EXPERT
 
-                    guess_status = Player.submit_guess(self, opponent, position)
+    def __init__(self, num_ships, verbose=True, board_size=DEFAULT_BOARD_SIZE):
+        """
+        Initializes an expert AI player whose density map is built once it leaves the cached opening.
+        """
+        super().__init__(num_ships, verbose, board_size)
+        self.name = "AI (EXPERT)"
+        self.density = None
+        self.pending = []
+        self.use_cache()
 
-                    if guess_status is not None:
-                        if guess_status:
-                            self.previous_hit = position  # Record the hit
-                            self.hit_direction = direction  # Record the direction
-                            self.clear_strategy_if_sunk(opponent)
-                        return
-                    
-                    break # Probe hit invalid cell
+    def reset(self):
+        super().reset()
+        self.density = None
+        self.pending.clear()
 
-            # If no valid direction found, reset and retry
-            self.initial_hit = None
-            self.make_guess(opponent)
+    def on_guess_result(self, position, hit, sunk_ship):
+        """
+        Updates the density map with the result of the last guess, or remembers it while in the opening.
+        """
+        super().on_guess_result(position, hit, sunk_ship)
+        if self.density is None:
+            self.pending.append((position, hit, sunk_ship))
             return
 
-        # CASE THREE: A direction has been found, continue probing in that direction
-        step = STEPS[self.hit_direction]
-        position = self.previous_hit
+        x, y = position
+        if not hit:
+            self.density.record_miss(x, y)
+            return
 
-        for _ in opponent.board.ships:
-            position = add_tuples(position, step)  # Move in the confirmed direction            
-            x, y = position
+        self.density.record_hit(x, y)
+        if sunk_ship is not None:
+            self.density.record_sunk(sunk_ship.coordinates)
 
-            # Check another direction if probe goes off board
-            if x < 0 or x >= opponent.board.size or \
-               y < 0 or y >= opponent.board.size:
-                break
+    def choose_target(self):
+        """
+        Builds the density map of the current position and returns its best cell. Called once the opening
+        reaches a position the decision cache does not know.
+        """
+        self.density = DensityMap(self.guesses.size, fleet_sizes(self.num_ships),
+                                  misses=[position for position, hit, _ in self.pending if not hit],
+                                  hits=[position for position, hit, _ in self.pending if hit],
+                                  sunk_ships=[ship.coordinates for _, _, ship in self.pending if ship is not None])
+        self.pending.clear()
+        return self.density.best()
 
-            # Check if probe is a known miss
-            if self.guesses.grid[x][y] == 'O':
-                break
+    def make_guess(self, opponent):
+        """
+        Makes a guess for the expert AI by firing at the cell with the highest placement density.
 
-            guess_status = Player.submit_guess(self, opponent, position)
-            if guess_status is not None:
-                if guess_status:
-                    self.previous_hit = position  # Continue in the same direction
-                    self.clear_strategy_if_sunk(opponent)
-                else:
-                    # If a miss occurs, reset and stop targeting in this direction
-                    self.previous_hit = None
-                    self.hit_direction = None
-                return
-        
-        # If the direction goes off the board, reset and retry
-        self.previous_hit  = None
-        self.hit_direction = None
-        self.make_guess(opponent)
+        Args:
+            opponent (Player): The opponent player whose ships are being targeted.
+        """
+        if self.density is None:
+            target = self.decide(self.choose_target)  # Opening: look the position up
+        else:
+            target = self.density.best()
+        Player.submit_guess(self, opponent, target)
 
 
-class AIPlayerHard(AIPlayer):
+class AIPlayerSampling(AIPlayer):
     """
-    AI player for the hard difficulty level. This AI 'cheats' by directly targeting the
-    opponent's ships based on their known locations on the board.
-    
+    AI player for the sampling difficulty level. Before every move this AI draws many random layouts of the
+    opponent's remaining ships that agree with its hits, misses and sunk ships, and fires at the cell occupied
+    in the most layouts. Each move stops sampling after max_samples layouts or time_budget seconds, whichever
+    comes first, and fires at the best cell found so far. Interactive games spread the samples across one worker
+    process per CPU core; headless games, which are usually run in parallel already, sample in-process.
+
     Attributes:
         name (str): Name of the AI player.
+        max_samples (int): The number of layouts drawn per move at most.
+        time_budget (float): The number of seconds a move may take at most.
+        sampler (Sampler): Draws the layouts, in this process or across worker processes.
+        samples (int): The number of layouts drawn over the game.
     """
-    
-    def __init__(self, num_ships):
+
+    difficulty = AIDifficulties.SAMPLING
+
+    # Default sampling budget of a move
+    MAX_SAMPLES = 400
+    TIME_BUDGET = 0.05
+
+    def __init__(self, num_ships, verbose=True, board_size=DEFAULT_BOARD_SIZE, max_samples=MAX_SAMPLES,
+                 time_budget=TIME_BUDGET, workers=None):
         """
-        Initializes a hard AI player that knows the opponent's ship positions.
+        Initializes a sampling AI player.
+
+        Raises:
+            ValueError: If the board is too large to have bitmasks (see SPARSE_BOARD_SIZE).
         """
-        super().__init__(num_ships)
-        self.name = "AI (HARD)"
+        super().__init__(num_ships, verbose, board_size)
+        if board_size > SPARSE_BOARD_SIZE:
+            raise ValueError(f"the sampling AI needs a board of at most {SPARSE_BOARD_SIZE}x{SPARSE_BOARD_SIZE}")
+        self.name = "AI (SAMPLING)"
+        self.max_samples = max_samples
+        self.time_budget = time_budget
+        self.sampler = get_sampler(workers if workers is not None else (os.cpu_count() or 1) if verbose else 1)
+        self.samples = 0
+        self.untargeted = CellPool(self.guesses.size)  # Fallback when no layout could be drawn in time
+        self.use_cache()
+
+    def reset(self):
+        super().reset()
+        self.samples = 0
+        self.untargeted.reset()
+
+    def on_guess_result(self, position, hit, sunk_ship):
+        """
+        Records the sunk ships and removes the cell from the fallback pool.
+        """
+        super().on_guess_result(position, hit, sunk_ship)
+        x, y = position
+        self.untargeted.discard(x * self.guesses.size + y)
+
+    def choose_target(self):
+        """
+        Samples layouts of the remaining ships and returns the unshot cell occupied in the most of them, or a
+        random untargeted cell if none was drawn within the budget.
+        """
+        remaining = fleet_sizes(self.num_ships)
+        for size in self.sunk_sizes:
+            remaining.remove(size)
+
+        guesses = self.guesses
+        counts, samples = self.sampler.sample(guesses.size, remaining, guesses.miss_mask | self.sunk_mask,
+                                              guesses.hit_mask & ~self.sunk_mask, self.max_samples,
+                                              self.time_budget)
+        self.samples += samples
+
+        target = best_cell(guesses.size, counts, guesses.hit_mask | guesses.miss_mask)
+        if target is None:
+            target = divmod(self.untargeted.draw(), guesses.size)
+        return target
 
     def make_guess(self, opponent):
         """
-        Makes a guess for the hard AI. This AI always targets unhit cells that contain an opponent's ship.
-        
+        Makes a guess for the sampling AI.
+
         Args:
             opponent (Player): The opponent player whose ships are being targeted.
         """
-        for x in range(self.board.size):
-            for y in range(self.board.size):
-
-                is_ship = opponent.board.grid[x][y] == 'S'  # Check if there is a ship at this location
-                is_hit  = self.guesses.grid[x][y] == 'X'  # Check if this position has already been hit
-
-                if is_ship and not is_hit:
-                    Player.submit_guess(self, opponent, (x, y))  # Directly hit the ship's position
-                    return
+        Player.submit_guess(self, opponent, self.decide(self.choose_target))
@@ -0,0 +1,224 @@
+# Filename: renderer.py
+# Description: Buffered frame renderer for the Battleship boards. A whole frame (one board, or the guess and
+# placement boards side by side) is built into one buffer and written with a single call. The rendered string of
+# every board row is cached and only rebuilt when the row changed, and in incremental mode only the cells that
+# changed since the previous frame are rewritten using ANSI cursor moves. Cell types can be colored; the colored
+# cell strings are built once, so coloring adds no per-cell cost.
+# Inputs: Boards to display (anything with size, row(i) and row_versions, such as Board and SparseBoard).
+# Outputs: The board frames written to the terminal.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import sys      # Default output stream
+import weakref  # Row caches disappear together with their boards
+
+# ANSI escape sequences
+RESET = "\x1b[0m"
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_BELOW = "\x1b[J"
+CLEAR_LINE = "\x1b[K"
+
+# ANSI color of each cell type: water, ship, hit and miss
+CELL_COLORS = {
+    '~': "\x1b[34m",
+    'S': "\x1b[1;37m",
+    'X': "\x1b[1;31m",
+    'O': "\x1b[33m",
+}
+
+# Number of columns between boards drawn side by side (including the row numbers of the right board)
+BOARD_GAP = 6
+
+
+def column_label(index):
+    """
+    Returns the letter label of a 0-based column index, continuing like a spreadsheet after Z (Z, AA, AB, ...).
+    """
+    label = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(65 + remainder) + label  # chr(65) is 'A'
+    return label
+
+
+def move_to(row, column):
+    """
+    Returns the ANSI sequence moving the cursor to a 0-based (row, column) screen position.
+    """
+    return f"\x1b[{row + 1};{column + 1}H"
+
+
+class Renderer:
+    """
+    Renders boards into single-write frames.
+
+    Attributes:
+        color (bool): Whether cells are colored by type.
+        incremental (bool): Whether frames after the first only rewrite the cells that changed. The renderer
+            then owns the top of the screen: the first frame clears the screen and every frame leaves the
+            cursor just below itself.
+    """
+
+    def __init__(self, stream=None, color=False, incremental=False):
+        """
+        Args:
+            stream: The stream frames are written to (sys.stdout at the time of writing if None).
+            color (bool): Whether to color cells by type.
+            incremental (bool): Whether to redraw only the cells that changed.
+        """
+        self.stream = stream
+        self.color = color
+        self.incremental = incremental
+        self.styles = {}  # (cell, width) -> the padded, possibly colored cell string
+        self.rows = weakref.WeakKeyDictionary()  # board -> {row: (version, cells, text)}
+        self.previous = None  # Lines of the last frame drawn in incremental mode
+
+    def style(self, cell, width):
+        """
+        Returns the printable string of a cell padded to the column width, building it on first use.
+        """
+        styled = self.styles.get((cell, width))
+        if styled is None:
+            styled = cell.ljust(width)
+            if self.color and cell in CELL_COLORS:
+                styled = CELL_COLORS[cell] + styled + RESET
+            self.styles[(cell, width)] = styled
+        return styled
+
+    def row_cells(self, board, i, width):
+        """
+        Returns the printable cells of row i of a board and the row joined into one string, reusing the
+        cached strings if the row has not changed since it was last rendered.
+        """
+        cache = self.rows.get(board)
+        if cache is None:
+            cache = self.rows[board] = {}
+
+        version = board.row_versions[i]
+        cached = cache.get(i)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+
+        cells = tuple(self.style(cell, width) for cell in board.row(i))
+        text = " ".join(cells)
+        cache[i] = (version, cells, text)
+        return cells, text
+
+    def board_lines(self, boards, titles=None):
+        """
+        Builds the lines of a frame showing boards side by side.
+
+        Args:
+            boards (list): The boards to show; they must all have the same size.
+            titles (list): The title of each board, or None for no title line.
+
+        Returns:
+            list: (text, segments) per line, where segments lists the (column, cells) of every row of board
+            cells on the line, used to find the cells that changed between frames.
+        """
+        size = boards[0].size
+        width = len(column_label(size - 1))  # Width of every cell (the widest column label)
+        number_width = max(2, len(str(size)))  # Width of the row numbers (at least 2, as on the 10x10 board)
+        labels = " ".join(column_label(i).ljust(width) for i in range(size))
+
+        # Boards after the first are preceded by a space, their row number and another space
+        gap_number_width = max(BOARD_GAP - 2, number_width)
+        gap = gap_number_width + 2
+
+        # Screen column where the cells of each board start
+        starts = [number_width + 1 + k * (len(labels) + gap) for k in range(len(boards))]
+
+        lines = []
+        if titles is not None:
+            title_line = ""
+            for start, title in zip(starts, titles):
+                title_line = title_line.ljust(start) + title
+            lines.append((title_line, None))
+        lines.append((" " * (number_width + 1) + (" " * gap).join([labels] * len(boards)), None))
+
+        for i in range(size):
+            number = str(i + 1).rjust(number_width)
+            parts = []
+            segments = []
+            for k, board in enumerate(boards):
+                cells, text = self.row_cells(board, i, width)
+                prefix = number if not k else " " + str(i + 1).rjust(gap_number_width)
+                parts.append(prefix + " " + text)
+                segments.append((starts[k], cells, width + 1))
+            lines.append(("".join(parts), segments))
+
+        return lines
+
+    def draw(self, lines):
+        """
+        Writes a frame with a single write call, or only its changes in incremental mode.
+        """
+        if not self.incremental:
+            buffer = "\n".join(text for text, _ in lines) + "\n"
+        else:
+            buffer = self.diff(lines)
+            self.previous = lines
+
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write(buffer)
+        stream.flush()
+
+    def diff(self, lines):
+        """
+        Builds the ANSI output turning the previous frame into the given one.
+        """
+        previous = self.previous
+        if previous is None or len(previous) != len(lines):
+            return CLEAR_SCREEN + "\n".join(text for text, _ in lines) + "\n" + CLEAR_BELOW
+
+        output = []
+        for row, ((text, segments), (old_text, old_segments)) in enumerate(zip(lines, previous)):
+            if text == old_text:
+                continue
+            if segments is None or old_segments is None:
+                output.append(move_to(row, 0) + text + CLEAR_LINE)  # Rewrite the whole line
+                continue
+
+            # Rewrite only the cells that changed
+            for (start, cells, step), (_, old_cells, _) in zip(segments, old_segments):
+                if cells is old_cells:
+                    continue  # Cached row that did not change
+                for j, (cell, old_cell) in enumerate(zip(cells, old_cells)):
+                    if cell != old_cell:
+                        output.append(move_to(row, start + j * step) + cell)
+
+        # Leave the cursor below the frame, with anything printed after the previous frame cleared
+        output.append(move_to(len(lines), 0) + CLEAR_BELOW)
+        return "".join(output)
+
+    def print_board(self, board):
+        """
+        Draws a single board.
+        """
+        self.draw(self.board_lines([board]))
+
+    def print_two_boards(self, guesses, board, name="Your"):
+        """
+        Draws a player's guess board and placement board side by side.
+        """
+        self.draw(self.board_lines([guesses, board], [f"{name}'s Guesses", f"{name}'s Placements"]))
+
+
+# Shared renderer used by Board.print_board and Board.print_two_boards
+_renderer = Renderer()
+
+
+def get_renderer():
+    """
+    Returns the shared renderer.
+    """
+    return _renderer
+
+
+def set_renderer(renderer):
+    """
+    Replaces the shared renderer, e.g. with Renderer(color=True, incremental=True).
+    """
+    global _renderer
+    _renderer = renderer
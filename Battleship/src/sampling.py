@@ -0,0 +1,218 @@
+# Filename: sampling.py
+# Description: Monte Carlo sampling of the opponent's fleet for the sampling AI. Random layouts of the ships that
+# are still afloat are drawn so that they agree with everything observed: no ship covers a missed cell or a cell of
+# a sunk ship, every hit on a ship still afloat is covered, and no ship lies on hits only (it would have sunk). The
+# cell covered most often across the layouts is the most likely to hold a ship. Sampling stops at a sample count or a wall-clock deadline, whichever comes
+# first, and the counts gathered so far are always usable, so a move never takes longer than its budget. Batches
+# of samples can be spread across a pool of worker processes and their counts merged.
+# Inputs: The board size, the remaining ship sizes, the observed masks and the sampling budget.
+# Outputs: How often (by weight) each placement was used, the number of layouts drawn, and the best cell to fire at.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import random  # To draw layouts
+import time    # Wall-clock budget
+
+from placements import placement_table  # Bitmasks of every in-bounds placement
+
+# Layouts drawn between two checks of the deadline
+CHECK_INTERVAL = 16
+
+
+def legal_placements(board_size, ship_size, blocked, hits=0):
+    """
+    Returns the masks of every placement of a ship still afloat that covers no blocked cell, in both
+    orientations. A placement lying on hits only is left out too: that ship would have been sunk already.
+    """
+    orientations = ('H',) if ship_size == 1 else ('H', 'V')
+    return [mask for orientation in orientations for _, mask in placement_table(board_size, ship_size, orientation)
+            if not mask & blocked and mask & ~hits]
+
+
+def draw_layout(ship_sizes, legal, covering, hits, rng):
+    """
+    Draws one layout of the remaining ships that covers every open hit. Each uncovered hit in turn is covered by
+    a random ship and placement through it, then the other ships get uniformly random legal placements and the
+    layout is rejected if any of them overlap.
+
+    Covering the hits first skews the odds of a layout by how many ways its hits could be covered and by which
+    ships were left to place at random, so every layout comes with a weight (the number of choices of every step)
+    that cancels this out: weighted, the layouts follow the uniform distribution over all consistent layouts.
+
+    Args:
+        ship_sizes (list): The sizes of the ships still afloat.
+        legal (dict): The legal placement masks of each ship size.
+        covering (dict): The (size, mask) legal placements covering each open hit, by hit bit.
+        hits (int): Bitmask of the hits on ships still afloat.
+        rng (random.Random): The random number generator.
+
+    Returns:
+        tuple: The placement mask of every ship and the weight of the layout, or None if it was rejected.
+    """
+    remaining = list(ship_sizes)
+    occupied = 0
+    layout = []
+    weight = 1
+
+    uncovered = hits
+    while uncovered:
+        hit = uncovered & -uncovered  # Lowest uncovered hit
+        candidates = [(size, mask) for size, mask in covering[hit] if size in remaining and not mask & occupied]
+        if not candidates:
+            return None
+        weight *= len(candidates)
+        size, mask = candidates[int(rng.random() * len(candidates))]
+        remaining.remove(size)
+        occupied |= mask
+        uncovered &= ~mask
+        layout.append(mask)
+
+    for size in remaining:
+        placements = legal[size]
+        if not placements:
+            return None
+        weight *= len(placements)
+        mask = placements[int(rng.random() * len(placements))]
+        if mask & occupied:
+            return None
+        occupied |= mask
+        layout.append(mask)
+    return layout, weight
+
+
+def sample_counts(board_size, ship_sizes, blocked, hits, max_samples, budget, seed=None):
+    """
+    Draws layouts until max_samples of them agree with the observations or the time budget runs out. This is
+    the unit of work handed to pool workers.
+
+    Args:
+        board_size (int): The width and height of the board.
+        ship_sizes (list): The sizes of the ships still afloat.
+        blocked (int): Bitmask of the missed cells and the cells of sunk ships.
+        hits (int): Bitmask of the hits on ships still afloat.
+        max_samples (int): The number of layouts to draw.
+        budget (float): The number of seconds to spend at most.
+        seed (int): Seed of the random number generator, or None.
+
+    Returns:
+        tuple: A dict mapping each placement mask to the total weight of the layouts using it, and the number
+        of layouts.
+    """
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + budget
+    legal = {size: legal_placements(board_size, size, blocked, hits) for size in set(ship_sizes)}
+    covering = {}
+    bits = hits
+    while bits:
+        hit = bits & -bits
+        covering[hit] = [(size, mask) for size in legal for mask in legal[size] if mask & hit]
+        bits ^= hit
+
+    counts = {}
+    samples = 0
+    attempts = 0
+    while samples < max_samples:
+        attempts += 1
+        if not attempts % CHECK_INTERVAL and time.perf_counter() >= deadline:
+            break
+        drawn = draw_layout(ship_sizes, legal, covering, hits, rng)
+        if drawn is None:
+            continue
+        layout, weight = drawn
+        samples += 1
+        for mask in layout:
+            counts[mask] = counts.get(mask, 0) + weight
+    return counts, samples
+
+
+def best_cell(board_size, counts, shot):
+    """
+    Returns the unshot cell covered by the most sampled placements, or None if no sample covers one.
+
+    Args:
+        board_size (int): The width and height of the board.
+        counts (dict): The total weight of the sampled layouts using each placement mask.
+        shot (int): Bitmask of the cells fired at.
+
+    Returns:
+        tuple: The (x, y) cell.
+    """
+    cells = [0] * (board_size * board_size)
+    for mask, count in counts.items():
+        mask &= ~shot
+        while mask:
+            low = mask & -mask
+            cells[low.bit_length() - 1] += count
+            mask ^= low
+
+    best = max(range(len(cells)), key=cells.__getitem__)
+    return divmod(best, board_size) if cells[best] else None
+
+
+class Sampler:
+    """
+    Spreads the samples of a move across worker processes and merges their counts.
+
+    Attributes:
+        workers (int): The number of worker processes (1 samples in the calling process).
+    """
+
+    def __init__(self, workers=1):
+        """
+        Args:
+            workers (int): The number of worker processes.
+        """
+        self.workers = workers
+        self.pool = None
+
+    def sample(self, board_size, ship_sizes, blocked, hits, max_samples, budget, rng=random):
+        """
+        Draws up to max_samples layouts within the time budget, split evenly between the workers. Workers that
+        are late are not waited for beyond the budget, so the move uses whatever was sampled in time.
+
+        Returns:
+            tuple: The merged placement counts and the number of layouts.
+        """
+        if self.workers <= 1:
+            return sample_counts(board_size, ship_sizes, blocked, hits, max_samples, budget, rng.getrandbits(64))
+
+        if self.pool is None:
+            from concurrent.futures import ProcessPoolExecutor  # Only imported by games that sample in parallel
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        from concurrent.futures import wait
+        share = -(-max_samples // self.workers)
+        futures = [self.pool.submit(sample_counts, board_size, ship_sizes, blocked, hits, share, budget,
+                                    rng.getrandbits(64))
+                   for _ in range(self.workers)]
+        done, _ = wait(futures, timeout=budget * 1.5 + 0.05)
+
+        counts = {}
+        samples = 0
+        for future in done:
+            worker_counts, worker_samples = future.result()
+            samples += worker_samples
+            for mask, count in worker_counts.items():
+                counts[mask] = counts.get(mask, 0) + count
+        return counts, samples
+
+    def close(self):
+        """
+        Stops the worker processes.
+        """
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+
+# Samplers of this process, by number of workers, created by get_sampler()
+_samplers = {}
+
+
+def get_sampler(workers):
+    """
+    Returns the sampler of this process with the given number of workers, so every AI shares one pool.
+    """
+    if workers not in _samplers:
+        _samplers[workers] = Sampler(workers)
+    return _samplers[workers]
@@ -0,0 +1,403 @@
+# Filename: server.py
+# Description: asyncio server hosting many concurrent Battleship games over TCP with a line protocol. Players
+# connect with any line-based client (e.g. `nc localhost 8581`), start a game against an AI or wait for another
+# human, place their ships and fire using the same 'LetterNumber' coordinates as the console game. Every
+# connection is a coroutine and a game only holds its two players, so idle sessions cost a few kilobytes. The slow
+# AI moves run on a thread pool. They are pure Python and still hold the GIL while they compute, so the pool
+# keeps the event loop from waiting on a whole move at once but does not run moves in parallel. The AI
+# sessions share the decision cache of the process, which is locked, so positions seen in one game are reused by
+# every other game.
+#
+# Protocol (one command per line, case-insensitive; the server answers with upper case keywords):
+#   NEW AI <easy|medium|hard|expert|sampling> [ships] [size]
+#                                                     play against an AI (5 ships on a 10x10 board by default)
+#   NEW HUMAN [ships] [size]                          play against the next human asking for the same settings
+#   PLACE <position> [H|V]                            place the next ship, announced by "SHIP <size>"
+#   FIRE <position>                                   fire when told "TURN"
+#   BOARD                                             show your guesses and placements
+#   QUIT                                              leave the server
+# Server messages: WELCOME, WAITING, SHIP <size>, START, TURN, RESULT <position> <HIT|MISS|SUNK>,
+# INCOMING <position> <HIT|MISS|SUNK>, WIN, LOSE, OPPONENT_LEFT, ERR <reason>, and "| " prefixed board lines.
+#
+# Inputs: Commands from the connected clients.
+# Outputs: Game events sent to the clients.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import argparse  # For the command line interface
+import asyncio   # Event loop serving every connection
+from concurrent.futures import ThreadPoolExecutor  # Runs AI moves off the event loop
+
+from board import DEFAULT_BOARD_SIZE, parse_position
+from inputs import ScriptedInput
+from player import Player, AIDifficulties, AI_factory, AIPlayerEasy, AIPlayerMedium, AIPlayerHard
+from renderer import Renderer, column_label
+from ship import Ship, fleet_sizes, MAX_SHIP_SIZE
+
+# Default TCP port
+DEFAULT_PORT = 8581
+
+# Default number of pending connections; asyncio's default of 100 stalls bursts of clients connecting at once
+DEFAULT_BACKLOG = 4096
+
+# Largest board and fleet a client may ask for
+MAX_BOARD_SIZE = 52
+MAX_SHIPS = 20
+
+# AIs whose moves take a few microseconds; handing them to the thread pool would cost more than the move itself
+INLINE_AIS = (AIPlayerEasy, AIPlayerMedium, AIPlayerHard)
+
+# Result keyword of a shot
+RESULTS = ("MISS", "HIT", "SUNK")
+
+
+def format_position(x, y):
+    """
+    Formats 0-based board coordinates in the 'LetterNumber' format (e.g. B3).
+    """
+    return f"{column_label(y)}{x + 1}"
+
+
+class Client:
+    """
+    A connected player.
+
+    Attributes:
+        game (Game): The game the client is in, or None.
+        side (int): The index of the client's player in the game (0 or 1).
+    """
+
+    __slots__ = ("writer", "game", "side")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.game = None
+        self.side = 0
+
+    def send(self, *lines):
+        self.writer.write("".join(line + "\n" for line in lines).encode())
+
+
+class Game:
+    """
+    State of one game: the two players, the clients controlling them (None for an AI) and whose turn it is.
+    The game observes both players' boards to learn where each shot landed, including the AI's.
+    """
+
+    __slots__ = ("players", "clients", "ships", "turn", "started", "last_shot")
+
+    def __init__(self, players, clients):
+        self.players = players
+        self.clients = clients
+        self.ships = [fleet_sizes(players[0].num_ships) for _ in players]  # Ships each side still has to place
+        self.turn = 0
+        self.started = False
+        self.last_shot = None
+        for player in players:
+            player.board.observer = self
+
+    def on_place_ship(self, board, ship):
+        pass
+
+    def on_fire(self, board, x, y, hit, sunk):
+        self.last_shot = (x, y, 2 if sunk else int(hit))
+
+    def opponent(self, side):
+        return self.players[1 - side]
+
+    def send(self, side, *lines):
+        """
+        Sends lines to the client playing a side, if it is a connected human.
+        """
+        client = self.clients[side]
+        if client is not None:
+            client.send(*lines)
+
+
+class GameServer:
+    """
+    Accepts connections and runs the games.
+
+    Attributes:
+        games (int): The number of games in progress.
+        waiting (dict): The game waiting for a second human, per (ships, board size).
+    """
+
+    def __init__(self, ai_workers=4):
+        """
+        Args:
+            ai_workers (int): The number of threads computing AI moves.
+        """
+        self.pool = ThreadPoolExecutor(max_workers=ai_workers, thread_name_prefix="ai")
+        self.renderer = Renderer()
+        self.waiting = {}
+        self.games = 0
+        self.commands = {
+            "NEW": self.new_game,
+            "PLACE": self.place,
+            "FIRE": self.fire,
+            "BOARD": self.board,
+        }
+
+    async def handle(self, reader, writer):
+        """
+        Serves one connection until the client quits or disconnects.
+        """
+        client = Client(writer)
+        client.send("WELCOME BATTLESHIP 1")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                words = line.decode(errors="replace").split()
+                if not words:
+                    continue
+
+                command = words[0].upper()
+                if command == "QUIT":
+                    break
+                handler = self.commands.get(command)
+                if handler is None:
+                    client.send(f"ERR unknown command {words[0]}")
+                else:
+                    await handler(client, words[1:])
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.leave(client)
+            writer.close()
+
+    def leave(self, client):
+        """
+        Removes a client from its game, ending the game for its opponent.
+        """
+        game = client.game
+        if game is None:
+            return
+        client.game = None
+
+        for key, waiting in list(self.waiting.items()):
+            if waiting is game:
+                del self.waiting[key]
+        if game.clients[1 - client.side] is not None and game.clients[1 - client.side].game is game:
+            game.send(1 - client.side, "OPPONENT_LEFT")
+            game.clients[1 - client.side].game = None
+        self.games -= 1
+
+    @staticmethod
+    def make_player(name, ships, size):
+        """
+        Creates the player of a connected client. Its moves are applied by the PLACE and FIRE commands, so it is
+        given a scripted input source instead of one prompting on the server's terminal.
+        """
+        return Player(name, ships, verbose=False, board_size=size, input_source=ScriptedInput("client"))
+
+    @staticmethod
+    def parse_settings(args):
+        """
+        Parses the optional [ships] [size] of a NEW command.
+
+        Returns:
+            tuple: (ships, size), or None if they are invalid.
+        """
+        try:
+            ships = int(args[0]) if args else 5
+            size = int(args[1]) if len(args) > 1 else DEFAULT_BOARD_SIZE
+        except ValueError:
+            return None
+        if not 1 <= ships <= MAX_SHIPS or not min(ships, MAX_SHIP_SIZE) <= size <= MAX_BOARD_SIZE:
+            return None
+        if sum(fleet_sizes(ships)) > size * size // 2:
+            return None  # Leave room for random fleets to fit
+        return ships, size
+
+    async def new_game(self, client, args):
+        """
+        NEW AI <difficulty> [ships] [size] or NEW HUMAN [ships] [size].
+        """
+        if client.game is not None:
+            client.send("ERR already in a game")
+            return
+        kind = args[0].upper() if args else ""
+
+        if kind == "AI":
+            difficulty = next((level for level in AIDifficulties
+                               if len(args) > 1 and level.name.startswith(args[1].upper())), None)
+            settings = self.parse_settings(args[2:])
+            if difficulty is None or settings is None:
+                client.send("ERR usage: NEW AI <easy|medium|hard|expert|sampling> [ships] [size]")
+                return
+            ships, size = settings
+            ai = AI_factory(difficulty, ships, verbose=False, board_size=size)
+            ai.place_ships()
+            game = Game([self.make_player("Player", ships, size), ai], [client, None])
+            game.ships[1] = []
+            self.join(client, game, 0)
+            return
+
+        if kind == "HUMAN":
+            settings = self.parse_settings(args[1:])
+            if settings is None:
+                client.send("ERR usage: NEW HUMAN [ships] [size]")
+                return
+            game = self.waiting.pop(settings, None)
+            if game is None:
+                ships, size = settings
+                players = [self.make_player(f"Player {i + 1}", ships, size) for i in range(2)]
+                game = Game(players, [client, None])
+                self.waiting[settings] = game
+                self.join(client, game, 0)
+                client.send("WAITING")
+            else:
+                game.clients[1] = client
+                client.game, client.side = game, 1
+                client.send(f"SHIP {game.ships[1][0]}")
+            return
+
+        client.send("ERR usage: NEW AI <difficulty> [ships] [size] | NEW HUMAN [ships] [size]")
+
+    def join(self, client, game, side):
+        client.game, client.side = game, side
+        self.games += 1
+        client.send(f"SHIP {game.ships[side][0]}")
+
+    async def place(self, client, args):
+        """
+        PLACE <position> [H|V]: places the next ship of the client's fleet.
+        """
+        game = client.game
+        if game is None or not game.ships[client.side]:
+            client.send("ERR no ship to place")
+            return
+
+        position = parse_position(args[0]) if args else None
+        orientation = args[1].upper() if len(args) > 1 else 'H'
+        if position is None or orientation not in ('H', 'V'):
+            client.send("ERR usage: PLACE <position> [H|V]")
+            return
+
+        size = game.ships[client.side][0]
+        if not game.players[client.side].board.place_ship(Ship(size, position, orientation)):
+            client.send("ERR the ship does not fit there")
+            return
+        game.ships[client.side].pop(0)
+
+        if game.ships[client.side]:
+            client.send(f"SHIP {game.ships[client.side][0]}")
+        elif game.ships[1 - client.side]:
+            client.send("WAITING")
+        else:
+            game.started = True
+            for side in range(2):
+                game.send(side, "START")
+            game.send(game.turn, "TURN")
+
+    async def fire(self, client, args):
+        """
+        FIRE <position>: fires at the opponent's board when it is the client's turn.
+        """
+        game = client.game
+        if game is None or not game.started:
+            client.send("ERR the game has not started")
+            return
+        if game.turn != client.side:
+            client.send("ERR not your turn")
+            return
+
+        position = parse_position(args[0]) if args else None
+        if position is None:
+            client.send("ERR usage: FIRE <position>")
+            return
+        if Player.submit_guess(game.players[client.side], game.opponent(client.side), position) is None:
+            client.send("ERR position already guessed or off the board")
+            return
+        if self.report_shot(game, client.side):
+            return
+
+        game.turn = 1 - client.side
+        if game.clients[game.turn] is not None:
+            game.send(game.turn, "TURN")
+            return
+
+        # Constant-time AIs answer inline; the others run on the thread pool, so they do not block other sessions
+        ai = game.players[1]
+        if isinstance(ai, INLINE_AIS):
+            ai.make_guess(game.players[0])
+        else:
+            await asyncio.get_running_loop().run_in_executor(self.pool, ai.make_guess, game.players[0])
+        if client.game is not game or self.report_shot(game, 1):
+            return
+        game.turn = 0
+        client.send("TURN")
+
+    def report_shot(self, game, side):
+        """
+        Tells both sides where the last shot of a side landed, and ends the game if it sank the last ship.
+
+        Returns:
+            bool: True if the game is over.
+        """
+        x, y, result = game.last_shot
+        position = format_position(x, y)
+        game.send(side, f"RESULT {position} {RESULTS[result]}")
+        game.send(1 - side, f"INCOMING {position} {RESULTS[result]}")
+        if not game.opponent(side).board.all_ships_sunk():
+            return False
+
+        game.send(side, "WIN")
+        game.send(1 - side, "LOSE")
+        for client in game.clients:
+            if client is not None:
+                client.game = None
+        self.games -= 1
+        return True
+
+    async def board(self, client, args):
+        """
+        BOARD: sends the client's guess and placement boards.
+        """
+        game = client.game
+        if game is None:
+            client.send("ERR not in a game")
+            return
+        player = game.players[client.side]
+        lines = self.renderer.board_lines([player.guesses, player.board], ["Guesses", "Placements"])
+        client.send(*("| " + text for text, _ in lines))
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, backlog=DEFAULT_BACKLOG):
+        """
+        Serves clients until cancelled.
+
+        Args:
+            host (str): The address to listen on.
+            port (int): The TCP port.
+            backlog (int): The number of connections that may wait to be accepted (capped by the OS).
+        """
+        server = await asyncio.start_server(self.handle, host, port, backlog=backlog)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    """
+    Command line entry point, e.g. `python Battleship/src/server.py --port 8581`.
+    """
+    parser = argparse.ArgumentParser(description="Host Battleship games over TCP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"TCP port (default: {DEFAULT_PORT})")
+    parser.add_argument("--ai-workers", type=int, default=4, help="threads computing AI moves (default: 4)")
+    parser.add_argument("--backlog", type=int, default=DEFAULT_BACKLOG,
+                        help=f"pending connections (default: {DEFAULT_BACKLOG})")
+    args = parser.parse_args()
+
+    print(f"Serving Battleship on {args.host}:{args.port}")
+    try:
+        asyncio.run(GameServer(args.ai_workers).serve(args.host, args.port, args.backlog))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
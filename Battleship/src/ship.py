@@ -21,11 +21,43 @@ Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh
 Creation date: 
 """
 
+# Largest ship of a fleet; larger fleets repeat the sizes 1 to MAX_SHIP_SIZE
+MAX_SHIP_SIZE = 5
+
+
+def fleet_sizes(num_ships):
+    """
+    Returns the size of each ship of a fleet, in placement order. Fleets of up to MAX_SHIP_SIZE ships
+    hold one ship of each size from 1 to num_ships; larger fleets (for large boards) cycle through the sizes.
+
+    Parameters:
+    num_ships (int): The number of ships in the fleet.
+
+    Returns:
+    list: The size of each ship.
+    """
+    return [i % MAX_SHIP_SIZE + 1 for i in range(num_ships)]
+
+
 class Ship:
+    # Fixed attribute layout: no per-instance dict, since simulations create and reuse ships by the million
+    __slots__ = ("size", "position", "orientation", "coordinates", "destroyed", "hits_remaining")
+
     def __init__(self, size, position, orientation):
         """
         Initializes a new ship with a specified size, position, and orientation.
 
+        Parameters:
+        size: The size of the ship (length).
+        position: The starting coordinates (row, column) for the ship.
+        orientation: The orientation of the ship ('H' for horizontal, 'V' for vertical).
+        """
+        self.reset(size, position, orientation)
+
+    def reset(self, size, position, orientation):
+        """
+        Turns this ship into a new, unhit ship, so that ship objects can be reused from game to game.
+
         Parameters:
         size: The size of the ship (length).
         position: The starting coordinates (row, column) for the ship.
@@ -36,6 +68,7 @@ class Ship:
         self.orientation = orientation  # Tracks the orientation ('H' or 'V')
         self.coordinates = self.get_coordinates()  # Gets the coordinates for the ship's placement
         self.destroyed = False  # Flag to track if the ship is destroyed
+        self.hits_remaining = size  # Number of cells that still have to be hit to sink the ship
 
     def get_coordinates(self):
         """
@@ -72,6 +105,21 @@ class Ship:
                 return False  # Out of bounds
         return True  # All coordinates are valid
 
+    def get_mask(self, board_size):
+        """
+        Build the bitmask of the cells covered by this ship, using bit index row * board_size + column.
+
+        Parameters:
+        board_size (int): The size of the board the ship is placed on.
+
+        Returns:
+        int: The bitmask of the ship's cells.
+        """
+        mask = 0
+        for x, y in self.coordinates:
+            mask |= 1 << (x * board_size + y)  # Set the bit of each covered cell
+        return mask
+
     def overlaps_with(self, other_ship):
         """
         Check if this ship overlaps with another ship.
@@ -0,0 +1,392 @@
+# Filename: simulation.py
+# Description: Headless AI-vs-AI simulation engine for the Battleship game. Games are played without any console
+# or audio output and are spread across a pool of worker processes in chunks, with the per-chunk results merged
+# into aggregate statistics (win rates and turns-to-win).
+# Inputs: The two AI players (as AIDifficulties levels or AIPlayer subclasses), the number of ships, the number of
+# games to play, the number of worker processes and an optional random seed.
+# Outputs: A SimulationResult holding win counts, win rates and the distribution of turns needed to win.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import argparse  # For the command line interface
+import os        # To query the number of available CPU cores
+import random    # To seed each chunk of games reproducibly
+
+from board import DEFAULT_BOARD_SIZE  # Standard board size
+from decisioncache import cache_manager, DecisionCache, DEFAULT_CAPACITY, get_cache, set_cache, use_shared_cache
+from layouts import LayoutPool, use_pool  # Fleet layouts drawn by the AIs instead of random fleets
+from player import AIDifficulties, AI_factory  # AI players driven by the engine
+
+# Maximum number of games handed to a worker in one unit of work
+MAX_CHUNK_SIZE = 1000
+
+
+class SimulationResult:
+    """
+    Aggregate results of a batch of headless games. Results of separate chunks can be merged together.
+
+    Attributes:
+        games (int): Number of games played.
+        wins (list): Number of games won by player one and player two.
+        turns (list): Total number of turns taken by the winner, per player.
+        turn_counts (dict): Histogram mapping turns-to-win to the number of games won in that many turns.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.wins = [0, 0]
+        self.turns = [0, 0]
+        self.turn_counts = {}
+
+    def record(self, winner, turns):
+        """
+        Records the outcome of a single game.
+
+        Args:
+            winner (int): Index of the winning player (0 or 1).
+            turns (int): Number of guesses the winner needed to sink every ship.
+        """
+        self.games += 1
+        self.wins[winner] += 1
+        self.turns[winner] += turns
+        self.turn_counts[turns] = self.turn_counts.get(turns, 0) + 1
+
+    def merge(self, other):
+        """
+        Adds the results of another SimulationResult into this one.
+
+        Args:
+            other (SimulationResult): The results to merge in.
+        """
+        self.games += other.games
+        for i in range(2):
+            self.wins[i] += other.wins[i]
+            self.turns[i] += other.turns[i]
+        for turns, count in other.turn_counts.items():
+            self.turn_counts[turns] = self.turn_counts.get(turns, 0) + count
+
+    def win_rate(self, player):
+        """
+        Returns the fraction of games won by the given player (0 or 1).
+        """
+        return self.wins[player] / self.games if self.games else 0.0
+
+    def mean_turns_to_win(self, player):
+        """
+        Returns the average number of turns the given player (0 or 1) needed to win, or None if it never won.
+        """
+        return self.turns[player] / self.wins[player] if self.wins[player] else None
+
+    def summary(self, names=("Player 1", "Player 2")):
+        """
+        Builds a human readable summary of the results.
+
+        Args:
+            names (tuple): Display names of the two players.
+
+        Returns:
+            str: One line per player with its win rate and average turns-to-win.
+        """
+        lines = [f"{self.games} games played"]
+        for i in range(2):
+            mean_turns = self.mean_turns_to_win(i)
+            mean_text = f"{mean_turns:.2f}" if mean_turns is not None else "-"
+            lines.append(
+                f"{names[i]}: {self.wins[i]} wins ({self.win_rate(i):.2%}), average turns to win: {mean_text}"
+            )
+        return "\n".join(lines)
+
+
+def make_ai(spec, num_ships, board_size=DEFAULT_BOARD_SIZE):
+    """
+    Creates a headless AI player from either a difficulty level or an AIPlayer subclass.
+
+    Args:
+        spec (AIDifficulties | type): The difficulty level, or the AIPlayer subclass to instantiate.
+        num_ships (int): The number of ships the AI will place.
+        board_size (int): The width and height of the AI's boards.
+
+    Returns:
+        AIPlayer: An AI player that plays without console or audio output.
+    """
+    if isinstance(spec, AIDifficulties):
+        return AI_factory(spec, num_ships, verbose=False, board_size=board_size)
+    return spec(num_ships, verbose=False, board_size=board_size)
+
+
+class PlayerPool:
+    """
+    Idle AI players kept for reuse, so a long run builds each player (and its boards and ships) once instead of
+    once per game. Released players are reset right away, which also frees what they built during the game.
+    A game's time is mostly spent on its turns, so reuse saves little time per game; what it saves is garbage:
+    a chunk of pooled games leaves no players behind for the cyclic garbage collector to find.
+
+    Attributes:
+        idle (dict): Maps (spec, num_ships, board_size) to the idle players of that kind.
+        created (int): The number of players created.
+    """
+
+    def __init__(self):
+        self.idle = {}
+        self.created = 0
+
+    def acquire(self, spec, num_ships, board_size=DEFAULT_BOARD_SIZE):
+        """
+        Returns an idle player of the given kind, ready for a new game, or a new one if there is none.
+        """
+        players = self.idle.get((spec, num_ships, board_size))
+        if players:
+            return players.pop()
+        self.created += 1
+        return make_ai(spec, num_ships, board_size)
+
+    def release(self, spec, num_ships, board_size, player):
+        """
+        Resets a player whose game is over and keeps it for the next acquire() of the same kind.
+        """
+        player.reset()
+        self.idle.setdefault((spec, num_ships, board_size), []).append(player)
+
+
+def play_game(player1, player2):
+    """
+    Plays a full game between two players without any console or audio output. Mirrors the game loop in
+    main(): both players place their ships, then take turns guessing with player one going first.
+
+    Args:
+        player1 (Player): The player who guesses first.
+        player2 (Player): The player who guesses second.
+
+    Returns:
+        tuple: The index of the winner (0 or 1) and the number of guesses the winner made.
+    """
+    player1.place_ships()
+    player2.place_ships()
+
+    turns = 0
+    while True:
+        turns += 1
+
+        player1.make_guess(player2)
+        if player2.board.all_ships_sunk():
+            return 0, turns
+
+        player2.make_guess(player1)
+        if player1.board.all_ships_sunk():
+            return 1, turns
+
+
+def run_chunk(spec1, spec2, num_ships, games, seed, board_size=DEFAULT_BOARD_SIZE, export_dir=None,
+              first_game=0, shard_rows=None):
+    """
+    Plays a chunk of games in the current process. This is the unit of work handed to pool workers.
+
+    Args:
+        spec1 (AIDifficulties | type): The AI guessing first.
+        spec2 (AIDifficulties | type): The AI guessing second.
+        num_ships (int): The number of ships each AI places.
+        games (int): The number of games to play.
+        seed (int | None): Seed for the random number generator, for reproducible chunks.
+        board_size (int): The width and height of the boards.
+        export_dir (str | None): A dataset directory to export every turn to (see export.py), or None.
+        first_game (int): The index of the chunk's first game in the dataset.
+        shard_rows (int | None): The number of rows per exported shard, or None for the default.
+
+    Returns:
+        SimulationResult: The results of the chunk.
+    """
+    random.seed(seed)
+    result = SimulationResult()
+
+    exporter = None
+    if export_dir is not None:
+        from export import DEFAULT_CHUNK_ROWS, TrajectoryExporter  # NumPy is only loaded by exporting runs
+        exporter = TrajectoryExporter(export_dir, board_size, shard_rows or DEFAULT_CHUNK_ROWS,
+                                      first_game=first_game, prefix=f"{first_game:010d}-", describe=False)
+
+    # Both players of every game come from a pool, so the chunk reuses the same two players throughout
+    pool = PlayerPool()
+    for _ in range(games):
+        player1 = pool.acquire(spec1, num_ships, board_size)
+        player2 = pool.acquire(spec2, num_ships, board_size)
+        if exporter is not None:
+            winner, turns = exporter.record(player1, player2)
+        else:
+            winner, turns = play_game(player1, player2)
+        result.record(winner, turns)
+        pool.release(spec1, num_ships, board_size, player1)
+        pool.release(spec2, num_ships, board_size, player2)
+
+    if exporter is not None:
+        exporter.close()
+    return result
+
+
+def split_chunks(games, workers, chunk_size=None):
+    """
+    Splits a number of games into work units. By default every worker receives several chunks so that
+    faster workers can pick up the slack of slower ones.
+
+    Args:
+        games (int): The total number of games.
+        workers (int): The number of worker processes.
+        chunk_size (int | None): The number of games per chunk, or None to choose automatically.
+
+    Returns:
+        list: The number of games in each chunk.
+    """
+    if chunk_size is None:
+        chunk_size = max(1, min(MAX_CHUNK_SIZE, games // (workers * 4)))
+
+    chunks = [chunk_size] * (games // chunk_size)
+    if games % chunk_size:
+        chunks.append(games % chunk_size)
+    return chunks
+
+
+def simulate(spec1, spec2, num_ships=5, games=1000, workers=None, chunk_size=None, seed=None,
+             board_size=DEFAULT_BOARD_SIZE, cache_size=None, shared_cache=None, export_dir=None, shard_rows=None,
+             layout_pool=None):
+    """
+    Plays many headless games between two AIs, spreading chunks of games across a process pool.
+
+    Args:
+        spec1 (AIDifficulties | type): The AI guessing first.
+        spec2 (AIDifficulties | type): The AI guessing second.
+        num_ships (int): The number of ships each AI places.
+        games (int): The total number of games to play.
+        workers (int | None): The number of worker processes. Defaults to the number of CPU cores;
+            with a single worker the games are played in the current process.
+        chunk_size (int | None): The number of games per work unit, or None to choose automatically.
+        seed (int | None): Base seed; chunk i is seeded with seed + i so runs are reproducible.
+        board_size (int): The width and height of the boards.
+        cache_size (int | None): The capacity of the decision cache of every process, or None to keep the default.
+        shared_cache (DecisionCache | None): A cache proxy from cache_manager(), shared by every process behind a
+            small local cache, or None to give each process its own cache.
+        export_dir (str | None): A dataset directory to stream every turn and placement to, or None. Every
+            chunk writes its own shards on a background thread, so memory stays bounded.
+        shard_rows (int | None): The number of rows per exported shard, or None for the default.
+        layout_pool (LayoutPool | None): A pool every process draws the AIs' fleets from, or None for random fleets.
+
+    Returns:
+        SimulationResult: The aggregate results of every game.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = split_chunks(games, workers, chunk_size)
+    seeds = [None if seed is None else seed + i for i in range(len(chunks))]
+    starts = [sum(chunks[:i]) for i in range(len(chunks))]
+    result = SimulationResult()
+
+    if shared_cache is not None:
+        initializer, initargs = use_shared_cache, (shared_cache,)
+    elif cache_size is not None:
+        initializer, initargs = set_cache, (DecisionCache(cache_size),)
+    else:
+        initializer, initargs = None, ()
+    # Handed to every worker, since workers started with spawn (macOS, Windows) do not inherit this process' pools
+    initializer, initargs = init_worker, (initializer, initargs, layout_pool)
+
+    # Avoid the cost of starting a pool when there is nothing to spread the work over
+    if workers == 1:
+        initializer(*initargs)
+        for chunk, chunk_seed, start in zip(chunks, seeds, starts):
+            result.merge(run_chunk(spec1, spec2, num_ships, chunk, chunk_seed, board_size, export_dir, start,
+                                   shard_rows))
+        finish_export(export_dir, board_size)
+        return result
+
+    # The process pool takes longer to import than the rest of the game, so runs with one worker never load it
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        futures = [
+            pool.submit(run_chunk, spec1, spec2, num_ships, chunk, chunk_seed, board_size, export_dir, start,
+                        shard_rows)
+            for chunk, chunk_seed, start in zip(chunks, seeds, starts)
+        ]
+        for future in as_completed(futures):
+            result.merge(future.result())
+
+    finish_export(export_dir, board_size)
+    return result
+
+
+def init_worker(cache_initializer, cache_args, layout_pool):
+    """
+    Sets up the decision cache and layout pool of a process playing simulated games.
+    """
+    if cache_initializer is not None:
+        cache_initializer(*cache_args)
+    if layout_pool is not None:
+        use_pool(layout_pool)
+
+
+def finish_export(export_dir, board_size):
+    """
+    Describes the dataset exported by the chunks of a run, if any.
+    """
+    if export_dir is not None:
+        from export import describe_dataset
+        describe_dataset(export_dir, board_size)
+
+
+def parse_difficulty(text):
+    """
+    Converts a difficulty name given on the command line (e.g. "easy" or "E") into an AIDifficulties level.
+    """
+    for difficulty in AIDifficulties:
+        if difficulty.name.startswith(text.upper()):
+            return difficulty
+    raise argparse.ArgumentTypeError(f"unknown AI difficulty: {text}")
+
+
+def main():
+    """
+    Command line entry point, e.g. `python Battleship/src/simulation.py easy hard --games 10000`.
+    """
+    parser = argparse.ArgumentParser(description="Run headless AI-vs-AI Battleship games.")
+    parser.add_argument("player1", type=parse_difficulty, help="difficulty of the AI guessing first")
+    parser.add_argument("player2", type=parse_difficulty, help="difficulty of the AI guessing second")
+    parser.add_argument("--ships", type=int, default=5, help="number of ships per player (default: 5)")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to play (default: 1000)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="games per work unit")
+    parser.add_argument("--seed", type=int, default=None, help="base random seed")
+    parser.add_argument("--board-size", type=int, default=DEFAULT_BOARD_SIZE, help="board width and height")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CAPACITY,
+                        help=f"decisions kept by the decision cache (default: {DEFAULT_CAPACITY})")
+    parser.add_argument("--shared-cache", action="store_true",
+                        help="share one decision cache between the worker processes")
+    parser.add_argument("--layouts", metavar="FILE", default=None,
+                        help="draw the AIs' fleets from a layout pool written by layouts.py")
+    parser.add_argument("--export", metavar="DIR", default=None,
+                        help="stream every turn and placement to a NumPy dataset in DIR (see export.py)")
+    parser.add_argument("--shard-rows", type=int, default=None, help="rows per exported shard (default: 65536)")
+    args = parser.parse_args()
+
+    layout_pool = LayoutPool.load(args.layouts) if args.layouts else None
+
+    if args.shared_cache:
+        with cache_manager() as manager:
+            shared = manager.DecisionCache(args.cache_size)
+            result = simulate(args.player1, args.player2, args.ships, args.games, args.workers, args.chunk_size,
+                              args.seed, args.board_size, shared_cache=shared, export_dir=args.export,
+                              shard_rows=args.shard_rows, layout_pool=layout_pool)
+            cache_summaries = [shared.summary("shared decision cache")]
+    else:
+        result = simulate(args.player1, args.player2, args.ships, args.games, args.workers, args.chunk_size,
+                          args.seed, args.board_size, cache_size=args.cache_size, export_dir=args.export,
+                          shard_rows=args.shard_rows, layout_pool=layout_pool)
+        cache_summaries = []
+
+    # The caches of worker processes go away with the pool; only the one of this process can be reported
+    if args.workers == 1:
+        cache_summaries.insert(0, get_cache().summary())
+
+    print(result.summary((args.player1.name, args.player2.name)))
+    for summary in cache_summaries:
+        print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+# Filename: tournament.py
+# Description: Round-robin tournament between the AI players. Every pairing plays batches of headless games, half
+# of them with each player guessing first, with the batches of all pairings spread across a process pool. After
+# every batch sequential probability ratio tests (SPRT) decide whether one player is stronger or both are even,
+# so clearly unequal pairings stop after a few hundred games instead of a fixed, oversized number. Bradley-Terry
+# ratings on the Elo scale, with confidence intervals, are updated as results come in.
+# Inputs: The AIs to compare (every AIDifficulties level and AIPlayer subclass by default), the game settings and
+# the SPRT parameters.
+# Outputs: The result of every pairing and the rating of every AI.
+# Authors: Kemar Wilson, Yadhunath Tharakeswaran, Jawad Ahsan, Dev Patel, Sanketh Reddy
+# Creation Date:
+
+import argparse  # For the command line interface
+import math      # Likelihood ratios and rating scale
+import os        # To query the number of available CPU cores
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait  # Parallel batches
+
+import numpy as np  # Covariance of the ratings
+
+from board import DEFAULT_BOARD_SIZE
+from player import AIPlayer, AIDifficulties, AI_factory
+from simulation import run_chunk
+
+# Elo points per unit of the Bradley-Terry log-strength
+ELO_SCALE = 400 / math.log(10)
+
+# z-score of the reported confidence intervals (95%)
+CI_Z = 1.96
+
+
+def elo_to_score(elo):
+    """
+    Returns the expected score (win probability) of a player rated `elo` points above its opponent.
+    """
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+# Decisions of SPRT.decide(): more games needed, the first or second player is stronger, or neither is
+UNDECIDED = 0
+FIRST = 1
+SECOND = -1
+EVEN = 2
+
+
+class SPRT:
+    """
+    Sequential probability ratio tests of the win/loss record of a pairing of A and B. As in engine testing, each
+    test pits "the players are equally strong" (H0, 0 Elo) against "one player is `margin` Elo stronger" (H1):
+    one test for A being stronger and one for B. The pairing is decided for a player as soon as its test accepts
+    H1, and decided as even once both tests accept H0. Battleship games cannot be drawn, so each game is a
+    Bernoulli trial.
+
+    Attributes:
+        lower (float): The log-likelihood ratio at or below which a test accepts H0.
+        upper (float): The log-likelihood ratio at or above which a test accepts H1.
+    """
+
+    def __init__(self, margin=30.0, alpha=0.05, beta=0.05):
+        """
+        Args:
+            margin (float): The Elo difference the tests tell apart from equal strength.
+            alpha (float): The probability of a test declaring its player stronger when both are equally strong.
+            beta (float): The probability of a test missing that its player is `margin` Elo stronger.
+        """
+        self.margin = margin
+        p1 = elo_to_score(margin)
+        self.win_weight = math.log(p1 / 0.5)
+        self.loss_weight = math.log((1 - p1) / 0.5)
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+
+    def llr(self, wins, losses):
+        """
+        Returns the log-likelihood ratio of "A is `margin` Elo stronger" against "A and B are equally strong"
+        after a number of wins and losses of A. The test for B swaps the wins and losses.
+        """
+        return wins * self.win_weight + losses * self.loss_weight
+
+    def decide(self, wins, losses):
+        """
+        Returns FIRST if A is decided stronger, SECOND if B is, EVEN if neither is, or UNDECIDED if more games
+        are needed.
+        """
+        first = self.llr(wins, losses)
+        second = self.llr(losses, wins)
+        if first >= self.upper:
+            return FIRST
+        if second >= self.upper:
+            return SECOND
+        if first <= self.lower and second <= self.lower:
+            return EVEN
+        return UNDECIDED
+
+
+class Pairing:
+    """
+    The running record of one pairing.
+
+    Attributes:
+        players (tuple): The two participants' indices.
+        wins (list): The number of games won by each player.
+        decision (int): The SPRT decision: FIRST, SECOND, EVEN, or UNDECIDED while games are needed.
+        pending (int): The number of batches being played.
+    """
+
+    def __init__(self, first, second):
+        self.players = (first, second)
+        self.wins = [0, 0]
+        self.decision = UNDECIDED
+        self.pending = 0
+
+    @property
+    def games(self):
+        return self.wins[0] + self.wins[1]
+
+
+class InlineExecutor:
+    """
+    Executor running every task immediately in the current process, used instead of a pool for one worker.
+    """
+
+    def submit(self, function, *args):
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def registered_players():
+    """
+    Returns every AI: the class of each AIDifficulties level, named after the level, followed by any other
+    AIPlayer subclass that has been imported, named after the class.
+
+    Returns:
+        dict: Maps each name to its AIPlayer subclass.
+    """
+    players = {level.name: type(AI_factory(level, 1, verbose=False)) for level in AIDifficulties}
+    known = set(players.values())
+
+    pending = list(AIPlayer.__subclasses__())
+    while pending:
+        cls = pending.pop(0)
+        pending.extend(cls.__subclasses__())
+        if cls not in known:
+            players[cls.__name__] = cls
+            known.add(cls)
+    return players
+
+
+def bradley_terry(count, pairings, prior=0.5, iterations=10000, tolerance=1e-10):
+    """
+    Fits Bradley-Terry ratings to the pairing records with the minorization-maximization algorithm.
+
+    Args:
+        count (int): The number of participants.
+        pairings (list): The Pairing records.
+        prior (float): Virtual wins given to both sides of every pairing that was played, which keeps ratings
+            finite when one side won every game.
+        iterations (int): The maximum number of iterations.
+        tolerance (float): The largest change of a log-strength at which the fit stops.
+
+    Returns:
+        tuple: The Elo rating of each participant (averaging 0) and the half-width of its confidence interval.
+    """
+    wins = np.zeros((count, count))
+    for pairing in pairings:
+        if pairing.games:
+            a, b = pairing.players
+            wins[a, b] += pairing.wins[0] + prior
+            wins[b, a] += pairing.wins[1] + prior
+    games = wins + wins.T
+    total_wins = wins.sum(axis=1)
+
+    strength = np.ones(count)
+    played = total_wins > 0
+    for _ in range(iterations):
+        denominator = (games / (strength[:, None] + strength[None, :])).sum(axis=1)
+        updated = np.where(played, total_wins / np.where(denominator > 0, denominator, 1), 1.0)
+        updated /= np.exp(np.log(updated).mean())
+        change = np.abs(np.log(updated) - np.log(strength)).max()
+        strength = updated
+        if change < tolerance:
+            break
+
+    # Covariance of the log-strengths from the inverse of the Fisher information (which is singular, since
+    # only differences of ratings are determined; the pseudo-inverse pins their mean)
+    theta = np.log(strength)
+    p = 1 / (1 + np.exp(theta[None, :] - theta[:, None]))
+    information = -games * p * p.T
+    np.fill_diagonal(information, 0)
+    np.fill_diagonal(information, -information.sum(axis=1))
+    covariance = np.linalg.pinv(information)
+
+    ratings = ELO_SCALE * theta
+    intervals = CI_Z * ELO_SCALE * np.sqrt(np.clip(np.diag(covariance), 0, None))
+    return ratings.tolist(), intervals.tolist()
+
+
+def ratings_table(names, pairings):
+    """
+    Formats the current ratings, strongest first.
+    """
+    ratings, intervals = bradley_terry(len(names), pairings)
+    order = sorted(range(len(names)), key=lambda i: -ratings[i])
+    width = max(len(name) for name in names)
+    return "\n".join(f"{names[i]:{width}} {ratings[i]:+8.1f} +/- {intervals[i]:6.1f}" for i in order)
+
+
+def tournament(players, num_ships=5, board_size=DEFAULT_BOARD_SIZE, batch=200, max_games=20000, sprt=None,
+               workers=None, seed=None, report=None):
+    """
+    Plays a round robin between AIs until SPRT decides every pairing or it reaches max_games.
+
+    Args:
+        players (dict): Maps each participant's name to its AIPlayer subclass or AIDifficulties level.
+        num_ships (int): The number of ships of each fleet.
+        board_size (int): The width and height of the boards.
+        batch (int): The number of games per batch (half with each player guessing first).
+        max_games (int): The largest number of games of a pairing that SPRT has not decided.
+        sprt (SPRT): The stopping test (SPRT() if None).
+        workers (int): The number of worker processes (the CPU count if None; 1 plays in this process).
+        seed (int): Base seed; every batch gets the next seed, so runs with one worker are reproducible.
+        report (callable): Called with the names, the pairings and the pairing that just finished, or None.
+
+    Returns:
+        tuple: The list of participant names and the list of Pairing records.
+    """
+    sprt = sprt if sprt is not None else SPRT()
+    workers = workers or os.cpu_count() or 1
+    names = list(players)
+    specs = list(players.values())
+    pairings = [Pairing(a, b) for a in range(len(names)) for b in range(a + 1, len(names))]
+    half = max(1, batch // 2)
+    seeds = iter(range(seed if seed is not None else 0, 1 << 62))
+
+    with (InlineExecutor() if workers == 1 else ProcessPoolExecutor(max_workers=workers)) as pool:
+        futures = {}
+
+        def submit(pairing):
+            # One chunk with each player guessing first
+            a, b = pairing.players
+            for swapped in (False, True):
+                first, second = (b, a) if swapped else (a, b)
+                chunk_seed = next(seeds) if seed is not None else None
+                future = pool.submit(run_chunk, specs[first], specs[second], num_ships, half, chunk_seed,
+                                     board_size)
+                futures[future] = (pairing, swapped)
+            pairing.pending = 2
+
+        for pairing in pairings:
+            submit(pairing)
+
+        while futures:
+            done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+            for future in done:
+                pairing, swapped = futures.pop(future)
+                result = future.result()
+                pairing.wins[0] += result.wins[1] if swapped else result.wins[0]
+                pairing.wins[1] += result.wins[0] if swapped else result.wins[1]
+                pairing.pending -= 1
+                if pairing.pending:
+                    continue
+
+                pairing.decision = sprt.decide(*pairing.wins)
+                if pairing.decision == UNDECIDED and pairing.games < max_games:
+                    submit(pairing)
+                elif report is not None:
+                    report(names, pairings, pairing)
+
+    return names, pairings
+
+
+def describe(pairing, names):
+    """
+    Returns the result of a pairing in words.
+    """
+    a, b = pairing.players
+    if pairing.decision == UNDECIDED:
+        outcome = "undecided"
+    elif pairing.decision == EVEN:
+        outcome = "even"
+    else:
+        outcome = f"{names[a if pairing.decision == FIRST else b]} is stronger"
+    return f"{names[a]} vs {names[b]}: {pairing.wins[0]}-{pairing.wins[1]} after {pairing.games} games, {outcome}"
+
+
+def print_progress(names, pairings, pairing):
+    """
+    Prints the result of a finished pairing and the running ratings.
+    """
+    ratings, _ = bradley_terry(len(names), pairings)
+    order = sorted(range(len(names)), key=lambda i: -ratings[i])
+    print(describe(pairing, names))
+    print("  ratings: " + ", ".join(f"{names[i]} {ratings[i]:+.0f}" for i in order))
+
+
+def main():
+    """
+    Command line entry point, e.g. `python Battleship/src/tournament.py easy medium expert --margin 20`.
+    """
+    available = registered_players()
+
+    parser = argparse.ArgumentParser(description="Round-robin tournament between the Battleship AIs.")
+    parser.add_argument("players", nargs="*", help=f"AIs to include (default: all of {', '.join(available)})")
+    parser.add_argument("--ships", type=int, default=5, help="number of ships per player (default: 5)")
+    parser.add_argument("--board-size", type=int, default=DEFAULT_BOARD_SIZE, help="board width and height")
+    parser.add_argument("--batch", type=int, default=200, help="games per batch (default: 200)")
+    parser.add_argument("--max-games", type=int, default=20000, help="games per undecided pairing (default: 20000)")
+    parser.add_argument("--margin", type=float, default=30.0, help="Elo difference SPRT tells apart from equal strength (default: 30)")
+    parser.add_argument("--alpha", type=float, default=0.05, help="SPRT false positive rate (default: 0.05)")
+    parser.add_argument("--beta", type=float, default=0.05, help="SPRT false negative rate (default: 0.05)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=None, help="base random seed")
+    args = parser.parse_args()
+
+    players = {}
+    for text in args.players or available:
+        matches = [name for name in available if name.upper().startswith(text.upper())]
+        if not matches:
+            parser.error(f"unknown AI: {text}")
+        players[matches[0]] = available[matches[0]]
+    if len(players) < 2:
+        parser.error("a tournament needs at least two AIs")
+
+    names, pairings = tournament(players, args.ships, args.board_size, args.batch, args.max_games,
+                                 SPRT(args.margin, args.alpha, args.beta), args.workers, args.seed, print_progress)
+
+    played = sum(pairing.games for pairing in pairings)
+    print(f"\n{played} games played ({played / (len(pairings) * args.max_games):.1%} of a fixed "
+          f"{args.max_games} games per pairing)\n")
+    print(ratings_table(names, pairings))
+
+
+if __name__ == "__main__":
+    main()